@@ -1,13 +1,2191 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import redis
+import redis.asyncio
+import asyncio
+import codecs
 from datetime import datetime, timedelta
 import json
+import re
 import threading
+import sys
 import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from redis.cluster import RedisCluster
 from redis.connection import ConnectionPool
 
+
+class CompactKeyStore:
+    """紧凑键存储：所有键的UTF-8字节连续存放在一个缓冲区中，用偏移数组定位每个键
+    
+    相比 list[str]，每个键省去了str对象和列表指针的开销（约60字节），
+    并借助开放寻址哈希表对SCAN可能返回的重复键去重。
+    支持 len、索引、切片和迭代，可直接替代原来的 all_keys 列表。
+    二进制安全模式下SCAN返回的原始字节直接存入，读取时才解码；不是有效UTF-8的字节
+    以 surrogateescape 方式解码，作为命令参数发回时还原为原始字节。
+    search 在缓冲区上按子串、通配符或正则查找键名，扫描在C层完成，不逐个解码键。
+    """
+    
+    SEARCH_MODES = ("substring", "glob", "regex")
+    GLOB_ANY = "(?s:.)*"
+    # 每百万个键的大致搜索耗时（毫秒，benchmark_redis_manager.py search 实测），随键数线性增长。
+    # 子串用 bytes.find 直接扫描缓冲区，已接近内存带宽，不需要额外的n-gram索引；
+    # 正则先按开头的字面前缀筛选候选键，没有字面前缀时逐键匹配，约慢三倍
+    SEARCH_COST_MS = {"substring": 25, "glob": 30, "regex": 130}
+    
+    def __init__(self, keys=None):
+        self._buffer = bytearray()
+        # 缓冲区超过4GB时偏移数组自动升级为64位
+        self._offsets = array('I', [0])
+        # 每个键的32位哈希，扩容时无需重新计算
+        self._hashes = array('I')
+        # 开放寻址表 (槽位数组, 掩码)：槽位保存键序号，-1 表示空槽。两者放在一个元组里整体替换，
+        # 其他线程的 find 在扩容时读到的总是配套的一对，不会用新表配旧掩码
+        self._table = (array('i', [-1]) * 16, 15)
+        if keys:
+            self.extend(keys)
+    
+    def __len__(self):
+        return len(self._offsets) - 1
+    
+    def __iter__(self):
+        buffer = self._buffer
+        offsets = self._offsets
+        for i in range(len(self)):
+            yield buffer[offsets[i]:offsets[i + 1]].decode('utf-8', 'surrogateescape')
+    
+    def __contains__(self, key):
+        return self.find(key) >= 0
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            offsets = self._offsets
+            buffer = self._buffer
+            return [buffer[offsets[i]:offsets[i + 1]].decode('utf-8', 'surrogateescape')
+                    for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("key index out of range")
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]].decode('utf-8', 'surrogateescape')
+    
+    def key_bytes(self, index):
+        """返回第 index 个键的原始字节"""
+        return bytes(self._buffer[self._offsets[index]:self._offsets[index + 1]])
+    
+    def raw_key(self, index):
+        """返回第 index 个键的原始字节"""
+        offsets = self._offsets
+        return bytes(self._buffer[offsets[index]:offsets[index + 1]])
+    
+    def raw_keys(self):
+        """返回全部键原始字节的列表，按键名排序时作为排序键（UTF-8字节序与码点顺序一致）"""
+        # bytes 之间的比较比 bytearray 快得多，先复制一份缓冲区再切片
+        buffer = bytes(self._buffer)
+        offsets = self._offsets
+        return [buffer[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+    
+    def find(self, key):
+        """返回键的序号，不存在时返回 -1"""
+        key_bytes = key.encode('utf-8', 'surrogateescape') if isinstance(key, str) else key
+        key_hash = hash(key_bytes) & 0xFFFFFFFF
+        slots, mask = self._table
+        slot = key_hash & mask
+        while True:
+            index = slots[slot]
+            if index < 0:
+                return -1
+            if (self._hashes[index] == key_hash and
+                    self._buffer[self._offsets[index]:self._offsets[index + 1]] == key_bytes):
+                return index
+            slot = (slot + 1) & mask
+    
+    def find_many(self, keys):
+        """批量查找键的序号，返回与 keys 对应的列表，不存在的键为 -1"""
+        buffer = self._buffer
+        hashes = self._hashes
+        slots, mask = self._table
+        result = []
+        for key in keys:
+            key_bytes = key.encode('utf-8', 'surrogateescape') if isinstance(key, str) else key
+            key_hash = hash(key_bytes) & 0xFFFFFFFF
+            slot = key_hash & mask
+            while True:
+                index = slots[slot]
+                if index < 0:
+                    break
+                # 偏移数组可能在查找期间升级为64位，每次重新读取
+                offsets = self._offsets
+                if hashes[index] == key_hash and buffer[offsets[index]:offsets[index + 1]] == key_bytes:
+                    break
+                slot = (slot + 1) & mask
+            result.append(index)
+        return result
+    
+    def append(self, key):
+        """追加一个键，返回是否为新键（重复键被忽略）"""
+        return self.extend((key,)) == 1
+    
+    def extend(self, keys):
+        """批量追加键，返回实际新增的键数"""
+        buffer = self._buffer
+        offsets = self._offsets
+        hashes = self._hashes
+        added = 0
+        for key in keys:
+            key_bytes = key.encode('utf-8', 'surrogateescape') if isinstance(key, str) else key
+            key_hash = hash(key_bytes) & 0xFFFFFFFF
+            slots, mask = self._table
+            slot = key_hash & mask
+            duplicate = False
+            while True:
+                index = slots[slot]
+                if index < 0:
+                    break
+                if hashes[index] == key_hash and buffer[offsets[index]:offsets[index + 1]] == key_bytes:
+                    duplicate = True
+                    break
+                slot = (slot + 1) & mask
+            if duplicate:
+                continue
+            
+            # 先写入数据再追加偏移，其他线程读取时长度始终有效
+            new_index = len(hashes)
+            buffer += key_bytes
+            hashes.append(key_hash)
+            try:
+                offsets.append(len(buffer))
+            except OverflowError:
+                offsets = self._offsets = array('Q', offsets)
+                offsets.append(len(buffer))
+            slots[slot] = new_index
+            added += 1
+            
+            # 负载因子超过0.5时扩容
+            if (new_index + 1) * 2 > mask:
+                self._grow()
+        return added
+    
+    def _grow(self):
+        """哈希表容量翻倍并重新放置所有键"""
+        mask = self._table[1] * 2 + 1
+        slots = array('i', [-1]) * (mask + 1)
+        for index, key_hash in enumerate(self._hashes):
+            slot = key_hash & mask
+            while slots[slot] >= 0:
+                slot = (slot + 1) & mask
+            slots[slot] = index
+        self._table = (slots, mask)
+    
+    @staticmethod
+    def glob_to_regex(pattern):
+        """把Redis的通配符模式转换为匹配单个键的正则，语义与服务器的 stringmatchlen 相同
+        
+        支持 * ? \\转义和 [...]：方括号内可用 ^ 取反、a-z 范围（首尾颠倒时自动交换）和
+        \\转义，缺少右括号时一直到模式末尾。通配符可以匹配换行符。
+        """
+        return "".join(CompactKeyStore._glob_parts(pattern))
+    
+    @staticmethod
+    def _glob_parts(pattern):
+        """把通配符模式拆成正则片段，* 对应 GLOB_ANY，其余片段都只匹配一个字符"""
+        any_char = "(?s:.)"
+        parts = []
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "*":
+                parts.append(CompactKeyStore.GLOB_ANY)
+            elif char == "?":
+                parts.append(any_char)
+            elif char == "\\" and i + 1 < len(pattern):
+                i += 1
+                parts.append(re.escape(pattern[i]))
+            elif char == "[":
+                i += 1
+                negate = i < len(pattern) and pattern[i] == "^"
+                if negate:
+                    i += 1
+                body = []
+                while i < len(pattern) and pattern[i] != "]":
+                    if pattern[i] == "\\" and i + 1 < len(pattern):
+                        i += 1
+                        body.append(re.escape(pattern[i]))
+                    elif i + 2 < len(pattern) and pattern[i + 1] == "-":
+                        low, high = sorted((pattern[i], pattern[i + 2]))
+                        body.append(f"{re.escape(low)}-{re.escape(high)}")
+                        i += 2
+                    else:
+                        body.append(re.escape(pattern[i]))
+                    i += 1
+                body = "".join(body)
+                if negate:
+                    parts.append(f"[^{body}]" if body else any_char)
+                else:
+                    parts.append(f"[{body}]" if body else "(?!)")
+            else:
+                parts.append(re.escape(char))
+            i += 1
+        return parts
+    
+    @staticmethod
+    def escape_glob(key):
+        """转义键名中的通配符和反斜杠，得到只匹配该键本身的模式"""
+        return re.sub(r"([*?\[\\])", r"\\\1", key)
+    
+    @staticmethod
+    def glob_matcher(pattern):
+        """返回按Redis通配符规则整键匹配的函数 matcher(key) -> 是否匹配"""
+        compiled = re.compile(CompactKeyStore.glob_to_regex(pattern))
+        return lambda key: compiled.fullmatch(key) is not None
+    
+    @staticmethod
+    def _regex_assertions(pattern):
+        """返回正则中字符类之外的位置断言和环视，如 ["^", "\\b", "(?<="]"""
+        found = []
+        in_class = False
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "\\":
+                if not in_class and pattern[i + 1:i + 2] in ("A", "Z", "b", "B"):
+                    found.append(pattern[i:i + 2])
+                i += 2
+                continue
+            if in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+                # 紧跟在 [ 或 [^ 后的 ] 是字面字符
+                i += 1
+                if pattern[i:i + 1] == "^":
+                    i += 1
+                if pattern[i:i + 1] == "]":
+                    i += 1
+                continue
+            elif char in "^$":
+                found.append(char)
+            elif pattern.startswith(("(?=", "(?!"), i):
+                found.append(pattern[i:i + 3])
+            elif pattern.startswith(("(?<=", "(?<!"), i):
+                found.append(pattern[i:i + 4])
+            i += 1
+        return found
+    
+    @staticmethod
+    def _regex_literal(pattern):
+        """返回正则开头（^ 之后）每个匹配都必须包含的字面前缀，没有时返回空串"""
+        if "|" in pattern:
+            return ""
+        body = pattern[1:] if pattern.startswith("^") else pattern
+        length = 0
+        while length < len(body) and body[length] not in ".^$*+?{}[]\\|()":
+            length += 1
+        # 后面跟着可以出现零次的量词时，最后一个字符不是必需的
+        if length < len(body) and body[length] in "*?{":
+            length -= 1
+        return body[:max(length, 0)]
+    
+    def _regex_tester(self, pattern, flags):
+        """返回 test(start, end)：在缓冲区的 [start, end) 范围内按键查找正则
+        
+        带 pos/endpos 的匹配把 endpos 当作字符串末尾，$ \\Z 和向前环视都正确；但 ^ \\A \\b \\B
+        和向后环视会看到前一个键的字节。开头的 ^ 改用 match 锚定，其余情况对键的副本匹配。
+        """
+        encode = lambda text: text.encode('utf-8', 'surrogateescape')
+        buffer = self._buffer
+        compiled = re.compile(encode(pattern), flags)
+        assertions = self._regex_assertions(pattern)
+        anchored = pattern.startswith("^") and "|" not in pattern
+        if anchored:
+            assertions = assertions[1:]
+        if all(item in ("$", "\\Z", "(?=", "(?!") for item in assertions):
+            bare = re.compile(encode(pattern[1:]), flags) if anchored else compiled
+            find = bare.match if anchored else bare.search
+            return lambda start, end: find(buffer, start, end) is not None
+        return lambda start, end: compiled.search(bytes(buffer[start:end])) is not None
+    
+    def search(self, pattern, mode="substring", ignore_case=False, stopped=None):
+        """查找键名匹配的键，返回键序号数组（按存储顺序）
+        
+        mode 为 substring（子串）、glob（与SCAN MATCH相同的通配符，整键匹配）或
+        regex（正则，在键名中查找；^ 和 $ 匹配键的首尾）。正则按UTF-8字节匹配，
+        忽略大小写只对ASCII字符有效。stopped() 返回 True 时提前结束并返回已找到的部分。
+        直接在缓冲区上查找候选位置（子串本身、通配符 * 之间的片段或正则开头的字面前缀），
+        用 bisect 在偏移数组中找到所在的键，再确认匹配没有越出该键；
+        没有字面前缀的正则逐键在缓冲区的对应范围内匹配。
+        没有索引，耗时与键数成正比，见 SEARCH_COST_MS。
+        """
+        buffer = self._buffer
+        offsets = self._offsets
+        count = len(self)
+        flags = re.IGNORECASE if ignore_case else 0
+        encode = lambda text: text.encode('utf-8', 'surrogateescape')
+        matches = array('I')
+        
+        if mode == "regex":
+            test = self._regex_tester(pattern, flags)
+            literal = self._regex_literal(pattern)
+        if mode == "regex" and not literal:
+            for index in range(count):
+                if stopped and index % 65536 == 0 and stopped():
+                    break
+                if test(offsets[index], offsets[index + 1]):
+                    matches.append(index)
+            return matches
+        
+        needle = None
+        if mode == "regex":
+            # 先找每个匹配都必须包含的字面前缀，只对包含它的键执行正则
+            if ignore_case:
+                candidates = re.compile(re.escape(encode(literal)), flags)
+            else:
+                needle = encode(literal)
+            confirm = lambda end, key_start, key_end: test(key_start, key_end)
+        elif mode == "glob":
+            parts = self._glob_parts(pattern)
+            whole = re.compile(encode("".join(parts)), flags)
+            # 用 * 之间最长的一段定长片段查找候选位置，匹配不会延伸到其他键，整键匹配交给 fullmatch 确认
+            segments = [[]]
+            for part in parts:
+                if part == self.GLOB_ANY:
+                    segments.append([])
+                else:
+                    segments[-1].append(part)
+            candidates = re.compile(encode("".join(max(segments, key=len))), flags)
+            confirm = lambda end, key_start, key_end: (
+                whole.fullmatch(buffer, key_start, key_end) is not None)
+        else:
+            if ignore_case:
+                candidates = re.compile(re.escape(encode(pattern)), flags)
+            else:
+                needle = encode(pattern)
+            confirm = lambda end, key_start, key_end: end <= key_end
+        
+        limit = offsets[count]
+        position = 0
+        rounds = 0
+        while position < limit:
+            rounds += 1
+            if stopped and rounds % 1024 == 0 and stopped():
+                break
+            if needle is not None:
+                start = buffer.find(needle, position, limit)
+                if start < 0:
+                    break
+                end = start + len(needle)
+            else:
+                match = candidates.search(buffer, position, limit)
+                if match is None:
+                    break
+                start, end = match.span()
+            index = bisect_right(offsets, start, 0, count + 1) - 1
+            if index >= count:
+                break
+            key_end = offsets[index + 1]
+            if confirm(end, offsets[index], key_end):
+                matches.append(index)
+            # 同一键只记录一次，从下一个键继续查找
+            position = key_end
+        return matches
+    
+    @property
+    def nbytes(self):
+        """存储占用的字节数（缓冲区与各数组）"""
+        return (len(self._buffer) +
+                self._offsets.itemsize * len(self._offsets) +
+                self._hashes.itemsize * len(self._hashes) +
+                self._table[0].itemsize * len(self._table[0]))
+
+
+class KeyIndexView:
+    """CompactKeyStore 中部分键（如全局搜索结果）的只读视图
+    
+    只保存键序号数组，支持 len、索引、切片和迭代，分页时可代替 all_keys 使用。
+    """
+    
+    def __init__(self, store, indexes):
+        self.store = store
+        self.indexes = indexes
+    
+    def __len__(self):
+        return len(self.indexes)
+    
+    def __iter__(self):
+        store = self.store
+        for index in self.indexes:
+            yield store[index]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            store = self.store
+            return [store[i] for i in self.indexes[index]]
+        return self.store[self.indexes[index]]
+
+
+class KeyMetadataArrays:
+    """与 CompactKeyStore 键序号对齐的类型、过期时间和大小数组，用于对全部键排序
+    
+    加载页面、预取和刷新行时记录获取到的元数据，排序只读这些数组，不访问Redis。
+    用户选择补全排序元数据时，补全线程按键序号顺序为其余的键获取元数据，filled 是已处理到的序号。
+    过期时间保存为绝对时间戳，排序结果不随记录的先后变化。从未获取过元数据的键
+    值为未知，升序和降序时都排在最后。
+    """
+    
+    SORT_COLUMNS = ("key", "type", "ttl", "size")
+    
+    # 类型按名称顺序编码，模块类型等其他类型排在其后
+    TYPE_CODES = {name: code for code, name in enumerate(("hash", "list", "set", "stream", "string", "zset"))}
+    OTHER_TYPE = 254
+    UNKNOWN_TYPE = 255
+    UNKNOWN = 2 ** 62
+    # 永不过期的键排在有过期时间的键之后
+    PERSISTENT = UNKNOWN - 1
+    
+    def __init__(self, store):
+        self.store = store
+        self.types = array('B')
+        self.expires = array('q')
+        self.sizes = array('q')
+        self.lock = threading.Lock()
+        # 全部键的键名升序，键名不会改变；扫描结束后预先计算，键列表增长后由 update_name_order 增量扩展
+        self.name_order = None
+        # 后台补全已处理到的键序号，之前的键都已获取过元数据（已删除或读取失败的仍为未知）
+        self.filled = 0
+    
+    def _ensure(self, length):
+        """把各数组用未知值补齐到 length"""
+        missing = length - len(self.types)
+        if missing > 0:
+            self.types.extend(array('B', [self.UNKNOWN_TYPE]) * missing)
+            self.expires.extend(array('q', [self.UNKNOWN]) * missing)
+            self.sizes.extend(array('q', [self.UNKNOWN]) * missing)
+    
+    def record(self, rows, indexes=None):
+        """记录一批行的元数据，超时或出错的行以及不在键列表中的键被忽略
+        
+        indexes 为各行键的序号（调用方已知时传入，如按序号补全时），省去逐键的哈希查找。
+        """
+        store = self.store
+        now = int(time.time())
+        if indexes is None:
+            indexes = store.find_many([row['key'] for row in rows])
+        type_codes = self.TYPE_CODES
+        other_type, unknown_type = self.OTHER_TYPE, self.UNKNOWN_TYPE
+        unknown, persistent = self.UNKNOWN, self.PERSISTENT
+        with self.lock:
+            self._ensure(len(store))
+            types, expires, sizes = self.types, self.expires, self.sizes
+            for row, index in zip(rows, indexes):
+                ttl = row['ttl']
+                data_type = row['type']
+                if index < 0 or not isinstance(ttl, int) or data_type in ("timeout", "error"):
+                    continue
+                if data_type == "none":
+                    # 键已不存在
+                    types[index] = unknown_type
+                    expires[index] = sizes[index] = unknown
+                    continue
+                types[index] = type_codes.get(data_type, other_type)
+                if ttl > 0:
+                    expires[index] = now + ttl
+                else:
+                    expires[index] = persistent if ttl == -1 else unknown
+                size = row['size']
+                sizes[index] = size if isinstance(size, int) else unknown
+    
+    def known_count(self):
+        """已记录元数据的键数"""
+        with self.lock:
+            return len(self.types) - self.types.count(self.UNKNOWN_TYPE)
+    
+    def is_complete(self):
+        """后台补全是否已处理完键列表中的全部键"""
+        return self.filled >= len(self.store)
+    
+    def missing(self, start, limit):
+        """从序号 start 起查找最多 limit 个还没有元数据的键，返回 (键序号列表, 下次查找的起点)"""
+        with self.lock:
+            types = self.types
+            recorded = len(types)
+            length = len(self.store)
+            indexes = []
+            index = start
+            while index < length and len(indexes) < limit:
+                if index >= recorded or types[index] == self.UNKNOWN_TYPE:
+                    indexes.append(index)
+                index += 1
+        return indexes, index
+    
+    def update_name_order(self):
+        """把键名顺序扩展到键列表中的全部键并返回
+        
+        新增的键不多时逐个二分插入；否则对新键排序后与已有顺序合并，已有部分是一个有序段，
+        timsort 只需线性合并。键名按原始字节比较，不解码。
+        """
+        store = self.store
+        length = len(store)
+        order = self.name_order
+        covered = 0 if order is None else len(order)
+        if covered >= length:
+            return order
+        if order is not None and length - covered <= max(covered >> 8, 64):
+            # 在副本上插入，其他线程持有的旧顺序不受影响
+            order = order[:]
+            raw_key = store.raw_key
+            for index in range(covered, length):
+                name = raw_key(index)
+                low, high = 0, len(order)
+                while low < high:
+                    middle = (low + high) // 2
+                    if raw_key(order[middle]) < name:
+                        low = middle + 1
+                    else:
+                        high = middle
+                order.insert(low, index)
+        else:
+            names = store.raw_keys()
+            merged = sorted(range(covered, length), key=names.__getitem__)
+            if order is not None:
+                merged = sorted(order.tolist() + merged, key=names.__getitem__)
+            order = array('I', merged)
+        self.name_order = order
+        return order
+    
+    def sort(self, column, indexes, descending=False):
+        """返回 indexes 中的键序号按列排序后的 array('I')
+        
+        排序键是类型化数组的 __getitem__，比较在C层完成；未知值在升序结果的末尾，
+        降序时只翻转已知部分，未知值仍在最后。按键名排序全部键时直接复制预先计算的键名顺序，
+        对部分键（如搜索结果）排序时若键名顺序已就绪，按它筛选出这些键。
+        """
+        store = self.store
+        if column == "key" and isinstance(indexes, range) and len(indexes) == len(store):
+            order = self.update_name_order()[:]
+            if descending:
+                order.reverse()
+            return order
+        name_order = self.name_order
+        if column == "key" and name_order is not None and len(name_order) == len(store):
+            selected = bytearray(len(store))
+            for index in indexes:
+                selected[index] = 1
+            order = array('I', [index for index in name_order if selected[index]])
+            if descending:
+                order.reverse()
+            return order
+        if column == "key":
+            values = self.store.raw_keys()
+            unknown = None
+        else:
+            with self.lock:
+                values = {"type": self.types, "ttl": self.expires, "size": self.sizes}[column][:]
+            unknown = self.UNKNOWN_TYPE if column == "type" else self.UNKNOWN
+            missing = len(self.store) - len(values)
+            if missing > 0:
+                values.extend(array(values.typecode, [unknown]) * missing)
+        
+        order = array('I', sorted(indexes, key=values.__getitem__))
+        if not descending:
+            return order
+        known = len(order)
+        if unknown is not None:
+            low, high = 0, len(order)
+            while low < high:
+                middle = (low + high) // 2
+                if values[order[middle]] < unknown:
+                    low = middle + 1
+                else:
+                    high = middle
+            known = low
+        result = order[:known]
+        result.reverse()
+        result.extend(order[known:])
+        return result
+
+
+class AdaptiveScanController:
+    """根据实测往返延迟自适应调整SCAN的COUNT
+    
+    单次SCAN耗时 ≈ 网络往返 + 服务器遍历COUNT个槽位的时间。以观测到的最小耗时
+    作为网络往返基线，只让超出基线的服务器耗时逼近延迟预算：高延迟链路上
+    COUNT会增大以摊薄往返开销，繁忙分片上COUNT会减小并在两次调用间让出时间。
+    """
+    
+    def __init__(self, server_budget=0.02, initial_count=1000, min_count=100, max_count=50000):
+        self.server_budget = server_budget
+        self.count = initial_count
+        self.min_count = min_count
+        self.max_count = max_count
+        self.base_latency = None
+        self.latency = None
+        self.server_time = 0.0
+        self.pause = 0.0
+        self.keys_returned = 0
+        self.started = time.perf_counter()
+    
+    def record(self, elapsed, returned):
+        """记录一次SCAN调用的耗时和返回键数，并调整下一次的COUNT"""
+        if self.base_latency is None or elapsed < self.base_latency:
+            self.base_latency = elapsed
+        self.latency = elapsed if self.latency is None else self.latency * 0.7 + elapsed * 0.3
+        self.keys_returned += returned
+        
+        # 服务器耗时按平滑后的延迟估算，每次最多翻倍或减半
+        self.server_time = max(self.latency - self.base_latency, 0.0)
+        ratio = self.server_budget / max(self.server_time, 0.001)
+        ratio = min(2.0, max(0.5, ratio))
+        self.count = int(min(self.max_count, max(self.min_count, self.count * ratio)))
+        
+        # 超出预算说明服务器繁忙，按超出部分暂停
+        self.pause = min(self.server_time - self.server_budget, 0.1) if self.server_time > self.server_budget else 0.0
+    
+    @property
+    def throughput(self):
+        """自开始以来的平均键吞吐量（键/秒）"""
+        elapsed = time.perf_counter() - self.started
+        return self.keys_returned / elapsed if elapsed > 0 else 0.0
+    
+    def describe(self):
+        """状态栏显示的扫描参数和吞吐量"""
+        latency_ms = (self.latency or 0.0) * 1000
+        return f"COUNT={self.count}, 延迟 {latency_ms:.0f}ms, {self.throughput:.0f} 键/秒"
+
+
+# 服务器端元数据收集脚本：一次调用返回每个键的 类型、PTTL、长度、字符串预览
+METADATA_LUA_SCRIPT = """
+local preview_bytes = tonumber(ARGV[1])
+local length_commands = {list = 'LLEN', set = 'SCARD', zset = 'ZCARD', hash = 'HLEN'}
+local result = {}
+for _, key in ipairs(KEYS) do
+    local key_type = redis.call('TYPE', key)['ok']
+    local size = 0
+    local preview = ''
+    if key_type == 'string' then
+        size = redis.call('STRLEN', key)
+        preview = redis.call('GETRANGE', key, 0, preview_bytes - 1)
+    elseif length_commands[key_type] then
+        size = redis.call(length_commands[key_type], key)
+    end
+    result[#result + 1] = key_type
+    result[#result + 1] = redis.call('PTTL', key)
+    result[#result + 1] = size
+    result[#result + 1] = preview
+end
+return result
+"""
+
+
+def reply_text(value):
+    """把二进制安全模式下的字节回复（键名、类型名、频道名等）转换为 str，str 原样返回
+    
+    不是有效UTF-8的字节以 surrogateescape 方式保留，作为命令参数发回时还原为原始字节。
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'surrogateescape')
+    return value
+
+
+# 显示时转义的控制字符（保留制表符和换行）
+CONTROL_ESCAPES = {code: f"\\x{code:02x}" for code in [*range(32), 127] if chr(code) not in "\t\n\r"}
+
+
+def display_text(value):
+    """转换为界面可显示的文本：不是有效UTF-8的字节和控制字符显示为 \\xNN 转义"""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'backslashreplace').translate(CONTROL_ESCAPES)
+    if isinstance(value, str):
+        try:
+            value.encode('utf-8')
+        except UnicodeEncodeError:
+            # reply_text 保留下来的原始字节
+            value = value.encode('utf-8', 'surrogateescape').decode('utf-8', 'backslashreplace')
+        return value.translate(CONTROL_ESCAPES)
+    return str(value)
+
+
+class TransferCounter:
+    """统计一次页面加载收到的回复字节数（近似值，多个工作线程可同时累加）"""
+    
+    def __init__(self):
+        self.bytes = 0
+        self.lock = threading.Lock()
+    
+    def add(self, *replies):
+        size = sum(self.reply_size(reply) for reply in replies)
+        with self.lock:
+            self.bytes += size
+    
+    def reply_size(self, reply):
+        """估算一个回复的有效载荷字节数"""
+        if isinstance(reply, str):
+            return len(reply.encode('utf-8'))
+        if isinstance(reply, bytes):
+            return len(reply)
+        if isinstance(reply, (list, tuple)):
+            return sum(self.reply_size(item) for item in reply)
+        if reply is None:
+            return 0
+        return len(str(reply))
+
+
+class RowMetadataCache:
+    """按键名缓存行元数据的LRU缓存，翻回已加载的页面时无需访问Redis
+    
+    每个条目记录获取时间，读取时按经过的时间在客户端重新计算TTL；
+    超过 max_age 秒或TTL已到期的条目视为未命中。设置了 tracker（ClientTracker）时，
+    在 CLIENT TRACKING 保护下读取的行不受 max_age 限制，直到收到失效通知。
+    后台预取线程也会写入，所以所有访问都加锁。
+    """
+    
+    def __init__(self, max_entries=20000, max_age=60):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.tracker = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+    
+    def get(self, key, need_memory=False):
+        """返回缓存行的副本（TTL已按当前时间修正），未命中返回 None
+        
+        need_memory 为 True 时，没有内存占用数据的条目视为未命中。
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            row, fetched_at, tracked = entry
+            age = time.monotonic() - fetched_at
+            if (age > self.max_age and not tracked) or (row['ttl'] > 0 and age >= row['ttl']):
+                del self.entries[key]
+                return None
+            if need_memory and 'memory' not in row:
+                return None
+            self.entries.move_to_end(key)
+        
+        row = dict(row)
+        if row['ttl'] > 0:
+            row['ttl'] -= int(age)
+        return row
+    
+    def put(self, row):
+        """写入一行，超出容量时淘汰最久未使用的条目；超时或出错的行不缓存
+        
+        带 tracking 读取序号的行在读取期间已收到失效通知时也不缓存。
+        """
+        if not isinstance(row['ttl'], int) or row['type'] in ("timeout", "error"):
+            return
+        mark = row.get('tracking')
+        tracked = mark is not None and self.tracker is not None and self.tracker.is_fresh(row['key'], mark)
+        if mark is not None and not tracked:
+            return
+        with self.lock:
+            self.entries[row['key']] = (row, time.monotonic(), tracked)
+            self.entries.move_to_end(row['key'])
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def invalidate(self, *keys):
+        """删除指定键的缓存（键被修改或删除后调用）"""
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ClientTracker:
+    """客户端缓存的失效通知：CLIENT TRACKING 的RESP2重定向模式
+    
+    redis-py 4.5.4 不支持RESP3推送，因此用一个专用连接订阅 __redis__:invalidate，
+    读取数据的连接在读取前执行 CLIENT TRACKING ON REDIRECT <专用连接ID>（默认模式，
+    服务器只记录这些连接读过的键），键被修改、删除或过期时服务器向专用连接发送失效消息。
+    每次读取前用 begin() 取一个序号，写入缓存前用 is_fresh() 确认读取期间键没有失效。
+    专用连接断开时失效消息可能丢失，on_invalidate(None) 清空所有缓存，重连后以新ID继续。
+    """
+    
+    RECONNECT_DELAY = 2
+    PING_INTERVAL = 30
+    # 失效记录超过该数量时整体丢弃，之前开始的读取都视为已失效
+    MAX_INVALIDATED = 10000
+    
+    def __init__(self, connection_factory, on_invalidate, on_status):
+        self.connection_factory = connection_factory
+        self.on_invalidate = on_invalidate
+        self.on_status = on_status
+        self.redirect_id = None
+        self.unavailable_reason = None
+        self.sequence = 0
+        self.floor = 0
+        self.invalidated = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+    
+    def start(self):
+        threading.Thread(target=self.listen, daemon=True).start()
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def begin(self):
+        """开始一次受跟踪的读取，返回 (读取序号, CLIENT TRACKING命令)；未开启时返回 (None, None)"""
+        with self.lock:
+            if self.redirect_id is None:
+                return None, None
+            return self.sequence, ("CLIENT", "TRACKING", "ON", "REDIRECT", self.redirect_id)
+    
+    def is_fresh(self, key, mark):
+        """序号为 mark 的读取开始后，键是否没有失效过"""
+        with self.lock:
+            return mark >= self.floor and self.invalidated.get(key, 0) <= mark
+    
+    def invalidate(self, keys):
+        """记录失效的键（None 表示全部，如 FLUSHDB）并通知缓存"""
+        with self.lock:
+            self.sequence += 1
+            if keys is None or len(self.invalidated) + len(keys) > self.MAX_INVALIDATED:
+                self.floor = self.sequence
+                self.invalidated.clear()
+            else:
+                for key in keys:
+                    self.invalidated[key] = self.sequence
+        self.on_invalidate(keys)
+    
+    def deactivate(self):
+        """失效通知不再可靠：停止新的受跟踪读取，之前的读取全部作废"""
+        with self.lock:
+            self.redirect_id = None
+        self.invalidate(None)
+    
+    def disable(self, reason):
+        """服务器拒绝 CLIENT TRACKING 时关闭客户端缓存"""
+        if self.unavailable_reason is None:
+            self.unavailable_reason = reason
+            self.on_status(f"服务器不支持客户端缓存跟踪，已关闭: {reason}")
+        self.stop()
+        self.deactivate()
+    
+    def listen(self):
+        """维持订阅失效频道的专用连接，直到 stop() 被调用"""
+        reconnecting = False
+        while not self.stop_event.is_set():
+            connection = None
+            try:
+                connection = self.connection_factory()
+                connection.connect()
+                connection.send_command("CLIENT", "ID")
+                client_id = connection.read_response()
+                connection.send_command("SUBSCRIBE", "__redis__:invalidate")
+                connection.read_response()
+                with self.lock:
+                    self.redirect_id = client_id
+                if reconnecting:
+                    self.on_status("客户端缓存失效通知已重新连接")
+                    reconnecting = False
+                
+                last_ping = time.monotonic()
+                while not self.stop_event.is_set():
+                    if connection.can_read(timeout=1.0):
+                        message = connection.read_response()
+                        # ['message', '__redis__:invalidate', 键列表或None]，PING的回复是 ['pong', '']
+                        if message[0] in ("message", b"message"):
+                            keys = message[2]
+                            self.invalidate(None if keys is None else [reply_text(key) for key in keys])
+                    elif time.monotonic() - last_ping > self.PING_INTERVAL:
+                        connection.send_command("PING")
+                        last_ping = time.monotonic()
+            except (redis.ConnectionError, redis.TimeoutError, OSError) as e:
+                if not self.stop_event.is_set():
+                    reconnecting = True
+                    self.on_status(f"客户端缓存失效通知连接断开，缓存已清空: {str(e)}")
+            except redis.ResponseError as e:
+                self.disable(str(e))
+            finally:
+                self.deactivate()
+                if connection:
+                    connection.disconnect()
+            self.stop_event.wait(self.RECONNECT_DELAY)
+
+
+class ValueCache:
+    """值详情窗口内容的客户端缓存，按内容总字节数淘汰最久未使用的键
+    
+    只缓存在 CLIENT TRACKING 保护下读取的内容（写入前用 tracker.is_fresh 确认），之后由
+    失效通知删除，因此命中的内容与服务器一致。同一键的不同读取方式（类型、是否完整）分别缓存。
+    """
+    
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.tracker = None
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key, data_type, full):
+        with self.lock:
+            variants = self.entries.get(key)
+            if not variants or (data_type, full) not in variants:
+                return None
+            self.entries.move_to_end(key)
+            return variants[(data_type, full)][0]
+    
+    def put(self, key, data_type, full, result, mark):
+        """写入 read_value 的结果 (长度, 内容)；mark 为读取序号，None 表示未受跟踪保护"""
+        if mark is None or self.tracker is None or not self.tracker.is_fresh(key, mark):
+            return
+        content = result[1]
+        size = TransferCounter().reply_size(list(content.items()) if isinstance(content, dict) else content)
+        if size > self.max_bytes // 4:
+            return
+        with self.lock:
+            variants = self.entries.setdefault(key, {})
+            if (data_type, full) in variants:
+                self.bytes -= variants[(data_type, full)][1]
+            variants[(data_type, full)] = (result, size)
+            self.bytes += size
+            self.entries.move_to_end(key)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= sum(item_size for _, item_size in evicted.values())
+    
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                variants = self.entries.pop(key, None)
+                if variants:
+                    self.bytes -= sum(item_size for _, item_size in variants.values())
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+
+class CollectionWindow:
+    """值详情窗口中集合类型的按窗口读取，内存占用与集合大小无关
+    
+    列表和有序集合按下标用 LRANGE/ZRANGE 读取 WINDOW_SIZE 项的窗口，可以直接读取任意位置；
+    集合和哈希表用 SSCAN/HSCAN 按游标顺序读取，记录每个窗口的起点 (游标, 跳过数)，
+    远处的窗口要从已知的最后一个起点向后扫描。只保留最近访问的 MAX_WINDOWS 个窗口，
+    无序类型另外为每个窗口保存一个起点（16字节）。
+    读取在单个后台线程中按请求顺序进行，滚动经过后不再需要的窗口在读取前跳过；
+    每读完一个窗口在后台线程中调用 on_loaded()，出错时调用 on_error(异常)。
+    传入 engine（AsyncRedisEngine）时命令在其事件循环中执行，与页面加载共用异步连接池。
+    """
+    
+    WINDOW_SIZE = 200
+    MAX_WINDOWS = 10
+    # 仍需读取的最近请求的窗口数（可见行加预渲染行最多跨两个窗口）
+    WANTED_WINDOWS = 4
+    ORDERED_TYPES = ("list", "zset")
+    LENGTH_COMMANDS = {"list": "LLEN", "zset": "ZCARD", "set": "SCARD", "hash": "HLEN"}
+    
+    def __init__(self, client, key, data_type, on_loaded, on_error, engine=None):
+        self.client = client
+        self.engine = engine
+        self.key = key
+        self.data_type = data_type
+        self.on_loaded = on_loaded
+        self.on_error = on_error
+        self.ordered = data_type in self.ORDERED_TYPES
+        # 元素总数：读取长度前为 None，无序类型扫描结束后修正为实际读到的数量
+        self.length = None
+        self.windows = OrderedDict()
+        self.pending = set()
+        self.wanted = deque(maxlen=self.WANTED_WINDOWS)
+        self.scan_cursors = array('Q', [0])
+        self.scan_skips = array('I', [0])
+        self.scan_finished = False
+        self.closed = False
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+    
+    def start(self):
+        """在后台读取元素总数"""
+        self.executor.submit(self.load_length)
+    
+    def close(self):
+        """窗口关闭后不再读取，已排队的请求直接跳过"""
+        with self.lock:
+            self.closed = True
+            self.windows.clear()
+        self.executor.shutdown(wait=False)
+    
+    def call(self, method, *args, **kwargs):
+        """执行一个读取命令（在后台线程中调用）：有asyncio引擎时在其事件循环中执行并等待结果"""
+        if self.engine is not None:
+            return self.engine.run(getattr(self.engine.client, method)(*args, **kwargs))
+        return getattr(self.client, method)(*args, **kwargs)
+    
+    def load_length(self):
+        try:
+            length = self.call("execute_command", self.LENGTH_COMMANDS[self.data_type], self.key)
+        except Exception as e:
+            self.on_error(e)
+            return
+        with self.lock:
+            if self.closed:
+                return
+            self.length = length
+        self.on_loaded()
+    
+    def item(self, index):
+        """返回第 index 项的元组（列表/集合为 (值,)，有序集合为 (成员, 分数)，哈希表为 (字段, 值)）
+        
+        所在窗口尚未读取时返回 None 并在后台请求该窗口；集合在读取后变短、该位置已没有元素时返回 ()。
+        """
+        window, offset = divmod(index, self.WINDOW_SIZE)
+        with self.lock:
+            items = self.windows.get(window)
+            if items is not None:
+                self.windows.move_to_end(window)
+                return items[offset] if offset < len(items) else ()
+            if window in self.wanted:
+                self.wanted.remove(window)
+            self.wanted.append(window)
+            if window in self.pending or self.closed:
+                return None
+            self.pending.add(window)
+        self.executor.submit(self.load_window, window)
+        return None
+    
+    def cached_count(self):
+        """当前缓存的元素数"""
+        with self.lock:
+            return sum(len(items) for items in self.windows.values())
+    
+    def still_wanted(self, window):
+        with self.lock:
+            return not self.closed and window in self.wanted
+    
+    def store_window(self, window, items):
+        """写入一个窗口（调用方持有锁），超出 MAX_WINDOWS 时淘汰最久未访问的窗口"""
+        self.windows[window] = items
+        self.windows.move_to_end(window)
+        while len(self.windows) > self.MAX_WINDOWS:
+            self.windows.popitem(last=False)
+    
+    def load_window(self, window):
+        """读取一个窗口（在后台线程中执行）"""
+        if not self.still_wanted(window):
+            with self.lock:
+                self.pending.discard(window)
+            return
+        try:
+            if self.ordered:
+                items = self.read_range(window)
+            else:
+                items = self.read_scan_window(window)
+        except Exception as e:
+            with self.lock:
+                self.pending.discard(window)
+            self.on_error(e)
+            return
+        with self.lock:
+            self.pending.discard(window)
+            if items is None or self.closed:
+                return
+            self.store_window(window, items)
+        self.on_loaded()
+    
+    def read_range(self, window):
+        """有序类型：按下标读取一个窗口"""
+        start = window * self.WINDOW_SIZE
+        end = start + self.WINDOW_SIZE - 1
+        if self.data_type == "zset":
+            return self.call("zrange", self.key, start, end, withscores=True)
+        return [(value,) for value in self.call("lrange", self.key, start, end)]
+    
+    def scan_batch(self, cursor):
+        """无序类型：一次SSCAN/HSCAN，返回 (下一游标, 元素元组列表)"""
+        if self.data_type == "hash":
+            cursor, fields = self.call("hscan", self.key, cursor, count=self.WINDOW_SIZE)
+            return cursor, list(fields.items())
+        cursor, members = self.call("sscan", self.key, cursor, count=self.WINDOW_SIZE)
+        return cursor, [(member,) for member in members]
+    
+    def read_scan_window(self, window):
+        """无序类型：从已知的最后一个起点向后扫描到目标窗口，途经的窗口也写入缓存
+        
+        同一游标和COUNT的SCAN在集合不变时返回相同批次，因此窗口起点记录为 (游标, 跳过数)。
+        扫描途中目标窗口不再需要时放弃并返回 None，已推进的起点保留。
+        """
+        while True:
+            with self.lock:
+                known = len(self.scan_cursors) - 1
+                if window > known and self.scan_finished:
+                    return []
+                current = min(window, known)
+                cursor, skip = self.scan_cursors[current], self.scan_skips[current]
+            
+            items, next_start = self.scan_from(cursor, skip)
+            with self.lock:
+                if current == len(self.scan_cursors) - 1:
+                    if next_start is None:
+                        self.scan_finished = True
+                        self.length = current * self.WINDOW_SIZE + len(items)
+                    else:
+                        self.scan_cursors.append(next_start[0])
+                        self.scan_skips.append(next_start[1])
+                if current == window:
+                    return items
+                self.store_window(current, items)
+            if not self.still_wanted(window):
+                return None
+    
+    def scan_from(self, cursor, skip):
+        """从起点读取一个窗口的元素，返回 (元素列表, 下一窗口的起点)，扫描结束时起点为 None"""
+        items = []
+        while True:
+            next_cursor, batch = self.scan_batch(cursor)
+            available = batch[skip:]
+            needed = self.WINDOW_SIZE - len(items)
+            if len(available) > needed:
+                # 本批次超出窗口，下一窗口从同一游标跳过已取的元素开始
+                items.extend(available[:needed])
+                return items, (cursor, skip + needed)
+            items.extend(available)
+            skip = 0
+            cursor = next_cursor
+            if cursor == 0:
+                return items, None
+            if len(items) == self.WINDOW_SIZE:
+                return items, (cursor, 0)
+
+
+class KeyMetadataFetcher:
+    """批量获取键的元数据（类型、TTL、值预览、大小），与界面无关，可单独做基准测试
+    
+    每行结果是一个字典：key、type、value、ttl、size。
+    字符串只用 GETRANGE 读取预览所需的字节，并用 STRLEN 获取长度，不下载完整值。
+    二进制安全模式（decode_responses=False）下字符串的 value 保留为预览的原始字节，
+    由 format_bytes_preview 在界面渲染该行时才解码。
+    各方法的 counter 参数为 TransferCounter，用于统计传输字节数。
+    """
+    
+    # 预览显示的字符数
+    PREVIEW_LENGTH = 100
+    
+    # 预览读取的字节数：UTF-8每个字符最多4字节，保证能取满预览长度
+    PREVIEW_BYTES = PREVIEW_LENGTH * 4
+    
+    # 各类型在第二阶段使用的长度命令
+    LENGTH_COMMANDS = {
+        "list": ("LLEN", "List ({} items)"),
+        "set": ("SCARD", "Set ({} members)"),
+        "zset": ("ZCARD", "ZSet ({} members)"),
+        "hash": ("HLEN", "Hash ({} fields)"),
+    }
+    
+    # 单次EVALSHA最多处理的键数，限制脚本阻塞服务器的时间
+    LUA_BATCH_LIMIT = 200
+    
+    # 加载页面时每批的键数上限，以及多线程加载时每批的最少键数
+    PAGE_BATCH_SIZE = 500
+    MIN_PARALLEL_BATCH = 50
+    
+    # MEMORY USAGE 对集合类型抽样的元素数（0 表示统计全部元素，大集合上很慢）
+    MEMORY_SAMPLES = 5
+    
+    def __init__(self, client):
+        self.client = client
+        self.lua_sha = None
+        self.lua_unavailable_reason = None
+        self.memory_unavailable_reason = None
+        # 客户端缓存的失效跟踪（ClientTracker），为 None 时不登记跟踪
+        self.tracker = None
+    
+    def make_row(self, key, data_type, value, ttl, size):
+        """构造一行元数据"""
+        return {'key': key, 'type': data_type, 'value': value, 'ttl': ttl, 'size': size}
+    
+    def format_range_preview(self, preview, size):
+        """由值开头的字节片段和STRLEN长度生成预览文本；二进制安全模式下原样返回字节"""
+        if isinstance(preview, bytes):
+            return preview
+        value_text = preview[:self.PREVIEW_LENGTH]
+        if len(preview) > self.PREVIEW_LENGTH or size > self.PREVIEW_BYTES:
+            value_text += "..."
+        return value_text
+    
+    @classmethod
+    def format_bytes_preview(cls, preview, size):
+        """把预览的原始字节解码为显示文本，不是有效UTF-8的字节和控制字符显示为 \\xNN
+        
+        预览被截断时末尾可能是不完整的多字节字符，增量解码器不输出这部分。
+        """
+        truncated = not isinstance(size, int) or size > len(preview)
+        decoder = codecs.getincrementaldecoder('utf-8')('backslashreplace')
+        value_text = decoder.decode(preview, final=not truncated).translate(CONTROL_ESCAPES)
+        if truncated or len(value_text) > cls.PREVIEW_LENGTH:
+            value_text = value_text[:cls.PREVIEW_LENGTH] + "..."
+        return value_text
+    
+    def value_preview(self, key, data_type, counter=None):
+        """单个键的值预览和大小（每个键一次同步往返）"""
+        try:
+            if data_type == "string":
+                pipe = self.client.pipeline(transaction=False)
+                pipe.strlen(key)
+                pipe.getrange(key, 0, self.PREVIEW_BYTES - 1)
+                size, preview = pipe.execute()
+                if counter:
+                    counter.add(size, preview)
+                return self.format_range_preview(preview, size), size
+            if data_type in self.LENGTH_COMMANDS:
+                command, template = self.LENGTH_COMMANDS[data_type]
+                length = self.client.execute_command(command, key)
+                if counter:
+                    counter.add(length)
+                return template.format(length), length
+            return f"Unknown type: {data_type}", 0
+        except redis.TimeoutError:
+            return "获取超时", 0
+        except Exception as e:
+            return f"错误: {str(e)}", 0
+    
+    def split_batches(self, keys, workers=1):
+        """把一页的键拆成批次：多线程时让每个线程至少分到一批，但批次不小于 MIN_PARALLEL_BATCH"""
+        per_worker = -(-len(keys) // max(1, workers))
+        batch_size = min(self.PAGE_BATCH_SIZE, max(self.MIN_PARALLEL_BATCH, per_worker))
+        return [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+    
+    # 以下 queue_* 方法只向pipeline添加命令，parse_* 方法解析回复，不执行网络操作；
+    # 同步和 redis.asyncio 的pipeline排队命令的方式相同，两种引擎共用这些方法
+    
+    def queue_tracking(self, pipe):
+        """开启客户端缓存时，在pipeline开头为本连接开启 CLIENT TRACKING，返回读取序号（未开启为 None）"""
+        if not self.tracker:
+            return None
+        mark, command = self.tracker.begin()
+        if mark is not None:
+            pipe.execute_command(*command)
+        return mark
+    
+    def parse_tracking(self, results, mark):
+        """去掉 CLIENT TRACKING 的回复并返回 (其余回复, 读取序号)
+        
+        带跟踪命令的pipeline以 raise_on_error=False 执行，这里再抛出其余命令的第一个错误；
+        服务器拒绝跟踪时关闭客户端缓存，序号返回 None。
+        """
+        if mark is None:
+            return results, None
+        reply, results = results[0], results[1:]
+        error = next((result for result in results if isinstance(result, Exception)), None)
+        if error:
+            raise error
+        if isinstance(reply, Exception):
+            self.tracker.disable(str(reply))
+            return results, None
+        return results, mark
+    
+    def mark_tracked(self, rows, mark):
+        """为受跟踪读取的行记录读取序号，供 RowMetadataCache 判断能否长期缓存"""
+        if mark is not None:
+            for row in rows:
+                row['tracking'] = mark
+        return rows
+    
+    def track_keys(self, keys):
+        """在开启跟踪的连接上读取键类型，使这些键之后的修改都会收到失效通知，返回读取序号"""
+        pipe = self.client.pipeline(transaction=False)
+        mark = self.queue_tracking(pipe)
+        if mark is None:
+            return None
+        for key in keys:
+            pipe.type(key)
+        return self.parse_tracking(pipe.execute(raise_on_error=False), mark)[1]
+    
+    def queue_type_ttl(self, pipe, keys, known_type=None):
+        """第一阶段命令：类型（已知时省略）和TTL"""
+        for key in keys:
+            if not known_type:
+                pipe.type(key)
+            pipe.ttl(key)
+    
+    def parse_type_ttl(self, keys, results, known_type=None, counter=None):
+        """解析第一阶段回复为 (类型, TTL) 列表"""
+        if counter:
+            counter.add(results)
+        if known_type:
+            return [(known_type, ttl) for ttl in results]
+        return [(reply_text(results[i * 2]), results[i * 2 + 1]) for i in range(len(keys))]
+    
+    def queue_previews(self, pipe, keys, type_ttls):
+        """第二阶段命令：字符串的STRLEN和GETRANGE，集合类型的长度命令"""
+        for key, (data_type, _) in zip(keys, type_ttls):
+            if data_type == "string":
+                pipe.strlen(key)
+                pipe.getrange(key, 0, self.PREVIEW_BYTES - 1)
+            elif data_type in self.LENGTH_COMMANDS:
+                pipe.execute_command(self.LENGTH_COMMANDS[data_type][0], key)
+    
+    def parse_previews(self, keys, type_ttls, replies, counter=None):
+        """由第二阶段回复（raise_on_error=False）生成行元数据"""
+        if counter:
+            counter.add(*[reply for reply in replies if not isinstance(reply, Exception)])
+        replies = iter(replies)
+        
+        rows = []
+        for key, (data_type, ttl) in zip(keys, type_ttls):
+            if data_type == "string":
+                size, preview = next(replies), next(replies)
+                error = next((reply for reply in (size, preview) if isinstance(reply, Exception)), None)
+                if error:
+                    rows.append(self.make_row(key, data_type, f"错误: {str(error)}", ttl, 0))
+                else:
+                    rows.append(self.make_row(key, data_type, self.format_range_preview(preview, size), ttl, size))
+            elif data_type in self.LENGTH_COMMANDS:
+                reply = next(replies)
+                if isinstance(reply, Exception):
+                    rows.append(self.make_row(key, data_type, f"错误: {str(reply)}", ttl, 0))
+                else:
+                    template = self.LENGTH_COMMANDS[data_type][1]
+                    rows.append(self.make_row(key, data_type, template.format(reply), ttl, reply))
+            else:
+                rows.append(self.make_row(key, data_type, f"Unknown type: {data_type}", ttl, 0))
+        return rows
+    
+    def queue_memory_usage(self, pipe, keys, samples=None):
+        """MEMORY USAGE key SAMPLES n"""
+        samples = self.MEMORY_SAMPLES if samples is None else samples
+        for key in keys:
+            pipe.memory_usage(key, samples=samples)
+    
+    def parse_memory_usage(self, replies, counter=None):
+        """解析MEMORY USAGE回复，命令不可用时记录原因并返回 None"""
+        # 所有命令都被拒绝说明服务器不支持该命令（不存在的键返回的是空值而不是错误）
+        if replies and all(isinstance(reply, redis.ResponseError) for reply in replies):
+            self.memory_unavailable_reason = str(replies[0])
+            return None
+        if counter:
+            counter.add(*[reply for reply in replies if not isinstance(reply, Exception)])
+        return [None if isinstance(reply, Exception) else reply for reply in replies]
+    
+    def apply_memory_usage(self, rows, memory):
+        """把内存字节数列表写入各行；memory 为 None 时字符串用STRLEN字节数估算，其他类型无法估算"""
+        for i, row in enumerate(rows):
+            if memory is not None:
+                row['memory'], row['memory_estimated'] = memory[i], False
+            elif row['type'] == "string" and isinstance(row['size'], int):
+                row['memory'], row['memory_estimated'] = row['size'], True
+            else:
+                row['memory'], row['memory_estimated'] = None, False
+        return rows
+    
+    def fetch_type_ttl(self, keys, known_type=None, counter=None):
+        """第一阶段：一次pipeline获取所有键的类型和TTL"""
+        pipe = self.client.pipeline(transaction=False)
+        self.queue_type_ttl(pipe, keys, known_type)
+        return self.parse_type_ttl(keys, pipe.execute(), known_type, counter)
+    
+    def fetch_serial(self, keys, known_type=None, counter=None):
+        """逐键路径：pipeline获取类型和TTL后，逐个键同步获取预览（每键额外一次往返）"""
+        rows = []
+        for key, (data_type, ttl) in zip(keys, self.fetch_type_ttl(keys, known_type, counter)):
+            value_text, size = self.value_preview(key, data_type, counter)
+            rows.append(self.make_row(key, data_type, value_text, ttl, size))
+        return rows
+    
+    def fetch_pipelined(self, keys, known_type=None, counter=None):
+        """两阶段pipeline：第一阶段取类型和TTL，第二阶段按类型批量发送预览或长度命令
+        
+        无论批次多大，每批只需两次往返。
+        """
+        # 开启客户端缓存时第一阶段同时登记跟踪，之后这些键的任何修改都会收到失效通知
+        pipe = self.client.pipeline(transaction=False)
+        mark = self.queue_tracking(pipe)
+        self.queue_type_ttl(pipe, keys, known_type)
+        results, mark = self.parse_tracking(pipe.execute(raise_on_error=mark is None), mark)
+        type_ttls = self.parse_type_ttl(keys, results, known_type, counter)
+        
+        pipe = self.client.pipeline(transaction=False)
+        self.queue_previews(pipe, keys, type_ttls)
+        replies = pipe.execute(raise_on_error=False) if len(pipe) else []
+        return self.mark_tracked(self.parse_previews(keys, type_ttls, replies, counter), mark)
+    
+    def fetch_lua(self, keys, known_type=None, counter=None):
+        """用Lua脚本在服务器端收集元数据，每批只需一次往返
+        
+        键按 LUA_BATCH_LIMIT 拆成多次EVALSHA放在同一个pipeline里，服务器在两次调用之间
+        仍可处理其他客户端的命令。集群模式或服务器禁用脚本时退回两阶段pipeline。
+        """
+        if self.lua_unavailable_reason is None and isinstance(self.client, RedisCluster):
+            self.lua_unavailable_reason = "集群模式下批量键可能跨槽位"
+        if self.lua_unavailable_reason:
+            return self.fetch_pipelined(keys, known_type, counter)
+        
+        try:
+            try:
+                replies = self.run_lua_batches(keys)
+            except redis.exceptions.NoScriptError:
+                # 脚本缓存被清空（如故障转移后），重新加载一次
+                self.lua_sha = None
+                replies = self.run_lua_batches(keys)
+        except redis.ResponseError as e:
+            self.lua_unavailable_reason = str(e)
+            return self.fetch_pipelined(keys, known_type, counter)
+        if counter:
+            counter.add(replies)
+        
+        rows = []
+        for i, key in enumerate(keys):
+            data_type, pttl, size, preview = replies[i * 4:i * 4 + 4]
+            data_type = reply_text(data_type)
+            # 与TTL命令相同的取整方式
+            ttl = pttl if pttl < 0 else (pttl + 500) // 1000
+            if data_type == "string":
+                value_text = self.format_range_preview(preview, size)
+            elif data_type in self.LENGTH_COMMANDS:
+                value_text = self.LENGTH_COMMANDS[data_type][1].format(size)
+            else:
+                value_text = f"Unknown type: {data_type}"
+                size = 0
+            rows.append(self.make_row(key, data_type, value_text, ttl, size))
+        return rows
+    
+    def fetch_sort_metadata(self, keys, known_type=None, counter=None):
+        """只获取排序需要的类型、TTL和大小，两次往返，不读取值预览也不登记客户端缓存跟踪
+        
+        字符串用 STRLEN，集合类型用各自的长度命令，其他类型大小记为0（与 fetch_pipelined 相同）。
+        命令出错的键类型记为 error，KeyMetadataArrays.record 会忽略这些行。
+        """
+        pipe = self.client.pipeline(transaction=False)
+        self.queue_type_ttl(pipe, keys, known_type)
+        type_ttls = self.parse_type_ttl(keys, pipe.execute(), known_type, counter)
+        
+        pipe = self.client.pipeline(transaction=False)
+        for key, (data_type, _) in zip(keys, type_ttls):
+            if data_type == "string":
+                pipe.strlen(key)
+            elif data_type in self.LENGTH_COMMANDS:
+                pipe.execute_command(self.LENGTH_COMMANDS[data_type][0], key)
+        replies = pipe.execute(raise_on_error=False) if len(pipe) else []
+        if counter:
+            counter.add(*[reply for reply in replies if not isinstance(reply, Exception)])
+        replies = iter(replies)
+        
+        rows = []
+        for key, (data_type, ttl) in zip(keys, type_ttls):
+            size = next(replies) if data_type == "string" or data_type in self.LENGTH_COMMANDS else 0
+            if isinstance(size, Exception):
+                data_type = "error"
+            rows.append(self.make_row(key, data_type, "", ttl, size))
+        return rows
+    
+    def fetch_memory_usage(self, keys, samples=None, counter=None):
+        """一次pipeline获取各键实际占用的内存字节数（MEMORY USAGE key SAMPLES n）
+        
+        返回与 keys 对应的字节数列表，键不存在或单个命令出错时为 None。
+        服务器不支持或禁用该命令时记录原因并返回 None，由调用方改用估算值。
+        """
+        if self.memory_unavailable_reason:
+            return None
+        
+        pipe = self.client.pipeline(transaction=False)
+        self.queue_memory_usage(pipe, keys, samples)
+        return self.parse_memory_usage(pipe.execute(raise_on_error=False), counter)
+    
+    def add_memory_usage(self, rows, samples=None, counter=None):
+        """为已获取的行补充 memory 和 memory_estimated 字段
+        
+        MEMORY USAGE 不可用时，字符串用 STRLEN 字节数作为估算值，其他类型无法估算。
+        """
+        return self.apply_memory_usage(rows, self.fetch_memory_usage([row['key'] for row in rows], samples, counter))
+    
+    def run_lua_batches(self, keys):
+        """加载脚本（首次）并在一个pipeline中按批次执行EVALSHA，返回拼接后的结果"""
+        if self.lua_sha is None:
+            self.lua_sha = self.client.script_load(METADATA_LUA_SCRIPT)
+        
+        pipe = self.client.pipeline(transaction=False)
+        for i in range(0, len(keys), self.LUA_BATCH_LIMIT):
+            batch = keys[i:i + self.LUA_BATCH_LIMIT]
+            pipe.evalsha(self.lua_sha, len(batch), *batch, self.PREVIEW_BYTES)
+        
+        replies = []
+        for batch_reply in pipe.execute():
+            replies.extend(batch_reply)
+        return replies
+
+
+class AsyncRedisEngine:
+    """基于 redis.asyncio 的数据访问引擎
+    
+    事件循环运行在独立的守护线程中。界面线程用 submit 提交协程，完成后通过 dispatch
+    （通常是 UIUpdateDispatcher.post）回到Tk主线程回调；后台线程可用 run 阻塞等待结果。
+    页面元数据按批次并发发送pipeline，最多 max_in_flight 个pipeline同时在途，
+    成百上千个命令复用连接池中的少量连接。仅用于单机（非集群）连接。
+    """
+    
+    def __init__(self, connection_kwargs, dispatch, max_in_flight=4, reserved_connections=4):
+        self.dispatch = dispatch
+        self.max_in_flight = max_in_flight
+        self.batch_slots = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        
+        connection_kwargs = dict(connection_kwargs, max_connections=max_in_flight + reserved_connections)
+        self.client = self.run(self.create_client(connection_kwargs))
+        self.fetcher = KeyMetadataFetcher(self.client)
+    
+    async def create_client(self, connection_kwargs):
+        """在事件循环中创建客户端和并发批次信号量"""
+        self.batch_slots = asyncio.Semaphore(self.max_in_flight)
+        return redis.asyncio.Redis(**connection_kwargs)
+    
+    def run(self, coro, timeout=None):
+        """在事件循环中执行协程并阻塞等待结果（只能在后台线程中调用）"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+    
+    def submit(self, coro, on_done=None, on_error=None):
+        """提交协程，完成后在主线程回调 on_done(结果) 或 on_error(异常)"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        
+        def done(finished):
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            if error is None:
+                if on_done:
+                    self.dispatch(on_done, finished.result())
+            elif on_error:
+                self.dispatch(on_error, error)
+        
+        future.add_done_callback(done)
+        return future
+    
+    async def execute_pipeline(self, queue):
+        """queue(pipe) 向pipeline添加命令，一次往返执行后返回各命令的结果"""
+        pipe = self.client.pipeline(transaction=False)
+        queue(pipe)
+        return await pipe.execute()
+    
+    def close(self):
+        """关闭连接并停止事件循环（不等待）"""
+        async def shutdown():
+            try:
+                await self.client.close()
+            finally:
+                self.loop.stop()
+        
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop)
+    
+    async def scan(self, match, on_batch, stopped, key_type=None, type_supported=True, on_timeout=None):
+        """与 AzureRedisManager.scan_keyspace 相同的自适应SCAN循环，on_batch 在事件循环线程中调用"""
+        cursor = 0
+        scan_count = 0
+        scan_controller = AdaptiveScanController()
+        
+        while not stopped():
+            try:
+                started = time.perf_counter()
+                cursor, keys = await self.scan_by_type(cursor, match, scan_controller.count, key_type, type_supported)
+                scan_controller.record(time.perf_counter() - started, len(keys))
+            except redis.TimeoutError:
+                if on_timeout:
+                    on_timeout()
+                await asyncio.sleep(0.1)
+                continue
+            
+            scan_count += 1
+            on_batch(keys, scan_count, scan_controller.describe())
+            
+            if cursor == 0:
+                break
+            if scan_controller.pause:
+                await asyncio.sleep(scan_controller.pause)
+    
+    async def scan_by_type(self, cursor, match, count, key_type, type_supported):
+        """执行一次SCAN并按类型过滤（不支持SCAN TYPE时在客户端过滤）"""
+        if not key_type:
+            return await self.client.scan(cursor, match=match, count=count)
+        if type_supported:
+            return await self.client.scan(cursor, match=match, count=count, _type=key_type)
+        
+        cursor, keys = await self.client.scan(cursor, match=match, count=count)
+        if not keys:
+            return cursor, keys
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+        types = await pipe.execute()
+        return cursor, [key for key, data_type in zip(keys, types) if reply_text(data_type) == key_type]
+    
+    async def fetch_batch(self, keys, known_type=None, memory_samples=None, counter=None):
+        """一批键的行元数据，命令和结果与 KeyMetadataFetcher.fetch_pipelined 相同"""
+        fetcher = self.fetcher
+        pipe = self.client.pipeline(transaction=False)
+        mark = fetcher.queue_tracking(pipe)
+        fetcher.queue_type_ttl(pipe, keys, known_type)
+        results, mark = fetcher.parse_tracking(await pipe.execute(raise_on_error=mark is None), mark)
+        type_ttls = fetcher.parse_type_ttl(keys, results, known_type, counter)
+        
+        pipe = self.client.pipeline(transaction=False)
+        fetcher.queue_previews(pipe, keys, type_ttls)
+        replies = await pipe.execute(raise_on_error=False) if len(pipe) else []
+        rows = fetcher.parse_previews(keys, type_ttls, replies, counter)
+        
+        if memory_samples is not None:
+            memory = None
+            if not fetcher.memory_unavailable_reason:
+                pipe = self.client.pipeline(transaction=False)
+                fetcher.queue_memory_usage(pipe, keys, memory_samples)
+                memory = fetcher.parse_memory_usage(await pipe.execute(raise_on_error=False), counter)
+            fetcher.apply_memory_usage(rows, memory)
+        return fetcher.mark_tracked(rows, mark)
+    
+    async def fetch_rows(self, keys, known_type=None, memory_samples=None, counter=None,
+                         on_progress=None, stopped=None):
+        """并发获取多批键的行元数据，按键的顺序返回
+        
+        stopped() 返回 True 后不再发送新的批次，已取消的批次不返回行。
+        on_progress(已完成键数) 在事件循环线程中调用。
+        """
+        completed = 0
+        
+        async def run_batch(batch_keys):
+            nonlocal completed
+            async with self.batch_slots:
+                if stopped and stopped():
+                    return []
+                try:
+                    rows = await self.fetch_batch(batch_keys, known_type, memory_samples, counter)
+                except (redis.TimeoutError, asyncio.TimeoutError):
+                    rows = [self.fetcher.make_row(key, "timeout", "加载超时", None, 0) for key in batch_keys]
+                except Exception as e:
+                    rows = [self.fetcher.make_row(key, "error", f"Error: {str(e)}", None, 0) for key in batch_keys]
+            completed += len(batch_keys)
+            if on_progress:
+                on_progress(completed)
+            return rows
+        
+        batches = self.fetcher.split_batches(keys, self.max_in_flight)
+        results = await asyncio.gather(*(run_batch(batch_keys) for batch_keys in batches))
+        return [row for rows in results for row in rows]
+    
+    async def read_value_tracked(self, key, data_type, full=False, head_bytes=64 * 1024):
+        """先登记客户端缓存跟踪再读取值，返回 (读取序号, read_value的结果)"""
+        fetcher = self.fetcher
+        pipe = self.client.pipeline(transaction=False)
+        mark = fetcher.queue_tracking(pipe)
+        if mark is not None:
+            pipe.type(key)
+            mark = fetcher.parse_tracking(await pipe.execute(raise_on_error=False), mark)[1]
+        return mark, await self.read_value(key, data_type, full, head_bytes)
+    
+    async def read_value(self, key, data_type, full=False, head_bytes=64 * 1024):
+        """读取值详情窗口中字符串的内容，返回值与 AzureRedisManager.read_value 相同"""
+        client = self.client
+        if data_type == "string":
+            if full:
+                return None, await client.get(key)
+            pipe = client.pipeline(transaction=False)
+            pipe.strlen(key)
+            pipe.getrange(key, 0, head_bytes - 1)
+            length, head = await pipe.execute()
+            return length, head
+        
+        return None, None
+
+
+class NamespaceNode:
+    """命名空间前缀树节点"""
+    __slots__ = ("children", "count", "size")
+    
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+        self.size = 0
+
+
+class KeyNamespaceIndex:
+    """按分隔符切分键名的命名空间前缀树，节点记录其下的键数和累计大小
+    
+    只为命名空间层级建立节点，键名最后一段（通常是ID）只计入父节点，
+    因此节点数量与命名空间数量相关，而不是与键数相关。
+    索引绑定一个 CompactKeyStore，按键序号记录哪些键已计入，重复加入或移除
+    未计入的键（如重建尚未处理到的键）不会使计数出错。
+    扫描线程逐批写入，界面线程读取，所有访问都通过锁保护。
+    """
+    
+    def __init__(self, store, delimiter=":", max_depth=8):
+        self.store = store
+        self.delimiter = delimiter
+        self.max_depth = max_depth
+        self.root = NamespaceNode()
+        self.lock = threading.Lock()
+        self._key_sizes = {}
+        # 按键序号标记已计入索引的键
+        self._counted = bytearray()
+    
+    def _namespaces(self, key):
+        """返回键所属的各级命名空间片段（二进制安全模式下扫描到的字节键在这里解码）"""
+        if not self.delimiter:
+            return []
+        return reply_text(key).split(self.delimiter, self.max_depth)[:-1]
+    
+    def _mark_counted(self, index):
+        """标记序号为 index 的键已计入，已计入时返回 False"""
+        counted = self._counted
+        if index >= len(counted):
+            counted.extend(bytes(max(index + 1, len(counted) * 2) - len(counted)))
+        if counted[index]:
+            return False
+        counted[index] = 1
+        return True
+    
+    def _is_counted(self, key):
+        index = self.store.find(key)
+        return 0 <= index < len(self._counted) and self._counted[index]
+    
+    def add_keys(self, keys, start=None):
+        """增量加入一批键（须已在绑定的键存储中）
+        
+        start 不为空时 keys 是键存储中从序号 start 开始的连续键，省去逐个查找序号。
+        """
+        with self.lock:
+            root = self.root
+            for offset, key in enumerate(keys):
+                index = self.store.find(key) if start is None else start + offset
+                if index < 0 or not self._mark_counted(index):
+                    continue
+                root.count += 1
+                node = root
+                for part in self._namespaces(key):
+                    child = node.children.get(part)
+                    if child is None:
+                        child = node.children[part] = NamespaceNode()
+                    child.count += 1
+                    node = child
+    
+    def remove_key(self, key):
+        """移除一个已删除的键，扣减各级命名空间的键数和已记录的大小（未计入的键忽略）"""
+        with self.lock:
+            if not self._is_counted(key):
+                return
+            self._counted[self.store.find(key)] = 0
+            size = self._key_sizes.pop(key, 0)
+            node = self.root
+            node.count -= 1
+            node.size -= size
+            for part in self._namespaces(key):
+                node = node.children.get(part)
+                if node is None:
+                    return
+                node.count -= 1
+                node.size -= size
+    
+    def add_size(self, key, size):
+        """记录键的大小并累加到各级命名空间（重复加载同一键时只计差值，未计入的键忽略）"""
+        with self.lock:
+            if not self._is_counted(key):
+                return
+            delta = size - self._key_sizes.get(key, 0)
+            if not delta:
+                return
+            self._key_sizes[key] = size
+            node = self.root
+            node.size += delta
+            for part in self._namespaces(key):
+                node = node.children.get(part)
+                if node is None:
+                    return
+                node.size += delta
+    
+    def get_node(self, path):
+        """按命名空间路径返回 (键数, 大小, 是否有子节点)，路径不存在时返回 None"""
+        with self.lock:
+            node = self.root
+            for part in path:
+                node = node.children.get(part)
+                if node is None:
+                    return None
+            return node.count, node.size, bool(node.children)
+    
+    def get_children(self, path):
+        """返回子命名空间列表 [(名称, 键数, 大小, 是否有子节点)]，按键数降序"""
+        with self.lock:
+            node = self.root
+            for part in path:
+                node = node.children.get(part)
+                if node is None:
+                    return []
+            children = [(name, child.count, child.size, bool(child.children))
+                        for name, child in node.children.items()]
+        children.sort(key=lambda item: item[1], reverse=True)
+        return children
+
+
+class UIUpdateDispatcher:
+    """合并后台线程发往界面的更新，每 interval 毫秒最多在主线程中刷新一次
+    
+    更新按提交顺序排队：带 key 的更新（进度、状态）在刷新前只保留最新参数，
+    并移到队尾按最后一次提交的位置执行；不带 key 的更新（显示一页、出错提示等）
+    每个都会执行。extend 累积待插入的行，刷新时用累积的全部行调用一次回调，批量应用。
+    """
+    
+    def __init__(self, root, interval=50):
+        self.root = root
+        self.interval = interval
+        self.pending = OrderedDict()
+        self.sequence = 0
+        self.flush_scheduled = False
+        self.lock = threading.Lock()
+    
+    def post(self, callback, *args, key=None):
+        """提交一次界面更新（可在任意线程中调用）"""
+        with self.lock:
+            if key is None:
+                key = ("once", self.sequence)
+                self.sequence += 1
+            elif key in self.pending:
+                self.pending.move_to_end(key)
+            self.pending[key] = (callback, args)
+        self.schedule_flush()
+    
+    def extend(self, key, items, callback):
+        """累积待插入的行，刷新时调用一次 callback(全部累积的行)"""
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is None:
+                self.pending[key] = (callback, (list(items),))
+            else:
+                entry[1][0].extend(items)
+        self.schedule_flush()
+    
+    def schedule_flush(self):
+        with self.lock:
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.root.after(self.interval, self.flush)
+    
+    def flush(self):
+        """在主线程中按顺序执行所有排队的更新"""
+        with self.lock:
+            pending, self.pending = self.pending, OrderedDict()
+            self.flush_scheduled = False
+        for callback, args in pending.values():
+            try:
+                callback(*args)
+            except Exception:
+                # 与Tk回调相同的方式报告异常，不影响后续更新
+                self.root.report_callback_exception(*sys.exc_info())
+
+
+class KeyspaceListener:
+    """订阅键空间通知的后台线程，把键的变化事件 (事件名, 键) 交给 on_events
+    
+    不过滤时订阅 __keyevent@<db>__:*，频道名是事件名、消息是键；有匹配模式时订阅
+    __keyspace@<db>__:<模式>，由服务器只推送匹配键的事件。连接断开后自动重新订阅，
+    断开期间的变化无法补发，通过 on_status 提示。
+    """
+    
+    # 表示键已不存在的事件
+    REMOVAL_EVENTS = {"del", "expired", "evicted", "rename_from", "move_from"}
+    # 能创建键的事件及其对应类型，用于类型过滤（其余事件无法判断类型）
+    EVENT_TYPES = {
+        "set": "string", "setrange": "string", "incrby": "string", "incrbyfloat": "string", "append": "string",
+        "lpush": "list", "rpush": "list", "linsert": "list", "lmove_to": "list",
+        "sadd": "set", "sinterstore": "set", "sunionstore": "set", "sdiffstore": "set",
+        "hset": "hash", "hincrby": "hash", "hincrbyfloat": "hash",
+        "zadd": "zset", "zincr": "zset", "zinterstore": "zset", "zunionstore": "zset",
+        "xadd": "stream",
+    }
+    # 通知类型：g(del/expire/rename) $(字符串) l s h z t(stream) x(过期) e(驱逐)
+    EVENT_FLAGS = "g$lshztxe"
+    RECONNECT_DELAY = 2
+    
+    def __init__(self, client, db, pattern, on_events, on_status):
+        self.client = client
+        self.db = db
+        self.pattern = None if pattern == "*" else pattern
+        self.on_events = on_events
+        self.on_status = on_status
+        self.stop_event = threading.Event()
+    
+    def start(self):
+        threading.Thread(target=self.listen, daemon=True).start()
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def channel_pattern(self):
+        if self.pattern:
+            return f"__keyspace@{self.db}__:{self.pattern}"
+        return f"__keyevent@{self.db}__:*"
+    
+    def ensure_notifications(self):
+        """尽量开启所需的 notify-keyspace-events 标志，无权限时返回提示信息"""
+        required = ("K" if self.pattern else "E") + self.EVENT_FLAGS
+        try:
+            current = self.client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+        except redis.ResponseError:
+            return f"无法读取 notify-keyspace-events，请确认服务器（如Azure门户）已开启 {required}"
+        # A 是 g$lshzxet 的别名
+        effective = current.replace("A", "g$lshzxet")
+        missing = "".join(flag for flag in required if flag not in effective)
+        if not missing:
+            return None
+        try:
+            self.client.config_set("notify-keyspace-events", current + missing)
+        except redis.ResponseError:
+            return f"无权修改 notify-keyspace-events (当前 '{current}')，请在服务器（如Azure门户）开启 {required}"
+        return None
+    
+    def listen(self):
+        """订阅并转发事件，直到 stop() 被调用"""
+        try:
+            warning = self.ensure_notifications()
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            warning = f"检查键空间通知配置失败: {str(e)}"
+        self.on_status(warning or "实时更新已开启")
+        
+        # __keyspace@ 与 __keyevent@ 前缀等长
+        prefix_len = len(f"__keyspace@{self.db}__:")
+        reconnecting = False
+        while not self.stop_event.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.channel_pattern())
+                if reconnecting:
+                    self.on_status("实时更新已重新订阅，断开期间的变化需手动刷新")
+                    reconnecting = False
+                while not self.stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None or message['type'] != 'pmessage':
+                        continue
+                    suffix = reply_text(message['channel'])[prefix_len:]
+                    data = reply_text(message['data'])
+                    if self.pattern:
+                        self.on_events([(data, suffix)])
+                    else:
+                        self.on_events([(suffix, data)])
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                if self.stop_event.is_set():
+                    break
+                reconnecting = True
+                self.on_status(f"实时更新连接断开，{self.RECONNECT_DELAY} 秒后重新订阅: {str(e)}")
+                self.stop_event.wait(self.RECONNECT_DELAY)
+            finally:
+                pubsub.close()
+
+
+class VirtualTreeview:
+    """只渲染可见行的Treeview列表视图
+    
+    数据由回调提供：row_count() 返回总行数，row_values(index) 返回第 index 行的列值，
+    可选的 row_id(index) 返回该行稳定的项目ID。Treeview中只保留可见行加 overscan 个项目，
+    因此渲染开销与总行数无关。提供 row_id 时按ID对比差异：ID不变的项目保留，只更新
+    值发生变化的行；否则按偏移量复用固定的项目重新填值。垂直滚动条、鼠标滚轮和方向键
+    都由本类处理；选中状态按数据行记录，滚动后保持不变。
+    """
+    
+    def __init__(self, tree, scrollbar, row_count, row_values, row_id=None, overscan=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_count = row_count
+        self.row_values = row_values
+        self.row_id = row_id
+        self.overscan = overscan
+        self.offset = 0
+        self.selected_index = None
+        self.selected_id = None
+        self.rendered = {}
+        self.render_pending = False
+        self.visible_rows = int(tree.cget("height"))
+        
+        style_height = ttk.Style(tree).lookup("Treeview", "rowheight")
+        self.row_height = int(style_height) if style_height else 20
+        
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand="")
+        tree.bind("<Configure>", self.on_resize)
+        tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        tree.bind("<Up>", lambda event: self.move_selection(-1))
+        tree.bind("<Down>", lambda event: self.move_selection(1))
+        tree.bind("<Prior>", lambda event: self.move_selection(-self.visible_rows))
+        tree.bind("<Next>", lambda event: self.move_selection(self.visible_rows))
+        tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+    
+    def reset(self):
+        """数据整体替换后回到第一行并清除选中"""
+        self.offset = 0
+        self.selected_index = None
+        self.selected_id = None
+        self.render()
+    
+    def refresh(self):
+        """数据行数或内容变化后重新渲染，保持当前滚动位置"""
+        self.schedule_render()
+    
+    def get_selected_index(self):
+        """当前选中的数据行号，未选中时为 None"""
+        return self.selected_index
+    
+    def select(self, index):
+        """选中第 index 行并把它滚动到第一行"""
+        self.offset = index
+        self.selected_index = index
+        self.selected_id = None
+        self.render()
+        self.tree.event_generate("<<TreeviewSelect>>")
+    
+    def see(self, index):
+        """滚动使第 index 行可见"""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self.schedule_render()
+    
+    def max_offset(self):
+        return max(0, self.row_count() - self.visible_rows)
+    
+    def yview(self, *args):
+        """滚动条回调：moveto 比例 或 scroll n units/pages"""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.row_count())
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.offset += step * self.visible_rows if args[2] == "pages" else step
+        self.schedule_render()
+    
+    def scroll_by(self, rows):
+        self.offset += rows
+        self.schedule_render()
+        return "break"
+    
+    def on_mouse_wheel(self, event):
+        # Windows上每格 delta 为120，macOS上为较小的整数
+        rows = -event.delta // 120 * 3 if abs(event.delta) >= 120 else -event.delta
+        return self.scroll_by(rows)
+    
+    def on_resize(self, event):
+        visible_rows = max(1, (event.height - self.row_height) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.schedule_render()
+    
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = selection[0]
+            self.selected_index = self.offset + self.tree.index(selection[0])
+    
+    def move_selection(self, step):
+        """方向键/翻页键移动选中行，必要时滚动"""
+        count = self.row_count()
+        if not count:
+            return "break"
+        current = self.offset if self.selected_index is None else self.selected_index
+        self.selected_index = min(count - 1, max(0, current + step))
+        self.selected_id = None
+        self.see(self.selected_index)
+        self.render()
+        return "break"
+    
+    def schedule_render(self):
+        """合并一次事件循环内的多次滚动，只渲染一次"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.tree.after_idle(self.render)
+    
+    def render(self):
+        """按当前偏移量填充行项目，并更新滚动条位置"""
+        self.render_pending = False
+        count = self.row_count()
+        self.offset = min(max(0, self.offset), self.max_offset())
+        slots = min(self.visible_rows + self.overscan, count - self.offset)
+        
+        if self.row_id:
+            selected_item = self.render_by_id(slots)
+        else:
+            selected_item = self.render_by_slot(slots)
+        
+        if selected_item:
+            if self.tree.selection() != (selected_item,):
+                self.tree.selection_set(selected_item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        self.tree.yview_moveto(0)
+        
+        if count:
+            self.scrollbar.set(self.offset / count, min(1.0, (self.offset + self.visible_rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def render_by_slot(self, slots):
+        """按位置复用项目填值，返回应选中的项目"""
+        items = self.tree.get_children()
+        for item in items[slots:]:
+            self.tree.delete(item)
+        selected_item = None
+        for slot in range(slots):
+            index = self.offset + slot
+            values = self.row_values(index)
+            if slot < len(items):
+                item = items[slot]
+                self.tree.item(item, values=values)
+            else:
+                item = self.tree.insert("", "end", values=values)
+            if index == self.selected_index:
+                selected_item = item
+        return selected_item
+    
+    def render_by_id(self, slots):
+        """按稳定ID对比差异：删除移出窗口的项目，只更新值有变化的行，返回应选中的项目"""
+        wanted = []
+        wanted_ids = set()
+        for slot in range(slots):
+            index = self.offset + slot
+            item = self.row_id(index)
+            # 同一ID重复出现时（如SCAN返回重复键）用位置区分
+            if item in wanted_ids:
+                item = f"{item}#{index}"
+            wanted.append((item, index))
+            wanted_ids.add(item)
+        
+        for item in self.tree.get_children():
+            if item not in wanted_ids:
+                self.tree.delete(item)
+                self.rendered.pop(item, None)
+        
+        # 选中的行仍在数据中时跟随其新位置（排序或插入删除行之后）
+        selected_item = None
+        for position, (item, index) in enumerate(wanted):
+            values = tuple(self.row_values(index))
+            if item in self.rendered:
+                if self.rendered[item] != values:
+                    self.tree.item(item, values=values)
+                if self.tree.index(item) != position:
+                    self.tree.move(item, "", position)
+            else:
+                self.tree.insert("", position, iid=item, values=values)
+            self.rendered[item] = values
+            if item == self.selected_id or (self.selected_id is None and index == self.selected_index):
+                selected_item = item
+                self.selected_index = index
+        return selected_item
+
+
 class AzureRedisManager:
+    # 全局搜索方式（界面名称 → CompactKeyStore.search 的 mode）
+    GLOBAL_SEARCH_MODES = {"子串": "substring", "通配符": "glob", "正则": "regex"}
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Azure Redis 管理工具")
@@ -16,19 +2194,99 @@ class AzureRedisManager:
         
         # Redis连接
         self.redis_client = None
+        self.metadata_fetcher = None
         self.connection_pool = None
+        self.async_engine = None
         self.is_connected = False
+        self.cluster_mode = False
+        self.scan_type_supported = False
         
         # 分页设置
         self.page_size = 1000  # 每页显示的键数量
         self.current_page = 0
         self.total_keys = 0
-        self.all_keys = []
+        self.all_keys = CompactKeyStore()
+        self.deleted_keys = set()
+        self.key_view = self.search_view = self.sort_state = None
+        self.key_metadata = KeyMetadataArrays(self.all_keys)
+        
+        # 值详情窗口中字符串默认只读取开头部分，完整值需显式加载
+        self.value_view_bytes = 64 * 1024
         
         # 加载控制
         self.loading = False
         self.cancel_loading = False
         
+        # 流式扫描控制（扫描在后台继续时首页已可浏览）
+        self.scanning = False
+        self.scan_stop_event = None
+        self.stream_page_shown = False
+        
+        # 按游标浏览：只保存每页起点的 (游标, 跳过数)，不构建完整键列表
+        self.cursor_browse = False
+        self.cursor_match = "*"
+        self.page_cursors = [(0, 0)]
+        self.cursor_end_page = None
+        self.cursor_page_keys = []
+        
+        # 类型过滤：当前结果集的键类型已知时，加载页面可省去TYPE命令
+        self.known_key_type = None
+        
+        # 命名空间索引（随全量扫描增量构建）
+        self.namespace_delimiter = ":"
+        self.namespace_index = KeyNamespaceIndex(self.all_keys, self.namespace_delimiter)
+        
+        # 当前页的行元数据，用于按内存排序；display_items 为表格显示的各行列值（虚拟列表的数据源）
+        self.page_rows = []
+        self.display_items = []
+        self.memory_sort_desc = False
+        
+        # 行元数据缓存：条目数上限和有效期（秒），翻页时命中的行不再访问Redis
+        self.row_cache_size = 20000
+        self.row_cache_max_age = 60
+        self.row_cache = RowMetadataCache(self.row_cache_size, self.row_cache_max_age)
+        
+        # 客户端缓存：CLIENT TRACKING 失效通知保护的行和值详情缓存（连接后开启）
+        self.value_cache = ValueCache()
+        self.client_tracker = None
+        
+        # 相邻页预取：当前页加载完成后在后台把下一页（可选上一页）的行写入缓存
+        # 每次前台加载或新查询都会递增代数，旧的预取线程在下一批之前退出
+        self.prefetch_generation = 0
+        self.prefetch_previous = False
+        self.prefetch_batch_size = 100
+        
+        # 页面加载的并发线程数；连接池大小 = 线程数 + 扫描、预取、值详情等预留连接
+        self.page_load_workers = 1
+        self.reserved_connections = 8
+        
+        # 后台线程的界面更新经过调度器合并，避免事件队列被进度更新淹没
+        self.ui = UIUpdateDispatcher(self.root)
+        
+        # 页面加载令牌：加载过程中分批追加的行只属于最近一次加载
+        self.page_load_token = 0
+        self.progressive_page = None
+        
+        # 本地搜索：输入停止 local_search_delay 毫秒后过滤，每块 local_search_chunk 行
+        self.local_search_job = None
+        self.local_search_generation = 0
+        self.local_search_delay = 150
+        self.local_search_chunk = 5000
+        
+        # 全局搜索：匹配键的视图代替 all_keys 作为分页数据源，新的搜索会使进行中的搜索作废
+        self.global_search_generation = 0
+        self.search_label = ""
+        self.key_view_label = ""
+        # 全结果集排序：(列, 是否降序)，与全局搜索结果组合成分页数据源
+        self.sort_generation = 0
+        # 正在后台补全元数据的 KeyMetadataArrays（没有进行中的补全时为 None）
+        self.metadata_fill = None
+        
+        # 实时更新：键空间通知订阅和当前查询的匹配模式
+        self.live_listener = None
+        self.live_match = "*"
+        self.live_matcher = CompactKeyStore.glob_matcher(self.live_match)
+        
         # 创建界面
         self.create_widgets()
         
@@ -82,7 +2340,29 @@ class AzureRedisManager:
         # SSL
         self.ssl_var = tk.BooleanVar(value=True)
         self.ssl_check = ttk.Checkbutton(conn_frame, text="使用 SSL", variable=self.ssl_var)
-        self.ssl_check.grid(row=1, column=2, columnspan=2, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        self.ssl_check.grid(row=1, column=2, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        
+        # 集群模式（Premium/Enterprise 集群缓存）
+        self.cluster_var = tk.BooleanVar(value=False)
+        self.cluster_check = ttk.Checkbutton(conn_frame, text="集群模式", variable=self.cluster_var)
+        self.cluster_check.grid(row=1, column=3, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        
+        # 数据引擎：线程（同步客户端）或 asyncio（redis.asyncio，单机连接可用）
+        ttk.Label(conn_frame, text="数据引擎:").grid(row=2, column=0, sticky=tk.W, padx=(0, 5), pady=(5, 0))
+        self.io_engine_var = tk.StringVar(value="线程")
+        self.io_engine_combo = ttk.Combobox(conn_frame, textvariable=self.io_engine_var,
+                                            values=["线程", "asyncio"], width=10, state="readonly")
+        self.io_engine_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=(5, 0))
+        
+        # 客户端缓存：重复查看未修改的键时直接使用本地内容，由 CLIENT TRACKING 保证一致
+        self.client_cache_var = tk.BooleanVar(value=True)
+        self.client_cache_check = ttk.Checkbutton(conn_frame, text="客户端缓存", variable=self.client_cache_var)
+        self.client_cache_check.grid(row=2, column=2, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        
+        # 二进制安全：回复保留原始字节（protobuf、压缩数据等非UTF-8的键和值），只解码显示的行
+        self.binary_var = tk.BooleanVar(value=True)
+        self.binary_check = ttk.Checkbutton(conn_frame, text="二进制安全", variable=self.binary_var)
+        self.binary_check.grid(row=2, column=3, sticky=tk.W, padx=(10, 0), pady=(5, 0))
         
         # 连接按钮
         self.connect_btn = ttk.Button(conn_frame, text="连接", command=self.connect_to_redis)
@@ -96,11 +2376,11 @@ class AzureRedisManager:
         # 操作按钮框架
         action_frame = ttk.LabelFrame(parent, text="操作", padding="5")
         action_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
-        action_frame.columnconfigure(6, weight=1)
+        action_frame.columnconfigure(8, weight=1)
         
         # 查询模式框架
         query_frame = ttk.LabelFrame(action_frame, text="查询模式", padding="3")
-        query_frame.grid(row=0, column=0, columnspan=7, sticky=(tk.W, tk.E), pady=(0, 10))
+        query_frame.grid(row=0, column=0, columnspan=9, sticky=(tk.W, tk.E), pady=(0, 10))
         
         # 查询模式选择
         self.query_mode_var = tk.StringVar(value="all")
@@ -135,6 +2415,67 @@ class AzureRedisManager:
         self.query_btn = ttk.Button(query_frame, text="查询", command=self.execute_query, state="disabled")
         self.query_btn.grid(row=0, column=5, padx=5)
         
+        # 流式加载复选框：扫描到一页键后立即显示，扫描在后台继续
+        self.stream_mode_var = tk.BooleanVar(value=True)
+        self.stream_mode_check = ttk.Checkbutton(query_frame, text="边扫描边显示",
+                                                variable=self.stream_mode_var)
+        self.stream_mode_check.grid(row=0, column=6, sticky=tk.W, padx=(10, 0))
+        
+        # 按游标浏览复选框：翻页时只扫描当前页需要的键
+        self.cursor_mode_var = tk.BooleanVar(value=False)
+        self.cursor_mode_check = ttk.Checkbutton(query_frame, text="按游标浏览",
+                                                variable=self.cursor_mode_var)
+        self.cursor_mode_check.grid(row=0, column=7, sticky=tk.W, padx=(10, 0))
+        
+        # 类型过滤：Redis 6.0+ 由 SCAN TYPE 在服务器端过滤
+        ttk.Label(query_frame, text="类型:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.type_filter_var = tk.StringVar(value="全部")
+        self.type_filter_combo = ttk.Combobox(query_frame, textvariable=self.type_filter_var,
+                                              values=["全部", "string", "list", "set", "zset", "hash", "stream"],
+                                              width=10, state="readonly")
+        self.type_filter_combo.grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
+        
+        # 元数据引擎：两阶段pipeline 或 服务器端Lua脚本
+        ttk.Label(query_frame, text="元数据引擎:").grid(row=1, column=2, sticky=tk.W, pady=(5, 0))
+        self.metadata_engine_var = tk.StringVar(value="Pipeline")
+        self.metadata_engine_combo = ttk.Combobox(query_frame, textvariable=self.metadata_engine_var,
+                                                  values=["Pipeline", "Lua"], width=10, state="readonly")
+        self.metadata_engine_combo.grid(row=1, column=3, sticky=tk.W, padx=5, pady=(5, 0))
+        
+        # 预取相邻页复选框
+        self.prefetch_var = tk.BooleanVar(value=True)
+        self.prefetch_check = ttk.Checkbutton(query_frame, text="预取相邻页", variable=self.prefetch_var)
+        self.prefetch_check.grid(row=1, column=7, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        
+        # 内存占用列：用 MEMORY USAGE 获取键实际占用的字节数，SAMPLES 控制集合类型的抽样元素数
+        self.memory_column_var = tk.BooleanVar(value=False)
+        self.memory_column_check = ttk.Checkbutton(query_frame, text="内存占用列",
+                                                   variable=self.memory_column_var,
+                                                   command=self.on_memory_column_toggle)
+        self.memory_column_check.grid(row=1, column=4, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        ttk.Label(query_frame, text="SAMPLES:").grid(row=1, column=5, sticky=tk.E, pady=(5, 0))
+        self.memory_samples_var = tk.StringVar(value=str(KeyMetadataFetcher.MEMORY_SAMPLES))
+        self.memory_samples_spin = ttk.Spinbox(query_frame, textvariable=self.memory_samples_var,
+                                               from_=0, to=1000, width=6)
+        self.memory_samples_spin.grid(row=1, column=6, sticky=tk.W, padx=5, pady=(5, 0))
+        
+        # 全局搜索：在已扫描的全部键名中按子串、通配符或正则查找，结果直接分页显示
+        ttk.Label(query_frame, text="全局搜索:").grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        self.global_search_var = tk.StringVar()
+        self.global_search_entry = ttk.Entry(query_frame, textvariable=self.global_search_var, width=25)
+        self.global_search_entry.grid(row=2, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.global_search_entry.bind('<Return>', self.run_global_search)
+        self.global_search_mode_var = tk.StringVar(value="子串")
+        ttk.Combobox(query_frame, textvariable=self.global_search_mode_var, values=list(self.GLOBAL_SEARCH_MODES),
+                     width=8, state="readonly").grid(row=2, column=3, sticky=tk.W, padx=5, pady=(5, 0))
+        self.global_search_case_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(query_frame, text="忽略大小写", variable=self.global_search_case_var).grid(
+            row=2, column=4, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        ttk.Button(query_frame, text="搜索", command=self.run_global_search).grid(
+            row=2, column=5, sticky=tk.W, padx=5, pady=(5, 0))
+        ttk.Button(query_frame, text="清除", command=self.clear_global_search).grid(
+            row=2, column=6, sticky=tk.W, padx=5, pady=(5, 0))
+        
         # 刷新按钮
         self.refresh_btn = ttk.Button(action_frame, text="刷新数据", command=self.refresh_data, state="disabled")
         self.refresh_btn.grid(row=1, column=0, padx=(0, 5))
@@ -159,9 +2500,22 @@ class AzureRedisManager:
         self.clear_display_btn = ttk.Button(action_frame, text="清空显示", command=self.clear_display, state="disabled")
         self.clear_display_btn.grid(row=1, column=5, padx=5)
         
+        # 命名空间视图按钮
+        self.namespace_btn = ttk.Button(action_frame, text="命名空间", command=self.show_namespace_tree, state="disabled")
+        self.namespace_btn.grid(row=1, column=6, padx=5)
+        
+        # 强制刷新按钮：跳过行元数据缓存重新加载当前页
+        self.force_refresh_btn = ttk.Button(action_frame, text="强制刷新", command=self.force_refresh_page, state="disabled")
+        self.force_refresh_btn.grid(row=1, column=7, padx=5)
+        
+        # 补全排序元数据按钮：为没有加载过的键获取类型、TTL和大小，使排序覆盖全部键
+        self.fill_metadata_btn = ttk.Button(action_frame, text="补全排序元数据", command=self.fill_sort_metadata,
+                                            state="disabled")
+        self.fill_metadata_btn.grid(row=1, column=8, sticky=tk.W, padx=5)
+        
         # 分页控制
         page_frame = ttk.Frame(action_frame)
-        page_frame.grid(row=2, column=0, columnspan=7, sticky=(tk.W, tk.E), pady=(10, 0))
+        page_frame.grid(row=2, column=0, columnspan=9, sticky=(tk.W, tk.E), pady=(10, 0))
         
         self.prev_btn = ttk.Button(page_frame, text="上一页", command=self.prev_page, state="disabled")
         self.prev_btn.pack(side=tk.LEFT, padx=(0, 5))
@@ -177,11 +2531,24 @@ class AzureRedisManager:
         ttk.Label(page_frame, text="每页:").pack(side=tk.LEFT, padx=(20, 5))
         self.page_size_var = tk.StringVar(value="1000")
         page_size_combo = ttk.Combobox(page_frame, textvariable=self.page_size_var, 
-                                      values=["100", "500", "1000", "2000", "5000"], 
+                                      values=["100", "500", "1000", "2000", "5000", "10000", "20000", "50000"], 
                                       width=8, state="readonly")
         page_size_combo.pack(side=tk.LEFT, padx=5)
         page_size_combo.bind("<<ComboboxSelected>>", self.on_page_size_change)
         
+        # 页面加载并发线程数
+        ttk.Label(page_frame, text="并发:").pack(side=tk.LEFT, padx=(10, 5))
+        self.workers_var = tk.StringVar(value=str(self.page_load_workers))
+        workers_combo = ttk.Combobox(page_frame, textvariable=self.workers_var,
+                                     values=["1", "2", "4", "8"], width=4, state="readonly")
+        workers_combo.pack(side=tk.LEFT, padx=5)
+        workers_combo.bind("<<ComboboxSelected>>", self.on_workers_change)
+        
+        # 实时更新：订阅键空间通知增量更新键列表和当前页
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(page_frame, text="实时更新", variable=self.live_var,
+                        command=self.on_live_mode_toggle).pack(side=tk.LEFT, padx=(10, 0))
+        
         # 统计信息
         self.stats_var = tk.StringVar(value="总计: 0 个键")
         self.stats_label = ttk.Label(page_frame, textvariable=self.stats_var)
@@ -209,15 +2576,17 @@ class AzureRedisManager:
         data_frame.rowconfigure(0, weight=1)
         
         # 创建Treeview
-        columns = ("key", "type", "value", "ttl", "size")
+        columns = ("key", "type", "value", "ttl", "size", "memory")
         self.tree = ttk.Treeview(data_frame, columns=columns, show="headings", height=20)
+        # 内存占用列默认隐藏
+        self.tree.configure(displaycolumns=columns[:-1])
         
-        # 定义列标题
-        self.tree.heading("key", text="Key")
-        self.tree.heading("type", text="类型")
+        # 定义列标题（键、类型、TTL、大小可点击，对全部键排序）
+        self.column_titles = {"key": "Key", "type": "类型", "ttl": "过期时间 (TTL)", "size": "大小"}
+        for column, title in self.column_titles.items():
+            self.tree.heading(column, text=title, command=lambda column=column: self.sort_by_column(column))
         self.tree.heading("value", text="值")
-        self.tree.heading("ttl", text="过期时间 (TTL)")
-        self.tree.heading("size", text="大小")
+        self.tree.heading("memory", text="内存占用", command=self.sort_by_memory)
         
         # 设置列宽
         self.tree.column("key", width=200, minwidth=100)
@@ -225,11 +2594,16 @@ class AzureRedisManager:
         self.tree.column("value", width=300, minwidth=200)
         self.tree.column("ttl", width=150, minwidth=100)
         self.tree.column("size", width=80, minwidth=60)
+        self.tree.column("memory", width=90, minwidth=60)
         
-        # 滚动条
-        v_scrollbar = ttk.Scrollbar(data_frame, orient="vertical", command=self.tree.yview)
+        # 滚动条（垂直滚动由虚拟列表处理，只渲染可见行）
+        v_scrollbar = ttk.Scrollbar(data_frame, orient="vertical")
         h_scrollbar = ttk.Scrollbar(data_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        self.tree_view = VirtualTreeview(self.tree, v_scrollbar,
+                                         lambda: len(self.display_items),
+                                         self.render_row,
+                                         lambda index: f"key:{display_text(self.display_items[index][0])}")
         
         # 布局
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -253,6 +2627,10 @@ class AzureRedisManager:
             port = int(self.port_var.get())
             password = self.password_var.get() if self.password_var.get() else None
             ssl = self.ssl_var.get()
+            cluster = self.cluster_var.get()
+            use_asyncio = self.io_engine_var.get() == "asyncio"
+            use_client_cache = self.client_cache_var.get()
+            binary_safe = self.binary_var.get()
             
             if not host:
                 self.show_connection_error("请输入主机地址")
@@ -268,17 +2646,35 @@ class AzureRedisManager:
                 try:
                     # 基础连接参数
                     base_kwargs = {
-                        'decode_responses': True,
+                        # 二进制安全模式下回复保留为字节，由界面在显示时解码
+                        'decode_responses': not binary_safe,
+                        # 文本模式下按字节截取的预览可能截断多字节字符，解码时替换而不是报错；
+                        # 二进制安全模式下 reply_text 解码的非UTF-8键名作为参数发回时还原为原始字节
+                        'encoding_errors': 'surrogateescape' if binary_safe else 'replace',
                         'socket_timeout': 10,
                         'socket_connect_timeout': 5,
                         'socket_keepalive': True,
                         'socket_keepalive_options': {},
                         'retry_on_timeout': True,
-                        'health_check_interval': 30
+                        'health_check_interval': 30,
+                        # 连接池大小与页面加载并发数匹配（集群模式下为每个节点的连接池）
+                        'max_connections': self.get_pool_size()
                     }
                     
                     # 尝试创建Redis连接
-                    if ssl:
+                    self.cluster_mode = cluster
+                    if cluster:
+                        # 集群连接：自动发现所有分片节点
+                        ssl_kwargs = {'ssl': True, 'ssl_cert_reqs': None} if ssl else {}
+                        self.redis_client = RedisCluster(
+                            host=host,
+                            port=port,
+                            password=password,
+                            **ssl_kwargs,
+                            **base_kwargs
+                        )
+                        connection_method = f"Cluster ({len(self.redis_client.get_primaries())} 个主节点)"
+                    elif ssl:
                         # SSL连接 - 使用Redis 4.5.4兼容方式
                         try:
                             # 方法1: 直接SSL连接
@@ -300,7 +2696,6 @@ class AzureRedisManager:
                                     password=password,
                                     ssl=True,
                                     ssl_cert_reqs=None,
-                                    max_connections=20,
                                     **base_kwargs
                                 )
                                 self.redis_client = redis.Redis(connection_pool=self.connection_pool)
@@ -312,7 +2707,6 @@ class AzureRedisManager:
                                     host=host,
                                     port=port,
                                     password=password,
-                                    max_connections=20,
                                     **base_kwargs
                                 )
                                 self.redis_client = redis.Redis(connection_pool=self.connection_pool)
@@ -334,7 +2728,6 @@ class AzureRedisManager:
                                 host=host,
                                 port=port,
                                 password=password,
-                                max_connections=20,
                                 **base_kwargs
                             )
                             self.redis_client = redis.Redis(connection_pool=self.connection_pool)
@@ -342,16 +2735,36 @@ class AzureRedisManager:
                     
                     # 测试连接
                     self.redis_client.ping()
+                    self.scan_type_supported = self.check_scan_type_support()
+                    self.metadata_fetcher = KeyMetadataFetcher(self.redis_client)
+                    if binary_safe:
+                        connection_method += "，二进制安全"
+                    
+                    # asyncio引擎与同步客户端使用相同的连接参数，集群连接仍使用线程引擎
+                    if use_asyncio and cluster:
+                        connection_method += "，集群模式使用线程引擎"
+                    elif use_asyncio:
+                        ssl_kwargs = {'ssl': True, 'ssl_cert_reqs': None} if ssl else {}
+                        engine_kwargs = dict(base_kwargs, host=host, port=port, password=password, **ssl_kwargs)
+                        del engine_kwargs['max_connections']
+                        self.async_engine = AsyncRedisEngine(
+                            engine_kwargs, self.ui.post)
+                        self.async_engine.run(self.async_engine.client.ping())
+                        connection_method += " + asyncio"
+                    
+                    # 客户端缓存的失效通知按节点订阅，集群模式不开启
+                    if use_client_cache and not cluster:
+                        self.start_client_tracking()
                     
                     # 在主线程中更新UI
-                    self.root.after(0, self.on_connection_success, host, port, connection_method)
+                    self.ui.post(self.on_connection_success, host, port, connection_method)
                     
                 except redis.AuthenticationError as e:
-                    self.root.after(0, self.show_connection_error, f"认证失败: {str(e)}")
+                    self.ui.post(self.show_connection_error, f"认证失败: {str(e)}")
                 except redis.ConnectionError as e:
-                    self.root.after(0, self.show_connection_error, f"连接失败: {str(e)}")
+                    self.ui.post(self.show_connection_error, f"连接失败: {str(e)}")
                 except redis.TimeoutError as e:
-                    self.root.after(0, self.show_connection_error, f"连接超时: {str(e)}")
+                    self.ui.post(self.show_connection_error, f"连接超时: {str(e)}")
                 except Exception as e:
                     error_msg = f"连接失败: {str(e)}"
                     if 'ssl' in str(e).lower():
@@ -366,7 +2779,7 @@ class AzureRedisManager:
                         error_msg += "\n2. 验证主机地址和端口"
                         error_msg += "\n3. 确认访问密钥正确"
                     
-                    self.root.after(0, self.show_connection_error, error_msg)
+                    self.ui.post(self.show_connection_error, error_msg)
                     
             # 启动连接线程
             threading.Thread(target=connect_thread, daemon=True).start()
@@ -389,7 +2802,13 @@ class AzureRedisManager:
         # 重置分页状态
         self.current_page = 0
         self.total_keys = 0
-        self.all_keys = []
+        self.all_keys = CompactKeyStore()
+        self.deleted_keys = set()
+        self.key_view = self.search_view = self.sort_state = None
+        self.key_metadata = KeyMetadataArrays(self.all_keys)
+        self.row_cache.clear()
+        if self.live_var.get():
+            self.start_live_mode()
         
         # 更新按钮状态
         self.disconnect_btn.config(state="normal")
@@ -398,6 +2817,9 @@ class AzureRedisManager:
         self.delete_btn.config(state="normal")
         self.edit_btn.config(state="normal")
         self.clear_display_btn.config(state="normal")
+        self.namespace_btn.config(state="normal")
+        self.force_refresh_btn.config(state="normal")
+        self.fill_metadata_btn.config(state="normal")
         
         # 根据查询模式启用相应功能
         if self.query_mode_var.get() == "key":
@@ -421,8 +2843,12 @@ class AzureRedisManager:
             
     def disconnect_from_redis(self):
         """断开Redis连接"""
-        # 停止任何正在进行的加载
+        # 停止任何正在进行的加载和预取
         self.cancel_loading = True
+        self.cancel_prefetch()
+        self.stop_live_mode()
+        if self.scan_stop_event:
+            self.scan_stop_event.set()
         
         if self.redis_client:
             try:
@@ -430,6 +2856,18 @@ class AzureRedisManager:
             except:
                 pass  # 忽略关闭时的错误
             self.redis_client = None
+            self.metadata_fetcher = None
+            
+        if self.async_engine:
+            self.async_engine.close()
+            self.async_engine = None
+            
+        if self.client_tracker:
+            self.client_tracker.stop()
+            self.client_tracker = None
+            self.row_cache.tracker = None
+            self.value_cache.tracker = None
+        self.value_cache.clear()
             
         if self.connection_pool:
             try:
@@ -439,14 +2877,20 @@ class AzureRedisManager:
             self.connection_pool = None
             
         self.is_connected = False
+        self.cluster_mode = False
         self.loading = False
+        self.scanning = False
         self.cancel_loading = False
         self.status_var.set("未连接")
         
         # 重置分页状态
         self.current_page = 0
         self.total_keys = 0
-        self.all_keys = []
+        self.all_keys = CompactKeyStore()
+        self.deleted_keys = set()
+        self.key_view = self.search_view = self.sort_state = None
+        self.key_metadata = KeyMetadataArrays(self.all_keys)
+        self.row_cache.clear()
         self.update_page_info()
         
         # 更新按钮状态
@@ -458,13 +2902,16 @@ class AzureRedisManager:
         self.delete_btn.config(state="disabled")
         self.edit_btn.config(state="disabled")
         self.clear_display_btn.config(state="disabled")
+        self.namespace_btn.config(state="disabled")
+        self.force_refresh_btn.config(state="disabled")
+        self.fill_metadata_btn.config(state="disabled")
         self.query_btn.config(state="disabled")
         self.prev_btn.config(state="disabled")
         self.next_btn.config(state="disabled")
         
         # 清空数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.display_items = []
+        self.tree_view.reset()
         
         # 更新统计信息
         self.stats_var.set("总计: 0 个键")
@@ -493,7 +2940,7 @@ class AzureRedisManager:
     
     def execute_query(self):
         """执行查询"""
-        if not self.is_connected or not self.redis_client or self.loading:
+        if not self.is_connected or not self.redis_client or self.loading or self.scanning:
             return
             
         mode = self.query_mode_var.get()
@@ -514,7 +2961,10 @@ class AzureRedisManager:
             
         # 重置状态
         self.cancel_loading = False
+        self.cancel_prefetch()
         self.current_page = 0
+        self.cursor_browse = False
+        self.known_key_type = self.get_type_filter() if self.fuzzy_search_var.get() else None
         
         # 获取页大小
         try:
@@ -530,6 +2980,17 @@ class AzureRedisManager:
         self.query_btn.config(state="disabled")
         self.root.update()
         
+        # 实时更新只跟踪与查询条件匹配的键（精确查询时用反斜杠转义通配符和反斜杠本身）
+        if self.fuzzy_search_var.get():
+            self.set_live_match(f"*{key_pattern}*")
+        else:
+            self.set_live_match(CompactKeyStore.escape_glob(key_pattern))
+        
+        # 模糊查询 + 按游标浏览：逐页扫描，不收集全部匹配键
+        if self.fuzzy_search_var.get() and self.cursor_mode_var.get() and not self.cluster_mode:
+            self.start_cursor_browse(f"*{key_pattern}*")
+            return
+        
         # 在后台线程中查询
         def query_keys_thread():
             try:
@@ -538,40 +2999,24 @@ class AzureRedisManager:
                 if self.fuzzy_search_var.get():
                     # 模糊查询
                     pattern = f"*{key_pattern}*"
-                    self.root.after(0, lambda: self.status_var.set(f"正在模糊查询: {pattern}"))
+                    self.ui.post(self.status_var.set, f"正在模糊查询: {pattern}", key="status")
                     
                     # 使用SCAN命令进行模糊查询
-                    cursor = 0
-                    scan_count = 0
+                    def on_batch(keys, scan_count, scan_stats):
+                        found_keys.extend(keys)
+                        
+                        # 更新进度
+                        self.ui.post(self.update_scan_progress, len(found_keys), scan_count, scan_stats,
+                                     key="scan_progress")
                     
-                    while True:
-                        if self.cancel_loading:
-                            break
-                            
-                        try:
-                            cursor, keys = self.redis_client.scan(cursor, match=pattern, count=1000)
-                            found_keys.extend(keys)
-                            scan_count += 1
-                            
-                            # 更新进度
-                            self.root.after(0, self.update_scan_progress, len(found_keys), scan_count)
-                            
-                            if cursor == 0:
-                                break
-                                
-                            # 避免过度占用CPU
-                            time.sleep(0.001)
-                            
-                        except redis.TimeoutError:
-                            self.root.after(0, self.show_scan_warning, "查询超时，正在重试...")
-                            time.sleep(0.1)
-                            continue
-                        except Exception as e:
-                            self.root.after(0, self.show_refresh_error, f"模糊查询出错: {str(e)}")
-                            return
+                    try:
+                        self.scan_keyspace(pattern, on_batch, key_type=self.known_key_type)
+                    except Exception as e:
+                        self.ui.post(self.show_refresh_error, f"模糊查询出错: {str(e)}")
+                        return
                 else:
                     # 精确查询
-                    self.root.after(0, lambda: self.status_var.set(f"正在精确查询: {key_pattern}"))
+                    self.ui.post(self.status_var.set, f"正在精确查询: {key_pattern}", key="status")
                     
                     try:
                         # 检查Key是否存在
@@ -580,40 +3025,55 @@ class AzureRedisManager:
                         else:
                             found_keys = []
                     except Exception as e:
-                        self.root.after(0, self.show_refresh_error, f"精确查询出错: {str(e)}")
+                        self.ui.post(self.show_refresh_error, f"精确查询出错: {str(e)}")
                         return
                 
                 if self.cancel_loading:
-                    self.root.after(0, self.on_loading_cancelled)
+                    self.ui.post(self.on_loading_cancelled)
                     return
                     
-                # 保存查询结果
-                self.all_keys = found_keys
-                self.total_keys = len(found_keys)
+                # 保存查询结果（去除SCAN返回的重复键）
+                self.all_keys = CompactKeyStore(found_keys)
+                self.deleted_keys = set()
+                self.key_view = self.search_view = self.sort_state = None
+                self.key_metadata = KeyMetadataArrays(self.all_keys)
+                self.total_keys = len(self.all_keys)
                 
                 if not found_keys:
-                    self.root.after(0, self.update_data_display, [], f"未找到匹配的键: {key_pattern}")
+                    self.ui.post(self.show_page_rows, [], f"未找到匹配的键: {key_pattern}")
                     return
                 
                 # 加载第一页数据
-                self.root.after(0, self.load_page_data, 0)
+                self.ui.post(self.load_page_data, 0)
                 
             except Exception as e:
-                self.root.after(0, self.show_refresh_error, f"查询失败: {str(e)}")
+                self.ui.post(self.show_refresh_error, f"查询失败: {str(e)}")
                 
         # 启动查询线程
         threading.Thread(target=query_keys_thread, daemon=True).start()
     
     def clear_display(self):
         """清空数据显示"""
-        # 清空TreeView
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # 停止仍在后台追加键的流式扫描和相邻页预取
+        if self.scanning and self.scan_stop_event:
+            self.scan_stop_event.set()
+        self.cancel_prefetch()
+            
+        # 清空TreeView
+        self.display_items = []
+        self.tree_view.reset()
         
         # 重置变量
-        self.all_keys = []
+        self.all_keys = CompactKeyStore()
+        self.deleted_keys = set()
+        self.key_view = self.search_view = self.sort_state = None
+        self.key_metadata = KeyMetadataArrays(self.all_keys)
+        self.namespace_index = KeyNamespaceIndex(self.all_keys, self.namespace_delimiter)
         self.total_keys = 0
         self.current_page = 0
+        self.cursor_browse = False
+        self.cursor_page_keys = []
+        self.page_rows = []
         
         # 更新显示
         self.update_page_info()
@@ -629,117 +3089,73 @@ class AzureRedisManager:
             self.status_var.set("未连接")
     
     def on_local_search_change(self, event):
-        """本地搜索改变时的处理"""
-        search_text = self.local_search_var.get().lower()
-        
-        if not search_text:
-            # 如果搜索框为空，显示当前页的所有数据
-            self.display_current_page()
-            return
-        
-        # 过滤当前页面显示的数据
-        all_items = self.tree.get_children()
-        
-        for item in all_items:
-            values = self.tree.item(item, 'values')
-            if values and len(values) > 0:
-                key = values[0].lower()
-                value = values[2].lower() if len(values) > 2 else ""
-                
-                # 如果key或value包含搜索文本，则显示，否则隐藏
-                if search_text in key or search_text in value:
-                    self.tree.move(item, '', 'end')  # 确保显示
-                else:
-                    # 在tkinter Treeview中隐藏项目的方法是将其移动到不可见位置
-                    # 这里我们重新加载数据来实现过滤效果
-                    pass
-        
-        # 重新过滤和显示数据
-        self.filter_and_display_current_page(search_text)
+        """本地搜索框输入时的处理：停止输入一段时间后再过滤，连续输入只执行最后一次"""
+        if self.local_search_job:
+            self.root.after_cancel(self.local_search_job)
+        self.local_search_job = self.root.after(self.local_search_delay, self.apply_local_search)
     
-    def filter_and_display_current_page(self, search_text):
-        """过滤并显示当前页数据"""
-        if not self.all_keys:
-            return
-            
-        # 获取当前页的键
-        start_index = self.current_page * self.page_size
-        end_index = min(start_index + self.page_size, len(self.all_keys))
-        current_page_keys = self.all_keys[start_index:end_index]
-        
-        # 清空当前显示
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def row_matches_search(self, row, search_text):
+        """行的键名或值预览是否包含搜索文本（已转为小写）"""
+        value = row['value']
+        if isinstance(value, bytes):
+            value = KeyMetadataFetcher.format_bytes_preview(value, row['size'])
+        return search_text in display_text(row['key']).lower() or search_text in str(value).lower()
+    
+    def apply_local_search(self):
+        """按本地搜索框过滤当前页已加载的行，不访问Redis
+        
+        大页面分块过滤，每块之间让出主线程；新的输入或页面切换会递增代数，旧的过滤任务在下一块之前退出。
+        """
+        self.local_search_job = None
+        self.local_search_generation += 1
+        generation = self.local_search_generation
+        search_text = self.local_search_var.get().lower()
+        rows = self.page_rows
+        matches = []
         
-        # 加载并过滤数据
-        def load_filtered_data():
-            try:
-                filtered_data = []
-                
-                for key in current_page_keys:
-                    if self.cancel_loading:
-                        break
-                        
-                    try:
-                        # 获取key的详细信息
-                        key_info = self.get_key_info(key)
-                        
-                        # 应用本地搜索过滤
-                        if search_text:
-                            key_lower = key.lower()
-                            value_lower = str(key_info['value']).lower()
-                            if search_text not in key_lower and search_text not in value_lower:
-                                continue
-                        
-                        # 格式化显示数据
-                        display_data = (
-                            key,
-                            key_info['type'],
-                            self.format_value_for_display(key_info['value']),
-                            self.format_ttl(key_info['ttl']),
-                            self.format_size(key_info['size'])
-                        )
-                        filtered_data.append(display_data)
-                        
-                    except Exception as e:
-                        print(f"处理键 {key} 时出错: {e}")
-                        continue
-                
-                # 在主线程中更新显示
-                self.root.after(0, self.update_filtered_display, filtered_data)
-                
-            except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("错误", f"过滤数据时出错: {str(e)}"))
+        def filter_chunk(start):
+            if generation != self.local_search_generation:
+                return
+            end = start + self.local_search_chunk
+            matches.extend(row for row in rows[start:end] if self.row_matches_search(row, search_text))
+            if end < len(rows):
+                self.root.after(1, filter_chunk, end)
+            else:
+                self.show_local_search_results(matches, len(rows))
         
-        # 在后台线程中加载过滤数据
-        threading.Thread(target=load_filtered_data, daemon=True).start()
+        filter_chunk(0)
     
-    def update_filtered_display(self, filtered_data):
-        """更新过滤后的显示"""
-        for data in filtered_data:
-            self.tree.insert("", "end", values=data)
+    def show_local_search_results(self, rows, total):
+        """显示本地搜索结果（搜索框为空时显示当前页全部行）"""
+        self.memory_sort_desc = False
+        self.tree.heading("memory", text="内存占用")
+        self.display_items = [self.format_row(row) for row in rows]
+        self.tree_view.reset()
         
-        # 更新状态
-        total_displayed = len(filtered_data)
         search_text = self.local_search_var.get()
         if search_text:
-            self.status_var.set(f"本地搜索 '{search_text}': 显示 {total_displayed} 项")
+            self.status_var.set(f"本地搜索 '{search_text}': 显示 {len(rows)} / {total} 项")
         else:
-            self.status_var.set(f"已加载第 {self.current_page + 1} 页数据，共 {total_displayed} 项")
+            self.status_var.set(f"第 {self.current_page + 1} 页，共 {total} 项")
     
     def clear_local_search(self):
         """清空本地搜索"""
         self.local_search_var.set("")
-        self.display_current_page()
+        if self.local_search_job:
+            self.root.after_cancel(self.local_search_job)
+        self.apply_local_search()
             
     def refresh_data(self):
         """刷新Redis数据"""
-        if not self.is_connected or not self.redis_client or self.loading:
+        if not self.is_connected or not self.redis_client or self.loading or self.scanning:
             return
             
         # 重置状态
         self.cancel_loading = False
+        self.cancel_prefetch()
         self.current_page = 0
+        self.known_key_type = self.get_type_filter()
+        self.set_live_match("*")
         
         # 获取页大小
         try:
@@ -747,6 +3163,35 @@ class AzureRedisManager:
         except ValueError:
             self.page_size = 1000
             
+        # 按游标浏览：不扫描整个键空间，直接加载第一页（集群的游标分散在各分片，不适用）
+        if self.cursor_mode_var.get() and not self.cluster_mode:
+            self.status_var.set("正在按游标加载第一页...")
+            self.loading = True
+            self.refresh_btn.config(state="disabled")
+            self.stop_btn.config(state="normal")
+            self.query_btn.config(state="disabled")
+            self.start_cursor_browse("*")
+            return
+        self.cursor_browse = False
+            
+        # 流式模式下键列表在扫描过程中逐批追加，首页凑满即显示
+        streaming = self.stream_mode_var.get()
+        stop_event = threading.Event()
+        self.scan_stop_event = stop_event
+        if streaming:
+            self.all_keys = CompactKeyStore()
+            self.deleted_keys = set()
+            self.key_view = self.search_view = self.sort_state = None
+            self.key_metadata = KeyMetadataArrays(self.all_keys)
+            self.total_keys = 0
+            self.stream_page_shown = False
+            self.scanning = True
+        all_keys = self.all_keys if streaming else CompactKeyStore()
+            
+        # 每次全量扫描重建命名空间索引
+        namespace_index = KeyNamespaceIndex(all_keys, self.namespace_delimiter)
+        self.namespace_index = namespace_index
+            
         # 显示加载状态
         self.status_var.set("正在获取所有键...")
         self.loading = True
@@ -759,218 +3204,661 @@ class AzureRedisManager:
         def fetch_keys_thread():
             try:
                 # 使用SCAN命令分批获取所有键
-                all_keys = []
-                cursor = 0
-                scan_count = 0
+                last_scan_count = 0
                 
-                while True:
-                    if self.cancel_loading:
-                        break
-                        
-                    try:
-                        # 使用SCAN命令，每次获取1000个键
-                        cursor, keys = self.redis_client.scan(cursor, match="*", count=1000)
-                        all_keys.extend(keys)
-                        scan_count += 1
-                        
-                        # 更新进度
-                        self.root.after(0, self.update_scan_progress, len(all_keys), scan_count)
-                        
-                        if cursor == 0:
-                            break
-                            
-                        # 避免过度占用CPU
-                        time.sleep(0.001)
-                        
-                    except redis.TimeoutError:
-                        # 如果超时，继续尝试
-                        self.root.after(0, self.show_scan_warning, "扫描超时，正在重试...")
-                        time.sleep(0.1)
-                        continue
-                    except Exception as e:
-                        self.root.after(0, self.show_refresh_error, f"扫描键时出错: {str(e)}")
-                        return
+                def on_batch(keys, scan_count, scan_stats):
+                    nonlocal last_scan_count
+                    last_scan_count = scan_count
+                    added = all_keys.extend(keys)
+                    
+                    # 只把新键计入命名空间索引
+                    if added:
+                        start = len(all_keys) - added
+                        namespace_index.add_keys(keys if added == len(keys) else all_keys[start:], start)
+                    
+                    # 更新进度（流式模式下同时更新总数并尝试显示首页）
+                    if streaming:
+                        self.ui.post(self.on_stream_scan_batch, len(all_keys), scan_count, scan_stats,
+                                     key="scan_progress")
+                    else:
+                        self.ui.post(self.update_scan_progress, len(all_keys), scan_count, scan_stats,
+                                     key="scan_progress")
+                
+                try:
+                    self.scan_keyspace("*", on_batch, stop_event, key_type=self.known_key_type)
+                except Exception as e:
+                    self.scanning = False
+                    self.ui.post(self.show_refresh_error, f"扫描键时出错: {str(e)}")
+                    return
+                
+                if streaming:
+                    stopped = self.cancel_loading or stop_event.is_set()
+                    self.ui.post(self.on_stream_scan_finished, last_scan_count, stopped)
+                    self.precompute_name_order(all_keys)
+                    return
                 
                 if self.cancel_loading:
-                    self.root.after(0, self.on_loading_cancelled)
+                    self.ui.post(self.on_loading_cancelled)
                     return
                     
                 # 保存所有键
                 self.all_keys = all_keys
+                self.deleted_keys = set()
+                self.key_view = self.search_view = self.sort_state = None
+                self.key_metadata = KeyMetadataArrays(self.all_keys)
                 self.total_keys = len(all_keys)
                 
                 if not all_keys:
-                    self.root.after(0, self.update_data_display, [], "未找到任何键")
+                    self.ui.post(self.show_page_rows, [], "未找到任何键")
                     return
                 
                 # 加载第一页数据
-                self.root.after(0, self.load_page_data, 0)
+                self.ui.post(self.load_page_data, 0)
+                self.precompute_name_order(all_keys)
                 
             except Exception as e:
-                self.root.after(0, self.show_refresh_error, f"获取键列表失败: {str(e)}")
+                self.scanning = False
+                self.ui.post(self.show_refresh_error, f"获取键列表失败: {str(e)}")
                 
         # 启动键获取线程
         threading.Thread(target=fetch_keys_thread, daemon=True).start()
-        # 启动键获取线程
-        threading.Thread(target=fetch_keys_thread, daemon=True).start()
     
-    def update_scan_progress(self, keys_found, scan_count):
-        """更新扫描进度"""
-        self.status_var.set(f"正在扫描... 已找到 {keys_found} 个键 (扫描轮次: {scan_count})")
+    def precompute_name_order(self, store):
+        """扫描结束后在扫描线程中预先计算键名顺序，之后按键名排序只需复制数组"""
+        metadata = self.key_metadata
+        if metadata.store is store and store is self.all_keys:
+            metadata.update_name_order()
+    
+    def scan_keyspace(self, match, on_batch, stop_event=None, key_type=None):
+        """分批扫描匹配的键，每批调用 on_batch(keys, scan_count, scan_stats)（在后台线程中调用）
+        
+        COUNT由 AdaptiveScanController 按延迟自适应调整；集群模式下改为各主节点并发扫描，
+        使用asyncio引擎时SCAN在其事件循环中执行。key_type 不为空时只返回该类型的键。
+        """
+        def stopped():
+            return self.cancel_loading or (stop_event is not None and stop_event.is_set())
+        
+        if self.cluster_mode:
+            self.scan_cluster_shards(match, on_batch, stopped, key_type)
+            return
+        
+        if self.async_engine:
+            # SCAN按游标顺序执行，在事件循环中运行，调用线程等待其完成
+            on_timeout = lambda: self.ui.post(self.show_scan_warning, "扫描超时，正在重试...", key="scan_warning")
+            self.async_engine.run(self.async_engine.scan(match, on_batch, stopped, key_type,
+                                                         self.scan_type_supported, on_timeout))
+            return
+        
+        cursor = 0
+        scan_count = 0
+        scan_controller = AdaptiveScanController()
+        
+        while not stopped():
+            try:
+                started = time.perf_counter()
+                cursor, keys = self.scan_by_type(self.redis_client, cursor, match, scan_controller.count, key_type)
+                scan_controller.record(time.perf_counter() - started, len(keys))
+            except redis.TimeoutError:
+                # 如果超时，继续尝试
+                self.ui.post(self.show_scan_warning, "扫描超时，正在重试...", key="scan_warning")
+                time.sleep(0.1)
+                continue
+                
+            scan_count += 1
+            on_batch(keys, scan_count, scan_controller.describe())
+            
+            if cursor == 0:
+                break
+                
+            # 服务器繁忙时让出时间
+            if scan_controller.pause:
+                time.sleep(scan_controller.pause)
+    
+    def scan_cluster_shards(self, match, on_batch, stopped, key_type=None):
+        """集群模式：在线程池中对每个主节点并发执行SCAN，结果合并到同一个回调
+        
+        每个分片有独立的游标和自适应COUNT；on_batch 在锁内调用，回调无需自行加锁。
+        """
+        primaries = self.redis_client.get_primaries()
+        shard_progress = {node.name: [0, False] for node in primaries}
+        lock = threading.Lock()
+        scan_count = 0
+        
+        def scan_shard(node):
+            nonlocal scan_count
+            client = self.redis_client.get_redis_connection(node)
+            scan_controller = AdaptiveScanController()
+            cursor = 0
+            
+            while not stopped():
+                try:
+                    started = time.perf_counter()
+                    cursor, keys = self.scan_by_type(client, cursor, match, scan_controller.count, key_type)
+                    scan_controller.record(time.perf_counter() - started, len(keys))
+                except redis.TimeoutError:
+                    self.ui.post(self.show_scan_warning, f"分片 {node.name} 扫描超时，正在重试...",
+                                 key="scan_warning")
+                    time.sleep(0.1)
+                    continue
+                    
+                with lock:
+                    scan_count += 1
+                    progress = shard_progress[node.name]
+                    progress[0] += len(keys)
+                    progress[1] = cursor == 0
+                    on_batch(keys, scan_count, self.format_shard_progress(shard_progress))
+                    
+                if cursor == 0:
+                    break
+                if scan_controller.pause:
+                    time.sleep(scan_controller.pause)
+        
+        with ThreadPoolExecutor(max_workers=min(len(primaries), 16) or 1) as executor:
+            futures = [executor.submit(scan_shard, node) for node in primaries]
+            for future in futures:
+                # 任一分片出错时抛出，由调用方显示错误
+                future.result()
+    
+    def check_scan_type_support(self):
+        """SCAN的TYPE选项需要Redis 6.0及以上"""
+        try:
+            info = self.redis_client.info("server")
+            version = info.get("redis_version")
+            if version is None:
+                # 集群返回各节点的INFO
+                version = next(iter(info.values()))["redis_version"]
+            return tuple(int(part) for part in str(version).split(".")[:2]) >= (6, 0)
+        except Exception:
+            return False
+    
+    def get_type_filter(self):
+        """当前选择的类型过滤，"全部"时返回 None"""
+        key_type = self.type_filter_var.get()
+        return None if key_type == "全部" else key_type
+    
+    def scan_by_type(self, client, cursor, match, count, key_type):
+        """执行一次SCAN并按类型过滤
+        
+        支持时把TYPE交给服务器过滤；旧版本服务器上对本批键用一次pipeline查询TYPE，
+        在客户端过滤。
+        """
+        if not key_type:
+            return client.scan(cursor, match=match, count=count)
+        if self.scan_type_supported:
+            return client.scan(cursor, match=match, count=count, _type=key_type)
+        
+        cursor, keys = client.scan(cursor, match=match, count=count)
+        if not keys:
+            return cursor, keys
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+        types = pipe.execute()
+        return cursor, [key for key, data_type in zip(keys, types) if reply_text(data_type) == key_type]
+    
+    def format_shard_progress(self, shard_progress):
+        """格式化各分片的扫描进度"""
+        done = sum(1 for _, finished in shard_progress.values() if finished)
+        shards = ", ".join(f"{name} {keys}{'✓' if finished else '…'}"
+                           for name, (keys, finished) in shard_progress.items())
+        return f"分片 {done}/{len(shard_progress)} 完成: {shards}"
+    
+    def on_stream_scan_batch(self, keys_found, scan_count, scan_stats=None):
+        """流式扫描：每批键到达后更新总数，首页键数足够时立即加载首页"""
+        if not self.scanning:
+            return
+            
+        self.total_keys = keys_found
+        self.update_scan_progress(keys_found, scan_count, scan_stats)
+        
+        if not self.stream_page_shown:
+            if keys_found >= self.page_size:
+                self.stream_page_shown = True
+                self.load_page_data(0)
+        elif not self.loading:
+            # 首页已显示，只需让总页数随扫描增长
+            self.update_page_info()
+    
+    def on_stream_scan_finished(self, scan_count, stopped):
+        """流式扫描结束（完成或被停止）的回调"""
+        self.scanning = False
+        self.total_keys = len(self.all_keys)
         
+        if stopped and not self.stream_page_shown:
+            self.on_loading_cancelled()
+            return
+            
+        if not self.all_keys:
+            self.show_page_rows([], "未找到任何键")
+            return
+            
+        if not self.stream_page_shown:
+            # 键总数不足一页，扫描结束后再显示
+            self.stream_page_shown = True
+            self.load_page_data(0)
+            return
+            
+        self.update_page_info()
+        if not self.loading:
+            self.cancel_loading = False
+            self.refresh_btn.config(state="normal")
+            self.stop_btn.config(state="disabled")
+            
+        if stopped:
+            self.status_var.set(f"扫描已停止，已获取 {self.total_keys} 个键")
+        else:
+            self.status_var.set(f"扫描完成，共 {self.total_keys} 个键 (扫描轮次: {scan_count})")
+    
     def show_scan_warning(self, message):
         """显示扫描警告"""
         self.status_var.set(message)
         
-    def load_page_data(self, page_num):
-        """加载指定页的数据"""
+    def load_page_data(self, page_num, force=False):
+        """加载指定页的数据
+        
+        行元数据缓存中仍有效的键直接使用缓存，只向Redis请求未命中的键；force 为 True 时忽略缓存。
+        """
         if not self.is_connected or not self.redis_client or self.cancel_loading:
             return
             
+        self.cancel_prefetch()
+        self.page_load_token += 1
+        token = self.page_load_token
         self.current_page = page_num
-        start_idx = page_num * self.page_size
-        end_idx = start_idx + self.page_size
-        page_keys = self.all_keys[start_idx:end_idx]
-        
-        if not page_keys:
-            self.update_data_display([], f"第 {page_num + 1} 页无数据")
-            return
+        if self.cursor_browse:
+            # 按游标浏览时页内的键需要在后台线程中扫描
+            page_keys = None
+        else:
+            page_keys = self.slice_page_keys(page_num)
+            
+            if not page_keys:
+                self.show_page_rows([], f"第 {page_num + 1} 页无数据")
+                return
             
         # 显示加载状态
+        self.loading = True
         self.status_var.set(f"正在加载第 {page_num + 1} 页数据...")
         self.root.update()
         
+        # 引擎、并发数和内存占用列的设置在主线程中读取
+        use_lua = self.metadata_engine_var.get() == "Lua"
+        workers = self.page_load_workers
+        memory_samples = self.get_memory_samples() if self.memory_column_var.get() else None
+        
+        # asyncio引擎：各批次在事件循环中并发执行，完成后直接回到主线程
+        if self.async_engine and page_keys is not None:
+            self.load_page_data_async(page_num, page_keys, force, memory_samples, token)
+            return
+        
         # 在后台线程中获取页面数据
         def fetch_page_data_thread():
+            nonlocal page_keys
             try:
-                data_items = []
+                if page_keys is None:
+                    page_keys = self.fetch_cursor_page_keys(page_num)
+                    if self.cancel_loading:
+                        self.ui.post(self.on_loading_cancelled)
+                        return
+                    if not page_keys:
+                        empty_msg = "未找到任何键" if page_num == 0 else f"第 {page_num + 1} 页无数据"
+                        self.ui.post(self.show_page_rows, [], empty_msg)
+                        return
+                
+                # 先从行元数据缓存中取出仍有效的行
+                cached_rows = self.lookup_cached_rows(page_keys, force, memory_samples)
+                missing_keys = [key for key in page_keys if key not in cached_rows]
+                fetched_rows = {}
                 
-                # 分批处理，避免一次性处理太多
-                batch_size = 50
-                for i in range(0, len(page_keys), batch_size):
+                # 分批处理：Pipeline引擎每批两次往返（类型/TTL，预览/长度），Lua引擎每批一次
+                # 显示内存占用列时每批再多一次 MEMORY USAGE 往返；多个线程时各批并发执行
+                known_type = self.known_key_type
+                transfer_counter = TransferCounter()
+                
+                def fetch_batch(batch_keys):
                     if self.cancel_loading:
-                        break
-                        
-                    batch_keys = page_keys[i:i + batch_size]
-                    
+                        return []
                     try:
-                        # 使用pipeline批量获取数据
-                        pipe = self.redis_client.pipeline(transaction=False)
-                        
-                        # 批量获取类型和TTL
-                        for key in batch_keys:
-                            pipe.type(key)
-                            pipe.ttl(key)
-                        
-                        # 设置较长的超时时间
-                        pipe.socket_timeout = 15
-                        results = pipe.execute()
-                        
-                        # 处理结果
-                        for j, key in enumerate(batch_keys):
-                            if self.cancel_loading:
-                                break
-                                
-                            try:
-                                data_type = results[j * 2]
-                                ttl = results[j * 2 + 1]
-                                
-                                if ttl == -1:
-                                    ttl_text = "永不过期"
-                                elif ttl == -2:
-                                    ttl_text = "已过期"
-                                else:
-                                    ttl_text = f"{ttl}秒"
-                                    
-                                # 获取值预览和大小
-                                value_text, size = self.get_value_preview_safe(key, data_type)
-                                
-                                data_items.append((key, data_type, value_text, ttl_text, size))
-                                
-                            except Exception as e:
-                                # 单个键出错不影响其他键
-                                data_items.append((key, "error", f"Error: {str(e)}", "N/A", 0))
-                                continue
-                        
-                        # 更新进度
-                        progress = min(i + batch_size, len(page_keys))
-                        self.root.after(0, self.update_load_progress, progress, len(page_keys), page_num + 1)
-                        
-                        # 避免过度占用CPU
-                        time.sleep(0.01)
-                        
+                        return self.fetch_key_rows(batch_keys, known_type, use_lua, memory_samples, transfer_counter)
                     except redis.TimeoutError:
                         # 超时处理：跳过这批数据
-                        for key in batch_keys:
-                            data_items.append((key, "timeout", "加载超时", "N/A", 0))
-                        continue
+                        return [self.metadata_fetcher.make_row(key, "timeout", "加载超时", None, 0) for key in batch_keys]
                     except Exception as e:
                         # 批次错误处理
-                        for key in batch_keys:
-                            data_items.append((key, "error", f"Error: {str(e)}", "N/A", 0))
-                        continue
+                        return [self.metadata_fetcher.make_row(key, "error", f"Error: {str(e)}", None, 0)
+                                for key in batch_keys]
+                
+                # 按页内顺序已就绪的行随批次追加到表格（由调度器批量插入），整页完成后再整体替换
+                shown = 0
+                
+                def show_ready_rows():
+                    nonlocal shown
+                    ready = []
+                    while shown < len(page_keys):
+                        row = cached_rows.get(page_keys[shown]) or fetched_rows.get(page_keys[shown])
+                        if row is None:
+                            break
+                        ready.append(self.format_row(row))
+                        shown += 1
+                    if ready:
+                        self.ui.extend(("page_rows", token), ready,
+                                       lambda items: self.append_display_rows(token, items))
+                
+                batches = self.metadata_fetcher.split_batches(missing_keys, workers)
+                progress = len(cached_rows)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(fetch_batch, batch_keys) for batch_keys in batches]
+                    # 按提交顺序收集结果，保证行顺序与页内键顺序一致
+                    for batch_keys, future in zip(batches, futures):
+                        if self.cancel_loading:
+                            for pending in futures:
+                                pending.cancel()
+                            break
+                        for row in future.result():
+                            fetched_rows[row['key']] = row
+                        if len(batches) > 1:
+                            show_ready_rows()
+                        
+                        # 更新进度
+                        progress += len(batch_keys)
+                        self.ui.post(self.update_load_progress, progress, len(page_keys), page_num + 1,
+                                     key="load_progress")
                 
                 if self.cancel_loading:
-                    self.root.after(0, self.on_loading_cancelled)
+                    self.ui.post(self.on_loading_cancelled)
                     return
-                    
+                
                 # 在主线程中更新UI
-                status_msg = f"第 {page_num + 1} 页，共 {len(data_items)} 个键"
-                self.root.after(0, self.update_data_display, data_items, status_msg)
+                notes = []
+                if use_lua and self.metadata_fetcher.lua_unavailable_reason:
+                    notes.append(f"Lua不可用，已改用Pipeline: {self.metadata_fetcher.lua_unavailable_reason}")
+                if memory_samples is not None and self.metadata_fetcher.memory_unavailable_reason:
+                    notes.append(f"MEMORY USAGE不可用，内存为估算值: {self.metadata_fetcher.memory_unavailable_reason}")
+                self.ui.post(self.complete_page_load, page_num, page_keys, cached_rows, fetched_rows,
+                             transfer_counter, notes, token)
                 
             except Exception as e:
                 error_msg = f"加载第 {page_num + 1} 页失败: {str(e)}"
-                self.root.after(0, self.show_refresh_error, error_msg)
+                self.ui.post(self.show_refresh_error, error_msg)
                 
         # 启动页面数据获取线程
         threading.Thread(target=fetch_page_data_thread, daemon=True).start()
     
-    def display_current_page(self):
-        """显示当前页数据（不重新从Redis获取）"""
-        if not self.all_keys:
+    def load_page_data_async(self, page_num, page_keys, force, memory_samples, token):
+        """asyncio引擎加载一页：缓存未命中的键分批并发获取，完成后在主线程显示"""
+        cached_rows = self.lookup_cached_rows(page_keys, force, memory_samples)
+        missing_keys = [key for key in page_keys if key not in cached_rows]
+        transfer_counter = TransferCounter()
+        engine = self.async_engine
+        
+        def on_progress(completed):
+            self.ui.post(self.update_load_progress, len(cached_rows) + completed, len(page_keys), page_num + 1,
+                         key="load_progress")
+        
+        def on_done(rows):
+            if self.cancel_loading:
+                self.on_loading_cancelled()
+                return
+            self.remember_rows(rows)
+            notes = []
+            if self.metadata_engine_var.get() == "Lua":
+                notes.append("asyncio引擎使用Pipeline获取元数据")
+            if memory_samples is not None and engine.fetcher.memory_unavailable_reason:
+                notes.append(f"MEMORY USAGE不可用，内存为估算值: {engine.fetcher.memory_unavailable_reason}")
+            self.complete_page_load(page_num, page_keys, cached_rows, {row['key']: row for row in rows},
+                                    transfer_counter, notes, token)
+        
+        def on_error(error):
+            self.show_refresh_error(f"加载第 {page_num + 1} 页失败: {str(error)}")
+        
+        engine.submit(engine.fetch_rows(missing_keys, self.known_key_type, memory_samples, transfer_counter,
+                                        on_progress, lambda: self.cancel_loading),
+                      on_done, on_error)
+    
+    def lookup_cached_rows(self, page_keys, force, memory_samples):
+        """从行元数据缓存中取出仍有效的行（force 为 True 时先使这些键的缓存失效）"""
+        if force:
+            self.row_cache.invalidate(*page_keys)
+        cached_rows = {}
+        for key in page_keys:
+            row = self.row_cache.get(key, need_memory=memory_samples is not None)
+            if row is not None:
+                cached_rows[key] = row
+        return cached_rows
+    
+    def complete_page_load(self, page_num, page_keys, cached_rows, fetched_rows, transfer_counter, notes, token):
+        """按页内顺序合并缓存行和新获取的行并显示，然后开始预取相邻页（主线程中调用）"""
+        page_rows = [cached_rows.get(key) or fetched_rows[key] for key in page_keys]
+        
+        status_msg = f"第 {page_num + 1} 页，共 {len(page_rows)} 个键"
+        if cached_rows:
+            status_msg += f"（缓存命中 {len(cached_rows)}）"
+        status_msg += f"，传输约 {self.format_size(transfer_counter.bytes)}"
+        for note in notes:
+            status_msg += f" ({note})"
+        # 加载过程中已分批显示过的页保持滚动位置
+        self.show_page_rows(page_rows, status_msg, keep_position=self.progressive_page == token)
+        self.schedule_prefetch(page_num)
+    
+    def append_display_rows(self, token, items):
+        """追加加载过程中已就绪的行；第一批到达时替换上一页的内容，过期加载的行直接丢弃"""
+        if token != self.page_load_token or not self.loading:
+            return
+        if self.progressive_page != token:
+            self.progressive_page = token
+            self.display_items = []
+            self.tree_view.reset()
+        self.display_items.extend(items)
+        self.tree_view.refresh()
+    
+    def fetch_key_rows(self, keys, known_type, use_lua, memory_samples, counter):
+        """获取一批键的行元数据，写入行缓存并更新命名空间大小统计"""
+        fetch_rows = self.metadata_fetcher.fetch_lua if use_lua else self.metadata_fetcher.fetch_pipelined
+        rows = fetch_rows(keys, known_type, counter)
+        if memory_samples is not None:
+            self.metadata_fetcher.add_memory_usage(rows, memory_samples, counter)
+        return self.remember_rows(rows)
+    
+    def remember_rows(self, rows):
+        """把新获取的行写入行缓存和排序用的元数据数组，并更新命名空间大小统计"""
+        self.key_metadata.record(rows)
+        for row in rows:
+            self.row_cache.put(row)
+            if isinstance(row['size'], int):
+                self.namespace_index.add_size(row['key'], row['size'])
+        return rows
+    
+    def cancel_prefetch(self):
+        """使正在进行的预取在下一批之前退出"""
+        self.prefetch_generation += 1
+    
+    def schedule_prefetch(self, page_num):
+        """当前页显示后，在后台低优先级预取相邻页的行元数据到缓存
+        
+        按游标浏览时后续页的起点未知，不预取。预取按小批次进行，每批之前检查代数，
+        用户翻页、刷新或新查询后立即停止；预取失败只是少了缓存，不影响前台。
+        """
+        self.cancel_prefetch()
+        if not self.prefetch_var.get() or self.cursor_browse or not self.metadata_fetcher:
+            return
+        if page_num != self.current_page:
+            return
+        
+        pages = [page_num + 1]
+        if self.prefetch_previous and page_num > 0:
+            pages.append(page_num - 1)
+        page_key_lists = [self.slice_page_keys(p) for p in pages]
+        page_key_lists = [keys for keys in page_key_lists if keys]
+        if not page_key_lists:
+            return
+        
+        generation = self.prefetch_generation
+        known_type = self.known_key_type
+        use_lua = self.metadata_engine_var.get() == "Lua"
+        memory_samples = self.get_memory_samples() if self.memory_column_var.get() else None
+        
+        if self.async_engine:
+            missing_keys = [key for keys in page_key_lists for key in keys
+                            if self.row_cache.get(key, need_memory=memory_samples is not None) is None]
+            self.async_engine.submit(
+                self.async_engine.fetch_rows(missing_keys, known_type, memory_samples,
+                                             stopped=lambda: generation != self.prefetch_generation),
+                self.remember_rows)
             return
         
-        start_idx = self.current_page * self.page_size
-        end_idx = min(start_idx + self.page_size, len(self.all_keys))
-        page_keys = self.all_keys[start_idx:end_idx]
+        def prefetch_thread():
+            try:
+                for keys in page_key_lists:
+                    missing_keys = [key for key in keys
+                                    if self.row_cache.get(key, need_memory=memory_samples is not None) is None]
+                    for i in range(0, len(missing_keys), self.prefetch_batch_size):
+                        if generation != self.prefetch_generation:
+                            return
+                        self.fetch_key_rows(missing_keys[i:i + self.prefetch_batch_size],
+                                            known_type, use_lua, memory_samples, None)
+            except Exception:
+                pass
+        
+        threading.Thread(target=prefetch_thread, daemon=True).start()
+    
+    def display_current_page(self):
+        """显示当前页数据（缓存中仍有效的行不重新从Redis获取）"""
+        if not self.get_current_page_keys():
+            return
         
         # 清空当前显示
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.display_items = []
+        self.tree_view.reset()
         
         # 从Redis重新获取数据并显示
         self.load_page_data(self.current_page)
     
-    def get_key_info(self, key):
-        """获取键的详细信息"""
-        try:
-            # 获取数据类型
-            data_type = self.redis_client.type(key)
-            
-            # 获取TTL
-            ttl = self.redis_client.ttl(key)
-            
-            # 获取值和大小
-            value, size = self.get_value_preview_safe(key, data_type)
+    def force_refresh_page(self):
+        """忽略行元数据缓存，重新从Redis加载当前页"""
+        if self.loading or not self.get_current_page_keys():
+            return
+        self.load_page_data(self.current_page, force=True)
+    
+    def get_current_page_keys(self):
+        """获取当前页的键列表"""
+        if self.cursor_browse:
+            return list(self.cursor_page_keys)
+        
+        return self.slice_page_keys(self.current_page)
+    
+    def slice_page_keys(self, page_num):
+        """取第 page_num 页的键，跳过本地已删除的键
+        
+        删除键时只在 deleted_keys 中做标记而不移动 all_keys，页边界保持不变，
+        下次完整扫描时标记随 all_keys 一起重建。
+        """
+        source = self.all_keys if self.key_view is None else self.key_view
+        keys = source[page_num * self.page_size:(page_num + 1) * self.page_size]
+        if self.deleted_keys:
+            keys = [key for key in keys if key not in self.deleted_keys]
+        return keys
+    
+    def start_cursor_browse(self, match):
+        """进入按游标浏览模式并加载第一页"""
+        self.cursor_browse = True
+        self.cursor_match = match
+        self.page_cursors = [(0, 0)]
+        self.cursor_end_page = None
+        self.cursor_page_keys = []
+        self.all_keys = CompactKeyStore()
+        self.deleted_keys = set()
+        self.key_view = self.search_view = self.sort_state = None
+        self.key_metadata = KeyMetadataArrays(self.all_keys)
+        self.total_keys = 0
+        self.current_page = 0
+        self.load_page_data(0)
+    
+    def fetch_cursor_page_keys(self, page_num):
+        """从页起点游标开始扫描，只取该页需要的键（在后台线程中调用）
+        
+        每页起点记录为 (游标, 跳过数)：同一游标和COUNT的SCAN在键空间不变时
+        返回相同批次，跳过数表示该批次中已属于上一页的键数。
+        """
+        if page_num == 0 and self.cursor_match == "*":
+            # 全量浏览时用DBSIZE提供总数
+            try:
+                self.total_keys = self.redis_client.dbsize()
+            except Exception:
+                self.total_keys = 0
+        
+        cursor, skip = self.page_cursors[page_num]
+        keys = []
+        next_boundary = None
+        
+        while not self.cancel_loading:
+            try:
+                next_cursor, batch = self.scan_by_type(self.redis_client, cursor, self.cursor_match,
+                                                       self.page_size, self.known_key_type)
+            except redis.TimeoutError:
+                self.ui.post(self.show_scan_warning, "扫描超时，正在重试...", key="scan_warning")
+                time.sleep(0.1)
+                continue
+                
+            available = batch[skip:]
+            needed = self.page_size - len(keys)
+            if len(available) > needed:
+                # 本批次超出一页，下一页从同一游标跳过已取的键开始
+                keys.extend(available[:needed])
+                next_boundary = (cursor, skip + needed)
+                break
+                
+            keys.extend(available)
+            skip = 0
+            cursor = next_cursor
+            if cursor == 0:
+                break
+            if len(keys) == self.page_size:
+                next_boundary = (cursor, 0)
+                break
+        
+        # 二进制安全模式下SCAN返回字节，只解码这一页的键
+        keys = [reply_text(key) for key in keys]
+        if self.cancel_loading:
+            return keys
             
-            return {
-                'type': data_type,
-                'value': value,
-                'ttl': ttl,
-                'size': size
-            }
-        except Exception as e:
-            return {
-                'type': 'error',
-                'value': f'Error: {str(e)}',
-                'ttl': -1,
-                'size': 0
-            }
+        # 记录下一页起点；游标归零说明已到最后一页
+        del self.page_cursors[page_num + 1:]
+        if next_boundary:
+            self.page_cursors.append(next_boundary)
+            self.cursor_end_page = None
+        else:
+            self.cursor_end_page = page_num
+        self.cursor_page_keys = keys
+        return keys
+    
+    def format_row(self, row):
+        """把一行元数据格式化为表格显示的列"""
+        ttl_text = self.format_ttl(row['ttl']) if isinstance(row['ttl'], int) else "N/A"
+        return (row['key'], row['type'], self.format_value_for_display(row['value']), ttl_text, row['size'],
+                self.format_memory(row))
+    
+    def format_memory(self, row):
+        """格式化内存占用列，估算值以 ≈ 开头"""
+        if 'memory' not in row:
+            return ""
+        if row['memory'] is None:
+            return "N/A"
+        prefix = "≈" if row['memory_estimated'] else ""
+        return prefix + self.format_size(row['memory'])
+    
+    def render_row(self, index):
+        """虚拟列表渲染可见行时取列值：二进制安全模式下键名和值预览只在这里解码"""
+        values = self.display_items[index]
+        key, data_type, value = values[:3]
+        if isinstance(value, bytes):
+            value = KeyMetadataFetcher.format_bytes_preview(value, values[4])
+        return (display_text(key), data_type, value) + tuple(values[3:])
     
     def format_value_for_display(self, value):
-        """格式化值用于显示"""
+        """格式化值用于显示（二进制安全模式下的预览字节保持原样，由 render_row 解码）"""
         if value is None:
             return "None"
+        if isinstance(value, bytes):
+            return value
         
         value_str = str(value)
         if len(value_str) > 100:
@@ -999,135 +3887,27 @@ class AzureRedisManager:
                 return f"{size/(1024*1024):.1f}MB"
         return str(size)
     
-    def update_page_info(self):
-        """更新分页信息"""
-        if self.total_keys == 0:
-            self.page_info_var.set("第 0 页，共 0 页")
-            self.stats_var.set("总计: 0 个键")
-            return
-        
-        total_pages = (self.total_keys + self.page_size - 1) // self.page_size
-        current_page_display = self.current_page + 1
-        
-        self.page_info_var.set(f"第 {current_page_display} 页，共 {total_pages} 页")
-        self.stats_var.set(f"总计: {self.total_keys} 个键")
-        
-        # 更新分页按钮状态
-        self.prev_btn.config(state="normal" if self.current_page > 0 else "disabled")
-        self.next_btn.config(state="normal" if self.current_page < total_pages - 1 else "disabled")
-    
-    def update_data_display(self, data_items, status_message):
-        """更新数据显示"""
-        # 清空当前数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # 插入新数据
-        for item in data_items:
-            self.tree.insert("", "end", values=item)
-        
-        # 更新状态和分页信息
-        self.status_var.set(status_message)
-        self.update_page_info()
-        
-        # 更新按钮状态
-        self.loading = False
-        self.refresh_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
-        
-        # 根据查询模式启用查询按钮
-        if self.query_mode_var.get() == "key":
-            self.query_btn.config(state="normal")
-    
-    def update_scan_progress(self, keys_found, scan_count):
-        """更新扫描进度"""
+    def update_scan_progress(self, keys_found, scan_count, scan_stats=None):
+        """更新扫描进度（scan_stats 为自适应扫描的COUNT和吞吐量）"""
         mode = self.query_mode_var.get()
         if mode == "all":
-            self.status_var.set(f"正在扫描所有键... 已找到 {keys_found} 个键 (扫描轮次: {scan_count})")
+            message = f"正在扫描所有键... 已找到 {keys_found} 个键 (扫描轮次: {scan_count})"
         else:
-            self.status_var.set(f"正在查询... 已找到 {keys_found} 个匹配键 (扫描轮次: {scan_count})")
-        
-    def show_scan_warning(self, message):
-        """显示扫描警告"""
+            message = f"正在查询... 已找到 {keys_found} 个匹配键 (扫描轮次: {scan_count})"
+        if scan_stats:
+            message += f" | {scan_stats}"
         self.status_var.set(message)
         
-    def show_refresh_error(self, error_message):
-        """显示刷新错误"""
-        self.status_var.set(f"错误: {error_message}")
-        self.loading = False
-        self.refresh_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
-        
-        # 根据查询模式启用查询按钮
-        if self.query_mode_var.get() == "key":
-            self.query_btn.config(state="normal")
-        
-        messagebox.showerror("错误", error_message)
-    
-    def on_loading_cancelled(self):
-        """加载取消时的处理"""
-        self.loading = False
-        self.cancel_loading = False
-        self.refresh_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
-        
-        # 根据查询模式启用查询按钮
-        if self.query_mode_var.get() == "key":
-            self.query_btn.config(state="normal")
-        
-        self.status_var.set("操作已取消")
-    
-    def stop_loading(self):
-        """停止加载"""
-        self.cancel_loading = True
-        self.status_var.set("正在停止...")
-    
     def update_load_progress(self, current, total, page_num):
-        """更新加载进度"""
-        percentage = int((current / total) * 100)
-        self.status_var.set(f"正在加载第 {page_num} 页... {percentage}% ({current}/{total})")
-    
-    def get_value_preview_safe(self, key, data_type):
-        """安全获取值预览和大小"""
-        try:
-            if data_type == "string":
-                # 只获取前100个字符作为预览
-                value = self.redis_client.get(key)
-                if value is None:
-                    return "None", 0
-                value_str = str(value)
-                value_text = value_str[:100]
-                if len(value_str) > 100:
-                    value_text += "..."
-                return value_text, len(value_str)
-                
-            elif data_type == "list":
-                length = self.redis_client.llen(key)
-                return f"List ({length} items)", length
-                
-            elif data_type == "set":
-                length = self.redis_client.scard(key)
-                return f"Set ({length} members)", length
-                
-            elif data_type == "zset":
-                length = self.redis_client.zcard(key)
-                return f"ZSet ({length} members)", length
-                
-            elif data_type == "hash":
-                length = self.redis_client.hlen(key)
-                return f"Hash ({length} fields)", length
-                
-            else:
-                return f"Unknown type: {data_type}", 0
-                
-        except redis.TimeoutError:
-            return "获取超时", 0
-        except Exception as e:
-            return f"错误: {str(e)}", 0
+        """更新加载进度"""
+        percentage = int((current / total) * 100)
+        self.status_var.set(f"正在加载第 {page_num} 页... {percentage}% ({current}/{total})")
     
     def stop_loading(self):
         """停止加载"""
         self.cancel_loading = True
+        if self.scan_stop_event:
+            self.scan_stop_event.set()
         self.status_var.set("正在停止加载...")
         
     def on_loading_cancelled(self):
@@ -1136,29 +3916,52 @@ class AzureRedisManager:
         self.cancel_loading = False
         self.refresh_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
+        if self.query_mode_var.get() == "key":
+            self.query_btn.config(state="normal")
         self.status_var.set("加载已取消")
     
-    def update_data_display(self, data_items, status_message):
-        """更新数据显示"""
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # 添加新数据
-        for item in data_items:
-            self.tree.insert("", "end", values=item)
+    def show_page_rows(self, page_rows, status_message, keep_position=False):
+        """显示一页行元数据，并保存为当前页的行模型"""
+        self.page_rows = page_rows
+        self.memory_sort_desc = False
+        self.tree.heading("memory", text="内存占用")
+        # 新页面使进行中的本地搜索作废，并按当前搜索文本过滤
+        self.local_search_generation += 1
+        search_text = self.local_search_var.get().lower()
+        if search_text:
+            page_rows = [row for row in page_rows if self.row_matches_search(row, search_text)]
+            status_message += f"，本地搜索显示 {len(page_rows)} 项"
+        self.update_data_display([self.format_row(row) for row in page_rows], status_message, keep_position)
+    
+    def update_data_display(self, data_items, status_message, keep_position=False):
+        """更新数据显示（keep_position 为 True 时保持当前滚动位置和选中行）"""
+        # 替换虚拟列表的数据（只渲染可见行）
+        self.display_items = list(data_items)
+        if keep_position:
+            self.tree_view.refresh()
+        else:
+            self.tree_view.reset()
             
-        # 更新状态和按钮
+        # 更新状态和按钮（流式扫描仍在进行时保留停止按钮）
         self.loading = False
         self.cancel_loading = False
-        self.refresh_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
+        if self.scanning:
+            self.refresh_btn.config(state="disabled")
+            self.stop_btn.config(state="normal")
+        else:
+            self.refresh_btn.config(state="normal")
+            self.stop_btn.config(state="disabled")
         
         # 更新分页信息
         self.update_page_info()
         
         # 更新状态
-        if self.total_keys > 0:
+        if self.cursor_browse:
+            self.status_var.set(f"已连接 - {status_message} (按游标浏览)")
+        elif self.key_view is not None:
+            total_pages = max(1, (len(self.key_view) + self.page_size - 1) // self.page_size)
+            self.status_var.set(f"已连接 - {status_message} ({self.key_view_label}，共 {total_pages} 页)")
+        elif self.total_keys > 0:
             total_pages = (self.total_keys + self.page_size - 1) // self.page_size
             self.status_var.set(f"已连接 - {status_message} (总共 {self.total_keys} 个键，共 {total_pages} 页)")
         else:
@@ -1166,18 +3969,48 @@ class AzureRedisManager:
     
     def update_page_info(self):
         """更新分页信息"""
-        if self.total_keys > 0:
-            total_pages = (self.total_keys + self.page_size - 1) // self.page_size
+        self.update_sort_headings()
+        if self.cursor_browse:
+            self.update_cursor_page_info()
+        elif self.paged_key_count() > 0:
+            total_pages = (self.paged_key_count() + self.page_size - 1) // self.page_size
             self.page_info_var.set(f"第 {self.current_page + 1} 页，共 {total_pages} 页")
+            live_keys = self.total_keys - len(self.deleted_keys)
+            if self.search_view is not None:
+                stats = f"匹配: {len(self.search_view)} / 总计: {live_keys} 个键"
+            else:
+                stats = f"总计: {live_keys} 个键"
+            if self.metadata_fill is self.key_metadata:
+                stats += f"，排序元数据 {min(self.key_metadata.filled, len(self.all_keys))}/{len(self.all_keys)}"
+            self.stats_var.set(stats)
             
             # 更新分页按钮状态
             self.prev_btn.config(state="normal" if self.current_page > 0 else "disabled")
             self.next_btn.config(state="normal" if self.current_page < total_pages - 1 else "disabled")
         else:
             self.page_info_var.set("第 0 页，共 0 页")
+            self.stats_var.set("总计: 0 个键")
             self.prev_btn.config(state="disabled")
             self.next_btn.config(state="disabled")
     
+    def update_cursor_page_info(self):
+        """更新按游标浏览时的分页信息（总页数在扫描到末尾前未知）"""
+        if self.cursor_end_page is not None:
+            total_text = str(self.cursor_end_page + 1)
+        elif self.total_keys > 0:
+            total_text = f"约 {(self.total_keys + self.page_size - 1) // self.page_size}"
+        else:
+            total_text = "?"
+        self.page_info_var.set(f"第 {self.current_page + 1} 页，共 {total_text} 页")
+        
+        if self.total_keys > 0:
+            self.stats_var.set(f"总计: {self.total_keys} 个键")
+        else:
+            self.stats_var.set(f"已浏览: {self.current_page * self.page_size + len(self.cursor_page_keys)} 个键")
+        
+        self.prev_btn.config(state="normal" if self.current_page > 0 else "disabled")
+        self.next_btn.config(state="normal" if self.current_page + 1 < len(self.page_cursors) else "disabled")
+    
     def prev_page(self):
         """上一页"""
         if self.current_page > 0 and not self.loading:
@@ -1185,14 +4018,286 @@ class AzureRedisManager:
     
     def next_page(self):
         """下一页"""
-        total_pages = (self.total_keys + self.page_size - 1) // self.page_size
+        if self.cursor_browse:
+            if self.current_page + 1 < len(self.page_cursors) and not self.loading:
+                self.load_page_data(self.current_page + 1)
+            return
+            
+        total_pages = (self.paged_key_count() + self.page_size - 1) // self.page_size
         if self.current_page < total_pages - 1 and not self.loading:
             self.load_page_data(self.current_page + 1)
     
+    def paged_key_count(self):
+        """分页的键总数：全局搜索或排序时为数据源的键数，否则为键列表长度"""
+        return self.total_keys if self.key_view is None else len(self.key_view)
+    
+    def run_global_search(self, event=None):
+        """在已扫描的全部键名中搜索（后台线程），匹配的键作为分页数据源"""
+        if not self.is_connected or self.loading or self.scanning:
+            return
+        if self.cursor_browse:
+            messagebox.showinfo("提示", "按游标浏览时没有完整的键列表，请关闭按游标浏览后重新扫描")
+            return
+        pattern = self.global_search_var.get()
+        if not pattern:
+            self.clear_global_search()
+            return
+        
+        mode = self.GLOBAL_SEARCH_MODES[self.global_search_mode_var.get()]
+        ignore_case = self.global_search_case_var.get()
+        store = self.all_keys
+        self.global_search_generation += 1
+        generation = self.global_search_generation
+        estimate = CompactKeyStore.SEARCH_COST_MS[mode] * len(store) / 1000000
+        self.status_var.set(f"正在 {len(store)} 个键中搜索 '{pattern}'... (预计约 {estimate:.0f}ms，"
+                            f"耗时随键数线性增长)")
+        
+        def search_thread():
+            started = time.perf_counter()
+            try:
+                indexes = store.search(pattern, mode, ignore_case,
+                                       stopped=lambda: generation != self.global_search_generation)
+            except re.error as e:
+                self.ui.post(self.status_var.set, f"无效的正则表达式: {str(e)}", key="status")
+                return
+            if generation == self.global_search_generation:
+                self.ui.post(self.show_global_search_results, store, indexes, pattern,
+                             time.perf_counter() - started)
+        
+        threading.Thread(target=search_thread, daemon=True).start()
+    
+    def show_global_search_results(self, store, indexes, pattern, elapsed):
+        """把搜索结果设为分页数据源并显示第一页"""
+        if store is not self.all_keys or self.loading:
+            # 搜索期间键列表已被重新扫描替换
+            return
+        self.search_view = KeyIndexView(store, indexes)
+        self.search_label = f"全局搜索 '{pattern}' 匹配 {len(indexes)} 个键，用时 {elapsed * 1000:.0f}ms"
+        self.update_key_view()
+    
+    def clear_global_search(self):
+        """退出全局搜索，回到完整键列表（保留排序）的第一页"""
+        self.global_search_generation += 1
+        if self.search_view is None:
+            return
+        self.search_view = None
+        self.update_key_view()
+    
+    def sort_by_column(self, column):
+        """按列对全部键（全局搜索时为匹配的键）排序，再次点击切换升序/降序
+        
+        只使用加载过程中记录的元数据，不重新查询服务器；大小默认降序，其余列默认升序。
+        """
+        if not self.is_connected or self.loading or self.scanning:
+            return
+        if self.cursor_browse:
+            messagebox.showinfo("提示", "按游标浏览时没有完整的键列表，请关闭按游标浏览后重新扫描")
+            return
+        if self.sort_state is not None and self.sort_state[0] == column:
+            self.sort_state = (column, not self.sort_state[1])
+        else:
+            self.sort_state = (column, column == "size")
+        self.update_key_view()
+    
+    def update_key_view(self):
+        """由全局搜索结果和排序列生成分页数据源，排序在后台线程进行，完成后显示第一页"""
+        self.sort_generation += 1
+        if self.sort_state is None:
+            self.key_view = self.search_view
+            self.key_view_label = self.search_label
+            self.show_first_page()
+            return
+        
+        column, descending = self.sort_state
+        store = self.all_keys
+        search_view = self.search_view
+        metadata = self.key_metadata
+        indexes = range(len(store)) if search_view is None else search_view.indexes
+        generation = self.sort_generation
+        self.status_var.set(f"正在对 {len(indexes)} 个键排序...")
+        
+        def sort_thread():
+            started = time.perf_counter()
+            order = metadata.sort(column, indexes, descending)
+            if generation == self.sort_generation:
+                self.ui.post(self.show_sorted_keys, store, order, time.perf_counter() - started)
+        
+        threading.Thread(target=sort_thread, daemon=True).start()
+    
+    def show_sorted_keys(self, store, order, elapsed):
+        """把排序结果设为分页数据源并显示第一页"""
+        if store is not self.all_keys or self.loading or self.sort_state is None:
+            return
+        column, descending = self.sort_state
+        label = f"按{self.column_titles[column]}{'降序' if descending else '升序'}排序，用时 {elapsed * 1000:.0f}ms"
+        if column != "key":
+            known = self.key_metadata.known_count()
+            if not self.key_metadata.is_complete():
+                label += f"，部分排序：{known}/{len(store)} 个键有元数据，其余排在最后"
+                label += "，正在补全" if self.metadata_fill is self.key_metadata else "，可点击“补全排序元数据”获取"
+            elif known < len(store):
+                label += f"，{len(store) - known} 个键已删除或读取失败，排在最后"
+        if self.search_view is not None:
+            label = f"{self.search_label}，{label}"
+        self.key_view = KeyIndexView(store, order)
+        self.key_view_label = label
+        self.show_first_page()
+    
+    def fill_sort_metadata(self):
+        """补全排序元数据按钮：确认后在后台为还没有元数据的键获取类型、TTL和大小"""
+        if not self.is_connected or self.loading or self.scanning or not self.metadata_fetcher:
+            return
+        if self.cursor_browse:
+            messagebox.showinfo("提示", "按游标浏览时没有完整的键列表，请关闭按游标浏览后重新扫描")
+            return
+        metadata = self.key_metadata
+        if self.metadata_fill is metadata:
+            self.status_var.set("正在补全排序元数据...")
+            return
+        missing = len(self.all_keys) - metadata.known_count()
+        if metadata.is_complete() or missing <= 0:
+            messagebox.showinfo("提示", "所有键都已有排序元数据")
+            return
+        if messagebox.askyesno("补全排序元数据",
+                               f"将为 {missing} 个键获取类型、TTL和大小（不读取值），键很多时会持续占用服务器一段时间。\n"
+                               "是否继续？"):
+            self.start_metadata_fill()
+    
+    def start_metadata_fill(self):
+        """在后台为还没有元数据的键批量获取元数据，使按类型、TTL、大小排序覆盖全部键
+        
+        按键序号顺序分批用 fetch_sort_metadata 获取，只写入排序用的元数据数组，不读取值预览、
+        不登记客户端缓存跟踪，也不占用行缓存；前台加载页面时暂停让路。
+        重新扫描或断开连接后元数据数组被替换，线程在下一批之前退出。全部处理完后按当前排序列重新排序。
+        """
+        metadata = self.key_metadata
+        if self.metadata_fill is metadata or metadata.is_complete() or not self.metadata_fetcher:
+            return
+        self.metadata_fill = metadata
+        store = self.all_keys
+        known_type = self.known_key_type
+        workers = self.page_load_workers
+        fetcher = self.metadata_fetcher
+        
+        def cancelled():
+            return metadata is not self.key_metadata or not self.is_connected
+        
+        def fill_thread():
+            try:
+                while not cancelled() and not metadata.is_complete():
+                    if self.loading:
+                        time.sleep(0.1)
+                        continue
+                    indexes, position = metadata.missing(metadata.filled,
+                                                         KeyMetadataFetcher.PAGE_BATCH_SIZE * max(workers, 4))
+                    keys = [store[index] for index in indexes]
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        results = executor.map(lambda batch_keys: fetcher.fetch_sort_metadata(batch_keys, known_type),
+                                               fetcher.split_batches(keys, workers))
+                        rows = [row for batch_rows in results for row in batch_rows]
+                    if cancelled():
+                        return
+                    metadata.record(rows, indexes)
+                    metadata.filled = position
+                    self.ui.post(self.update_page_info, key="metadata_fill")
+            except Exception as e:
+                self.ui.post(self.status_var.set, f"获取排序元数据失败: {str(e)}", key="status")
+            finally:
+                self.ui.post(self.on_metadata_fill_finished, metadata)
+        
+        threading.Thread(target=fill_thread, daemon=True).start()
+    
+    def on_metadata_fill_finished(self, metadata):
+        """元数据补全结束：全部处理完时按当前排序列重新排序，出错时再次点击补全按钮可继续"""
+        if self.metadata_fill is metadata:
+            self.metadata_fill = None
+        if metadata is not self.key_metadata:
+            return
+        if metadata.is_complete() and self.sort_state is not None and self.sort_state[0] != "key":
+            if self.loading:
+                self.root.after(200, self.on_metadata_fill_finished, metadata)
+            else:
+                self.update_key_view()
+        else:
+            self.update_page_info()
+    
+    def show_first_page(self):
+        """数据源改变后显示第一页"""
+        self.current_page = 0
+        if self.loading:
+            self.update_page_info()
+        elif self.paged_key_count():
+            self.load_page_data(0)
+        elif self.search_view is not None:
+            self.show_page_rows([], "无匹配的键")
+        else:
+            self.update_page_info()
+    
+    def update_sort_headings(self):
+        """在排序列标题上显示升序/降序箭头"""
+        for column, title in self.column_titles.items():
+            if self.sort_state is not None and self.sort_state[0] == column:
+                title += " ▼" if self.sort_state[1] else " ▲"
+            self.tree.heading(column, text=title)
+    
     def on_page_size_change(self, event):
         """页大小改变事件"""
         if not self.loading and self.total_keys > 0:
             self.refresh_data()
+    
+    def get_pool_size(self):
+        """连接池大小：页面加载线程数加预留连接"""
+        return self.page_load_workers + self.reserved_connections
+    
+    def on_workers_change(self, event):
+        """并发线程数改变：已连接时同步扩大连接池上限"""
+        self.page_load_workers = int(self.workers_var.get())
+        if not self.redis_client:
+            return
+        
+        pool_size = self.get_pool_size()
+        if self.cluster_mode:
+            # 集群中每个节点有独立的连接池，新发现的节点使用 nodes_manager 中的参数
+            self.redis_client.nodes_manager.connection_kwargs['max_connections'] = pool_size
+            pools = [node.redis_connection.connection_pool for node in self.redis_client.get_nodes()
+                     if node.redis_connection]
+        else:
+            pools = [self.redis_client.connection_pool]
+        for pool in pools:
+            pool.max_connections = max(pool.max_connections, pool_size)
+    
+    def get_memory_samples(self):
+        """读取 MEMORY USAGE 的 SAMPLES 设置，输入无效时使用默认值"""
+        try:
+            return max(0, int(self.memory_samples_var.get()))
+        except ValueError:
+            return KeyMetadataFetcher.MEMORY_SAMPLES
+    
+    def on_memory_column_toggle(self):
+        """显示或隐藏内存占用列，显示时重新加载当前页以获取内存数据"""
+        columns = self.tree["columns"]
+        if self.memory_column_var.get():
+            self.tree.configure(displaycolumns=columns)
+            if self.page_rows and not self.loading and 'memory' not in self.page_rows[0]:
+                self.display_current_page()
+        else:
+            self.tree.configure(displaycolumns=columns[:-1])
+    
+    def sort_by_memory(self):
+        """按内存占用排序当前页（再次点击切换升序/降序），无内存数据的行排在最后"""
+        memory = {row['key']: row.get('memory') for row in self.page_rows}
+        self.memory_sort_desc = not self.memory_sort_desc
+        
+        def sort_key(values):
+            size = memory.get(values[0])
+            if size is None:
+                return (1, 0)
+            return (0, -size if self.memory_sort_desc else size)
+        
+        self.display_items.sort(key=sort_key)
+        self.tree_view.reset()
+        arrow = "▼" if self.memory_sort_desc else "▲"
+        self.tree.heading("memory", text=f"内存占用 {arrow}")
         
     def show_refresh_error(self, error_message):
         """显示刷新错误"""
@@ -1200,77 +4305,282 @@ class AzureRedisManager:
         self.cancel_loading = False
         self.refresh_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
+        if self.query_mode_var.get() == "key":
+            self.query_btn.config(state="normal")
         self.status_var.set(f"加载失败: {error_message}")
         messagebox.showerror("错误", error_message)
             
+    def show_namespace_tree(self):
+        """打开命名空间树窗口"""
+        if not self.is_connected:
+            return
+            
+        NamespaceTreeWindow(self.root, self)
+    
+    def rebuild_namespace_index(self, delimiter):
+        """按新的分隔符从已扫描的键重建命名空间索引（不重新扫描Redis）"""
+        self.namespace_delimiter = delimiter
+        keys = self.all_keys
+        deleted_keys = self.deleted_keys
+        namespace_index = KeyNamespaceIndex(keys, delimiter)
+        self.namespace_index = namespace_index
+        
+        def rebuild_thread():
+            # 先计入再扣除已删除的键：重建期间删除的键若尚未计入，remove_key 会忽略，由这里扣除
+            for start in range(0, len(keys), 10000):
+                batch = keys[start:start + 10000]
+                namespace_index.add_keys(batch, start)
+                for key in batch:
+                    if key in deleted_keys:
+                        namespace_index.remove_key(key)
+            
+        threading.Thread(target=rebuild_thread, daemon=True).start()
+            
     def add_key_dialog(self):
         """添加新键的对话框"""
         if not self.is_connected:
             return
             
-        dialog = AddKeyDialog(self.root, self.redis_client)
-        if dialog.result:
-            self.refresh_data()
+        AddKeyDialog(self.root, self.run_pipeline, on_added=lambda key: self.apply_keys_added([key]))
+            
+    def get_selected_row(self):
+        """返回选中行的 (键, 类型)，未选中时返回 None
+        
+        从显示模型取值而不是读Treeview的values，避免数字形式的键被Tk转换成int。
+        """
+        index = self.tree_view.get_selected_index()
+        if index is None or not self.tree.selection():
+            return None
+        values = self.display_items[index]
+        return values[0], values[1]
+        
+    def find_display_index(self, key):
+        """返回键在当前显示列表中的位置，不在时返回 None"""
+        for index, values in enumerate(self.display_items):
+            if values[0] == key:
+                return index
+        return None
+        
+    def refetch_rows(self, keys, on_done):
+        """在后台重新获取少量键的行数据（同时写入行缓存），完成后在主线程调用 on_done(rows)"""
+        memory_samples = self.get_memory_samples() if self.memory_column_var.get() else None
+        if self.async_engine:
+            self.async_engine.submit(self.async_engine.fetch_rows(keys, None, memory_samples),
+                                     on_done=lambda rows: on_done(self.remember_rows(rows)),
+                                     on_error=lambda e: self.status_var.set(f"获取键信息失败: {str(e)}"))
+            return
+        
+        def fetch_thread():
+            try:
+                rows = self.fetch_key_rows(keys, None, False, memory_samples, None)
+            except Exception as e:
+                self.ui.post(self.status_var.set, f"获取键信息失败: {str(e)}", key="status")
+                return
+            self.ui.post(on_done, rows)
+            
+        threading.Thread(target=fetch_thread, daemon=True).start()
+        
+    def apply_row_update(self, row):
+        """用新获取的行替换当前页中同名键的行，只重绘该行"""
+        key = row['key']
+        for i, existing in enumerate(self.page_rows):
+            if existing['key'] == key:
+                self.page_rows[i] = row
+        index = self.find_display_index(key)
+        if index is not None:
+            self.display_items[index] = self.format_row(row)
+            self.tree_view.refresh()
+        
+    def apply_keys_added(self, keys):
+        """新增或修改键后只重新获取当前页中受影响的行，不重新扫描"""
+        self.row_cache.invalidate(*keys)
+        self.value_cache.invalidate(*keys)
+        if not self.cursor_browse:
+            added = []
+            for key in keys:
+                if key in self.deleted_keys:
+                    self.deleted_keys.discard(key)
+                    added.append(key)
+                elif self.all_keys.append(key):
+                    added.append(key)
+            if added:
+                self.total_keys = len(self.all_keys)
+                self.namespace_index.add_keys(added)
+        self.update_page_info()
+        
+        page_keys = set(self.get_current_page_keys())
+        refetch = [key for key in keys if key in page_keys]
+        if refetch:
+            self.refetch_rows(refetch, self.apply_fetched_rows)
+            
+    def apply_fetched_rows(self, rows):
+        """把重新获取的行写回当前页：已显示的行原地更新，新行追加到末尾"""
+        page_keys = set(self.get_current_page_keys())
+        shown = {row['key'] for row in self.page_rows}
+        for row in rows:
+            if row['key'] in shown:
+                self.apply_row_update(row)
+            elif row['key'] in page_keys:
+                self.page_rows.append(row)
+                if self.row_matches_search(row, self.local_search_var.get().lower()):
+                    self.display_items.append(self.format_row(row))
+        self.tree_view.refresh()
+        
+    def apply_keys_deleted(self, keys):
+        """删除键后从当前页移除这些行，并在键列表中标记删除，不重新扫描"""
+        self.row_cache.invalidate(*keys)
+        self.value_cache.invalidate(*keys)
+        for key in keys:
+            if not self.cursor_browse and key not in self.deleted_keys and key in self.all_keys:
+                self.deleted_keys.add(key)
+                self.namespace_index.remove_key(key)
+        removed = set(keys)
+        self.page_rows = [row for row in self.page_rows if row['key'] not in removed]
+        self.display_items = [values for values in self.display_items if values[0] not in removed]
+        self.tree_view.refresh()
+        self.update_page_info()
+        
+    def on_live_mode_toggle(self):
+        """切换实时更新：已连接时立即开始或停止订阅"""
+        if not self.is_connected:
+            return
+        if self.live_var.get():
+            self.start_live_mode()
+        else:
+            self.stop_live_mode()
+            self.status_var.set("实时更新已关闭")
+            
+    def start_live_mode(self):
+        """订阅当前查询模式的键空间通知"""
+        self.stop_live_mode()
+        if self.cluster_mode:
+            # 键空间通知只在产生事件的分片上发布，集群需要逐个节点订阅
+            self.live_var.set(False)
+            messagebox.showinfo("提示", "集群模式暂不支持实时更新")
+            return
+        db = self.redis_client.connection_pool.connection_kwargs.get('db', 0)
+        self.live_listener = KeyspaceListener(
+            self.redis_client, db, self.live_match,
+            lambda events: self.ui.extend("keyspace_events", events, self.apply_keyspace_events),
+            lambda message: self.ui.post(self.status_var.set, message, key="status"))
+        self.live_listener.start()
+        
+    def stop_live_mode(self):
+        if self.live_listener:
+            self.live_listener.stop()
+            self.live_listener = None
             
+    def set_live_match(self, pattern):
+        """记录当前查询的匹配模式，实时更新开启时按新模式重新订阅"""
+        if pattern == self.live_match:
+            return
+        self.live_match = pattern
+        self.live_matcher = CompactKeyStore.glob_matcher(pattern)
+        if self.live_listener:
+            self.start_live_mode()
+            
+    def apply_keyspace_events(self, events):
+        """在主线程中批量应用键空间事件（同一键只按最后一个事件处理）
+        
+        删除、过期和驱逐的键从键列表和当前页移除；其余事件视为新增或修改：
+        匹配当前查询的新键追加到键列表，当前页中的键重新获取行数据。
+        """
+        if not self.live_listener:
+            return
+        if self.loading:
+            # 扫描或加载期间键列表会被整体替换，稍后再应用
+            self.root.after(200, self.apply_keyspace_events, events)
+            return
+        
+        latest = {}
+        for event, key in events:
+            latest[key] = event
+        removed = [key for key, event in latest.items() if event in KeyspaceListener.REMOVAL_EVENTS]
+        changed = [key for key, event in latest.items()
+                   if event not in KeyspaceListener.REMOVAL_EVENTS and self.live_key_matches(key, event)]
+        if removed:
+            self.apply_keys_deleted(removed)
+        if changed:
+            self.apply_keys_added(changed)
+            
+    def live_key_matches(self, key, event):
+        """判断键事件是否属于当前查询结果：已在列表中的键总是处理，新键需匹配模式和类型过滤"""
+        if key in self.all_keys and key not in self.deleted_keys:
+            return True
+        if not self.live_matcher(key):
+            return False
+        if self.known_key_type:
+            return KeyspaceListener.EVENT_TYPES.get(event) == self.known_key_type
+        return True
+        
     def delete_selected_key(self):
         """删除选中的键"""
-        selected_item = self.tree.selection()
-        if not selected_item:
+        selected = self.get_selected_row()
+        if not selected:
             messagebox.showwarning("警告", "请选择要删除的键")
             return
             
         # 获取选中的键
-        key = self.tree.item(selected_item[0])["values"][0]
+        key = selected[0]
         
         # 确认删除
-        if messagebox.askyesno("确认删除", f"确定要删除键 '{key}' 吗？"):
-            try:
-                self.redis_client.delete(key)
-                messagebox.showinfo("成功", f"键 '{key}' 已删除")
-                self.refresh_data()
-            except Exception as e:
-                messagebox.showerror("错误", f"删除失败: {str(e)}")
+        if messagebox.askyesno("确认删除", f"确定要删除键 '{display_text(key)}' 吗？"):
+            def on_deleted(result):
+                self.apply_keys_deleted([key])
+                messagebox.showinfo("成功", f"键 '{display_text(key)}' 已删除")
+                
+            self.run_command("delete", key, on_done=on_deleted,
+                             on_error=lambda e: messagebox.showerror("错误", f"删除失败: {str(e)}"))
                 
     def edit_selected_key(self):
         """编辑选中的键"""
-        selected_item = self.tree.selection()
-        if not selected_item:
+        selected = self.get_selected_row()
+        if not selected:
             messagebox.showwarning("警告", "请选择要编辑的键")
             return
             
         # 获取选中的键和类型
-        item_values = self.tree.item(selected_item[0])["values"]
-        key = item_values[0]
-        data_type = item_values[1]
+        key, data_type = selected
         
-        try:
-            if data_type == "string":
-                current_value = self.redis_client.get(key)
-                new_value = simpledialog.askstring("编辑值", f"编辑键 '{key}' 的值:", initialvalue=current_value)
-                if new_value is not None:
-                    self.redis_client.set(key, new_value)
-                    messagebox.showinfo("成功", "值已更新")
-                    self.refresh_data()
-            else:
-                messagebox.showinfo("信息", f"暂不支持编辑 {data_type} 类型的数据")
-                
-        except Exception as e:
+        if data_type != "string":
+            messagebox.showinfo("信息", f"暂不支持编辑 {data_type} 类型的数据")
+            return
+        
+        def on_error(e):
             messagebox.showerror("错误", f"编辑失败: {str(e)}")
             
+        def on_updated(result):
+            self.row_cache.invalidate(key)
+            self.refetch_rows([key], lambda rows: [self.apply_row_update(row) for row in rows])
+            messagebox.showinfo("成功", "值已更新")
+            
+        def on_current_value(current_value):
+            if isinstance(current_value, bytes):
+                # 二进制安全模式：只有有效UTF-8的值能作为文本编辑，写回时按UTF-8编码
+                try:
+                    current_value = current_value.decode('utf-8')
+                except UnicodeDecodeError:
+                    messagebox.showinfo("信息", "该值不是有效的UTF-8文本（二进制数据），不支持编辑")
+                    return
+            new_value = simpledialog.askstring("编辑值", f"编辑键 '{display_text(key)}' 的值:",
+                                               initialvalue=current_value)
+            if new_value is not None:
+                self.run_command("set", key, new_value, on_done=on_updated, on_error=on_error)
+                
+        self.run_command("get", key, on_done=on_current_value, on_error=on_error)
+            
     def on_item_double_click(self, event):
         """双击事件处理"""
         self.edit_selected_key()
         
     def on_item_single_click(self, event):
         """单击事件处理 - 显示完整值"""
-        selected_item = self.tree.selection()
-        if not selected_item:
+        selected = self.get_selected_row()
+        if not selected:
             return
             
         # 获取选中的键和类型
-        item_values = self.tree.item(selected_item[0])["values"]
-        key = item_values[0]
-        data_type = item_values[1]
+        key, data_type = selected
         
         # 显示完整值
         self.show_full_value(key, data_type)
@@ -1283,7 +4593,7 @@ class AzureRedisManager:
         try:
             # 创建显示窗口
             value_window = tk.Toplevel(self.root)
-            value_window.title(f"键值详情: {key}")
+            value_window.title(f"键值详情: {display_text(key)}")
             value_window.geometry("600x400")
             value_window.resizable(True, True)
             value_window.transient(self.root)
@@ -1304,18 +4614,28 @@ class AzureRedisManager:
             
             # 显示键信息
             ttk.Label(info_frame, text="键名:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
-            ttk.Label(info_frame, text=key, font=("", 9, "bold")).grid(row=0, column=1, sticky=tk.W)
+            ttk.Label(info_frame, text=display_text(key), font=("", 9, "bold")).grid(row=0, column=1, sticky=tk.W)
             
             ttk.Label(info_frame, text="类型:").grid(row=0, column=2, sticky=tk.W, padx=(20, 5))
             ttk.Label(info_frame, text=data_type, font=("", 9, "bold")).grid(row=0, column=3, sticky=tk.W)
             
-            # TTL信息
-            ttl = self.redis_client.ttl(key)
-            ttl_text = "永不过期" if ttl == -1 else f"{ttl}秒" if ttl > 0 else "已过期"
+            # TTL信息（asyncio引擎下异步获取，窗口先显示占位文本）
             ttk.Label(info_frame, text="TTL:").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
-            ttl_label = ttk.Label(info_frame, text=ttl_text, font=("", 9, "bold"))
+            ttl_label = ttk.Label(info_frame, text="...", font=("", 9, "bold"))
             ttl_label.grid(row=1, column=1, sticky=tk.W)
             
+            def show_ttl(ttl):
+                if ttl_label.winfo_exists():
+                    ttl_label.config(text="永不过期" if ttl == -1 else f"{ttl}秒" if ttl > 0 else "已过期")
+            
+            self.run_command("ttl", key, on_done=show_ttl)
+            
+            # 集合类型按窗口读取，随滚动加载
+            if data_type in CollectionWindow.LENGTH_COMMANDS:
+                self.create_collection_view(value_window, main_frame, key, data_type,
+                                            lambda: self.run_command("ttl", key, on_done=show_ttl))
+                return
+            
             # 值显示框架
             value_frame = ttk.LabelFrame(main_frame, text="值内容", padding="5")
             value_frame.pack(fill=tk.BOTH, expand=True)
@@ -1333,10 +4653,50 @@ class AzureRedisManager:
             v_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
             h_scroll.grid(row=1, column=0, sticky=(tk.W, tk.E))
             
-            # 获取并显示值
-            value_content = self.get_full_value_content(key, data_type)
-            text_widget.insert(1.0, value_content)
             text_widget.config(state=tk.DISABLED)  # 设为只读
+            value_state = {'content': "", 'full': False, 'parts': None}
+            hex_var = tk.BooleanVar(value=False)
+            
+            def show_content(content):
+                # asyncio引擎的结果返回时窗口可能已关闭
+                if not text_widget.winfo_exists():
+                    return
+                value_state['content'] = content
+                text_widget.config(state=tk.NORMAL)
+                text_widget.delete(1.0, tk.END)
+                text_widget.insert(1.0, content)
+                text_widget.config(state=tk.DISABLED)
+            
+            def show_parts(parts):
+                # 保存读取结果，切换十六进制视图时无需重新读取；首次显示二进制字符串时默认十六进制
+                if value_state['parts'] is None and data_type == "string" and self.is_binary_value(parts[1]):
+                    hex_var.set(True)
+                value_state['parts'] = parts
+                show_content(self.format_value_content(data_type, *parts, hex_view=hex_var.get()))
+            
+            def load_value(full):
+                value_state['full'] = full
+                cached = self.value_cache.get(key, data_type, full)
+                if cached is not None:
+                    show_parts(cached)
+                elif self.async_engine:
+                    show_content("正在加载...")
+                    
+                    def on_read(tracked):
+                        if text_widget.winfo_exists():
+                            show_parts(self.remember_value(key, data_type, full, *tracked))
+                    
+                    self.async_engine.submit(
+                        self.async_engine.read_value_tracked(key, data_type, full, self.value_view_bytes),
+                        on_read, lambda error: show_content(self.describe_value_error(error)))
+                else:
+                    try:
+                        show_parts(self.read_value_cached(key, data_type, full))
+                    except Exception as e:
+                        show_content(self.describe_value_error(e))
+            
+            # 获取并显示值（大字符串只读取开头部分）
+            load_value(False)
             
             # 按钮框架
             btn_frame = ttk.Frame(main_frame)
@@ -1345,110 +4705,335 @@ class AzureRedisManager:
             # 复制按钮
             def copy_to_clipboard():
                 value_window.clipboard_clear()
-                value_window.clipboard_append(value_content)
+                value_window.clipboard_append(value_state['content'])
                 messagebox.showinfo("成功", "内容已复制到剪贴板")
                 
             ttk.Button(btn_frame, text="复制内容", command=copy_to_clipboard).pack(side=tk.LEFT, padx=(0, 10))
             
+            # 十六进制视图：按原始字节显示值（集合类型显示每个元素的十六进制）
+            def toggle_hex_view():
+                if value_state['parts'] is not None:
+                    show_parts(value_state['parts'])
+            
+            ttk.Checkbutton(btn_frame, text="十六进制", variable=hex_var,
+                            command=toggle_hex_view).pack(side=tk.LEFT, padx=(0, 10))
+            
+            # 加载完整内容按钮（仅字符串，显式下载整个值）
+            def load_full_value():
+                load_value(True)
+                    
+            if data_type == "string":
+                ttk.Button(btn_frame, text="加载完整内容", command=load_full_value).pack(side=tk.LEFT, padx=(0, 10))
+            
             # 关闭按钮
             ttk.Button(btn_frame, text="关闭", command=value_window.destroy).pack(side=tk.RIGHT)
             
             # 刷新按钮
             def refresh_value():
-                try:
-                    new_content = self.get_full_value_content(key, data_type)
-                    text_widget.config(state=tk.NORMAL)
-                    text_widget.delete(1.0, tk.END)
-                    text_widget.insert(1.0, new_content)
-                    text_widget.config(state=tk.DISABLED)
-                    
-                    # 更新TTL
-                    new_ttl = self.redis_client.ttl(key)
-                    new_ttl_text = "永不过期" if new_ttl == -1 else f"{new_ttl}秒" if new_ttl > 0 else "已过期"
-                    ttl_label.config(text=new_ttl_text)
-                    
-                except Exception as e:
-                    messagebox.showerror("错误", f"刷新失败: {str(e)}")
+                load_value(value_state['full'])
+                
+                # 更新TTL
+                self.run_command("ttl", key, on_done=show_ttl,
+                                 on_error=lambda e: messagebox.showerror("错误", f"刷新失败: {str(e)}"))
                     
             ttk.Button(btn_frame, text="刷新", command=refresh_value).pack(side=tk.RIGHT, padx=(0, 10))
             
         except Exception as e:
             messagebox.showerror("错误", f"无法显示键值: {str(e)}")
             
-    def get_full_value_content(self, key, data_type):
-        """获取键的完整内容"""
-        try:
-            # 设置较长的超时时间用于获取完整内容
-            if data_type == "string":
-                return str(self.redis_client.get(key))
-                
-            elif data_type == "list":
-                # 分批获取大列表，避免超时
-                length = self.redis_client.llen(key)
-                if length > 10000:
-                    # 大列表只显示前1000项
-                    items = self.redis_client.lrange(key, 0, 999)
-                    result = "\n".join([f"[{i}] {item}" for i, item in enumerate(items)])
-                    result += f"\n\n... 还有 {length - 1000} 项未显示（列表过大）"
-                    return result
-                else:
-                    items = self.redis_client.lrange(key, 0, -1)
-                    return "\n".join([f"[{i}] {item}" for i, item in enumerate(items)])
-                
-            elif data_type == "set":
-                # 分批获取大集合
-                length = self.redis_client.scard(key)
-                if length > 10000:
-                    # 大集合只显示部分成员
-                    items = list(self.redis_client.sscan_iter(key, count=1000))[:1000]
-                    result = "\n".join(sorted(items))
-                    result += f"\n\n... 还有约 {length - 1000} 个成员未显示（集合过大）"
-                    return result
-                else:
-                    items = self.redis_client.smembers(key)
-                    return "\n".join(sorted(items))
-                
-            elif data_type == "zset":
-                # 分批获取大有序集合
-                length = self.redis_client.zcard(key)
-                if length > 10000:
-                    # 大有序集合只显示前1000项
-                    items = self.redis_client.zrange(key, 0, 999, withscores=True)
-                    result = "\n".join([f"{member} (score: {score})" for member, score in items])
-                    result += f"\n\n... 还有 {length - 1000} 项未显示（有序集合过大）"
-                    return result
-                else:
-                    items = self.redis_client.zrange(key, 0, -1, withscores=True)
-                    return "\n".join([f"{member} (score: {score})" for member, score in items])
-                
-            elif data_type == "hash":
-                # 分批获取大哈希表
-                length = self.redis_client.hlen(key)
-                if length > 10000:
-                    # 大哈希表只显示部分字段
-                    items = {}
-                    count = 0
-                    for field, value in self.redis_client.hscan_iter(key, count=1000):
-                        items[field] = value
-                        count += 1
-                        if count >= 1000:
-                            break
-                    result = "\n".join([f"{field}: {value}" for field, value in items.items()])
-                    result += f"\n\n... 还有约 {length - count} 个字段未显示（哈希表过大）"
-                    return result
+    def create_collection_view(self, value_window, parent, key, data_type, refresh_ttl):
+        """集合类型的值详情：虚拟列表只渲染可见行，由 CollectionWindow 按窗口读取元素
+        
+        列表和有序集合可以跳到任意下标（排名，负数从末尾计）；集合和哈希表按游标顺序读取。
+        选中一行时在下方显示该元素的完整内容。
+        """
+        columns = {"list": ("下标", "值"), "zset": ("排名", "成员", "分数"),
+                   "set": ("#", "成员"), "hash": ("#", "字段", "值")}[data_type]
+        value_frame = ttk.LabelFrame(parent, text="值内容", padding="5")
+        value_frame.pack(fill=tk.BOTH, expand=True)
+        value_frame.columnconfigure(0, weight=1)
+        value_frame.rowconfigure(0, weight=1)
+        
+        tree = ttk.Treeview(value_frame, columns=columns, show="headings", height=12)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=200)
+        tree.column(columns[0], width=70, stretch=False)
+        scrollbar = ttk.Scrollbar(value_frame, orient="vertical")
+        tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        detail_text = tk.Text(value_frame, height=6, wrap=tk.WORD, font=("Consolas", 10))
+        detail_text.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        detail_text.config(state=tk.DISABLED)
+        
+        status_var = tk.StringVar(value="正在读取长度...")
+        ttk.Label(value_frame, textvariable=status_var).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        
+        hex_var = tk.BooleanVar(value=False)
+        state = {'window': None, 'detail': ""}
+        
+        def cell_text(value):
+            if isinstance(value, float):
+                return f"{value:g}"
+            text = self.format_value_item_hex(value) if hex_var.get() else display_text(value)
+            # 单元格只显示开头部分，完整内容在下方详情中
+            return text[:200]
+        
+        def row_values(index):
+            item = state['window'].item(index)
+            if item is None:
+                return (index, "加载中...")
+            if not item:
+                return (index, "(已不存在)")
+            return (index,) + tuple(cell_text(value) for value in item)
+        
+        view = VirtualTreeview(tree, scrollbar, lambda: state['window'].length or 0, row_values)
+        
+        def show_detail(event=None):
+            index = view.get_selected_index()
+            item = state['window'].item(index) if index is not None else None
+            if item:
+                if hex_var.get():
+                    parts = [self.format_hex_dump(self.value_bytes(value)) if not isinstance(value, float)
+                             else f"score: {value:g}" for value in item]
                 else:
-                    items = self.redis_client.hgetall(key)
-                    return "\n".join([f"{field}: {value}" for field, value in items.items()])
-                
+                    parts = [display_text(value) if not isinstance(value, float) else f"score: {value:g}"
+                             for value in item]
+                state['detail'] = "\n\n".join(parts)
             else:
-                return f"不支持显示类型: {data_type}"
-                
-        except redis.TimeoutError:
+                state['detail'] = ""
+            detail_text.config(state=tk.NORMAL)
+            detail_text.delete(1.0, tk.END)
+            detail_text.insert(1.0, state['detail'])
+            detail_text.config(state=tk.DISABLED)
+        
+        tree.bind("<<TreeviewSelect>>", show_detail, add="+")
+        
+        def on_loaded():
+            # 后台线程读完一个窗口后回到主线程重新渲染
+            if not tree.winfo_exists():
+                return
+            collection = state['window']
+            length = collection.length or 0
+            order_note = "" if collection.ordered else "，按游标顺序读取"
+            status_var.set(f"共 {length} 项{order_note}，已缓存 {collection.cached_count()} 项")
+            view.refresh()
+            if view.get_selected_index() is not None and not state['detail']:
+                show_detail()
+        
+        def on_error(error):
+            if tree.winfo_exists():
+                status_var.set(self.describe_value_error(error).split("\n")[0])
+        
+        def open_collection():
+            if state['window']:
+                state['window'].close()
+            collection = CollectionWindow(self.redis_client, key, data_type,
+                                          lambda: self.ui.post(on_loaded, key=f"collection:{id(collection)}"),
+                                          lambda error: self.ui.post(on_error, error), self.async_engine)
+            state['window'] = collection
+            state['detail'] = ""
+            collection.start()
+            view.reset()
+        
+        open_collection()
+        value_window.bind("<Destroy>",
+                          lambda event: state['window'].close() if event.widget is value_window else None)
+        
+        btn_frame = ttk.Frame(parent)
+        btn_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        def copy_selected():
+            if not state['detail']:
+                messagebox.showinfo("提示", "请先选择一项")
+                return
+            value_window.clipboard_clear()
+            value_window.clipboard_append(state['detail'])
+            messagebox.showinfo("成功", "选中项已复制到剪贴板")
+        
+        ttk.Button(btn_frame, text="复制选中项", command=copy_selected).pack(side=tk.LEFT, padx=(0, 10))
+        
+        def toggle_hex_view():
+            view.refresh()
+            show_detail()
+        
+        ttk.Checkbutton(btn_frame, text="十六进制", variable=hex_var,
+                        command=toggle_hex_view).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 跳转到下标（仅有序类型）
+        if data_type in CollectionWindow.ORDERED_TYPES:
+            jump_var = tk.StringVar()
+            
+            def jump_to_index(event=None):
+                length = state['window'].length
+                try:
+                    index = int(jump_var.get())
+                except ValueError:
+                    messagebox.showwarning("输入错误", "请输入整数下标")
+                    return
+                if not length:
+                    return
+                if index < 0:
+                    index += length
+                view.select(min(max(0, index), length - 1))
+            
+            ttk.Label(btn_frame, text="跳转到:").pack(side=tk.LEFT)
+            jump_entry = ttk.Entry(btn_frame, textvariable=jump_var, width=10)
+            jump_entry.pack(side=tk.LEFT, padx=(5, 5))
+            jump_entry.bind("<Return>", jump_to_index)
+            ttk.Button(btn_frame, text="跳转", command=jump_to_index).pack(side=tk.LEFT)
+        
+        ttk.Button(btn_frame, text="关闭", command=value_window.destroy).pack(side=tk.RIGHT)
+        
+        def refresh_value():
+            open_collection()
+            refresh_ttl()
+        
+        ttk.Button(btn_frame, text="刷新", command=refresh_value).pack(side=tk.RIGHT, padx=(0, 10))
+    
+    def read_value_cached(self, key, data_type, full=False):
+        """带客户端缓存的 read_value：命中时不访问Redis，未命中时先登记跟踪再读取"""
+        cached = self.value_cache.get(key, data_type, full)
+        if cached is not None:
+            return cached
+        mark = self.metadata_fetcher.track_keys([key])
+        return self.remember_value(key, data_type, full, mark, self.read_value(key, data_type, full))
+    
+    def remember_value(self, key, data_type, full, mark, result):
+        """把受跟踪读取的值写入值缓存并原样返回"""
+        self.value_cache.put(key, data_type, full, result, mark)
+        return result
+    
+    def start_client_tracking(self):
+        """开启客户端缓存：建立订阅 __redis__:invalidate 的专用连接，并让行和值缓存使用它
+        
+        专用连接不从连接池中借用，以免占用页面加载的连接，也避免被池中的重连逻辑悄悄替换。
+        """
+        pool = self.redis_client.connection_pool
+        # 订阅状态下PING的回复格式不同，专用连接自己发送心跳，不使用连接的健康检查
+        connection_kwargs = dict(pool.connection_kwargs, health_check_interval=0)
+        
+        def on_invalidate(keys):
+            if keys is None:
+                self.row_cache.clear()
+                self.value_cache.clear()
+            else:
+                self.row_cache.invalidate(*keys)
+                self.value_cache.invalidate(*keys)
+        
+        tracker = ClientTracker(lambda: pool.connection_class(**connection_kwargs), on_invalidate,
+                                lambda message: self.ui.post(self.status_var.set, message, key="status"))
+        self.client_tracker = tracker
+        self.row_cache.tracker = tracker
+        self.value_cache.tracker = tracker
+        self.metadata_fetcher.tracker = tracker
+        if self.async_engine:
+            self.async_engine.fetcher.tracker = tracker
+        tracker.start()
+    
+    def read_value(self, key, data_type, full=False):
+        """读取值详情窗口中字符串的内容，返回 (长度, 内容)，由 format_value_content 格式化
+        
+        仅在 full=True 时下载整个值（此时长度为 None），否则用STRLEN和GETRANGE只读取
+        开头 value_view_bytes 字节。集合类型由 CollectionWindow 按窗口读取。
+        """
+        client = self.redis_client
+        if data_type == "string":
+            if full:
+                return None, client.get(key)
+            pipe = client.pipeline(transaction=False)
+            pipe.strlen(key)
+            pipe.getrange(key, 0, self.value_view_bytes - 1)
+            length, head = pipe.execute()
+            return length, head
+        return None, None
+    
+    def format_value_content(self, data_type, length, content, hex_view=False):
+        """把 read_value（或asyncio引擎）读取的字符串内容格式化为值详情窗口的文本
+        
+        hex_view 为 True 时显示为十六进制转储。
+        """
+        if data_type != "string":
+            return f"不支持显示类型: {data_type}"
+        if content is None:
+            return "键不存在"
+        text = self.format_hex_dump(self.value_bytes(content)) if hex_view else display_text(content)
+        if length is None or length <= self.value_view_bytes:
+            return text
+        return (f"{text}\n\n... 已显示前 {self.format_size(self.value_view_bytes)}，"
+                f"完整值共 {self.format_size(length)}，点击\"加载完整内容\"查看全部")
+    
+    def value_bytes(self, value):
+        """值的原始字节（文本模式下的回复按UTF-8编码）"""
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode('utf-8', 'surrogateescape')
+    
+    def is_binary_value(self, value):
+        """值是否为二进制数据：不是有效UTF-8，或含有换行、制表符以外的控制字符
+        
+        截取的开头片段末尾可能是不完整的多字节字符，不据此判断为二进制。
+        """
+        if not isinstance(value, bytes):
+            return False
+        try:
+            text = codecs.getincrementaldecoder('utf-8')().decode(value, final=False)
+        except UnicodeDecodeError:
+            return True
+        return any(ord(char) < 32 and char not in "\t\n\r" for char in text[:4096])
+    
+    def format_hex_dump(self, data):
+        """十六进制转储：每行16字节，显示偏移、十六进制和可打印的ASCII字符"""
+        lines = []
+        for offset in range(0, len(data), 16):
+            chunk = data[offset:offset + 16]
+            hex_part = " ".join(f"{byte:02x}" for byte in chunk)
+            text_part = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+            lines.append(f"{offset:08x}  {hex_part:<47}  {text_part}")
+        return "\n".join(lines)
+    
+    def format_value_item_hex(self, item):
+        """集合元素的十六进制表示"""
+        return self.value_bytes(item).hex()
+    
+    def describe_value_error(self, error):
+        """读取值失败时显示的提示"""
+        if isinstance(error, redis.TimeoutError):
             return f"获取值时超时 - 数据可能过大\n\n建议：\n1. 检查网络连接\n2. 该键可能包含大量数据\n3. 尝试刷新或使用更小的数据集"
-        except redis.ConnectionError:
+        if isinstance(error, redis.ConnectionError):
             return "连接已断开，请重新连接Redis服务器"
+        return f"获取值时出错: {str(error)}\n\n建议：\n1. 检查键是否仍然存在\n2. 检查网络连接\n3. 尝试刷新数据"
+    
+    def run_command(self, command, *args, on_done=None, on_error=None):
+        """执行一个Redis命令：asyncio引擎下在事件循环中执行并回到主线程回调，否则同步执行后回调"""
+        if self.async_engine:
+            self.async_engine.submit(getattr(self.async_engine.client, command)(*args), on_done, on_error)
+            return
+        try:
+            result = getattr(self.redis_client, command)(*args)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        if on_done:
+            on_done(result)
+        
+    def run_pipeline(self, queue, on_done=None, on_error=None):
+        """queue(pipe) 向pipeline添加命令后一次执行，回调方式与 run_command 相同"""
+        if self.async_engine:
+            self.async_engine.submit(self.async_engine.execute_pipeline(queue), on_done, on_error)
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            queue(pipe)
+            result = pipe.execute()
         except Exception as e:
-            return f"获取值时出错: {str(e)}\n\n建议：\n1. 检查键是否仍然存在\n2. 检查网络连接\n3. 尝试刷新数据"
+            if on_error:
+                on_error(e)
+            return
+        if on_done:
+            on_done(result)
         
     def on_search_change(self, event):
         """搜索框内容变化时的处理"""
@@ -1464,10 +5049,139 @@ class AzureRedisManager:
             self.refresh_data()
 
 
+class NamespaceTreeWindow:
+    """可折叠的命名空间树窗口：展开节点时从索引读取子节点，不重新扫描"""
+    
+    # 每个节点最多显示的子命名空间数
+    MAX_CHILDREN = 500
+    
+    def __init__(self, parent, app):
+        self.app = app
+        self.index = None
+        self.item_paths = {}
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("命名空间视图")
+        self.window.geometry("500x500")
+        self.window.transient(parent)
+        
+        self.create_widgets()
+        self.reload_tree()
+        self.schedule_refresh()
+        
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 分隔符设置
+        option_frame = ttk.Frame(main_frame)
+        option_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(option_frame, text="分隔符:").pack(side=tk.LEFT, padx=(0, 5))
+        self.delimiter_var = tk.StringVar(value=self.app.namespace_delimiter)
+        ttk.Entry(option_frame, textvariable=self.delimiter_var, width=5).pack(side=tk.LEFT, padx=5)
+        ttk.Button(option_frame, text="应用", command=self.apply_delimiter).pack(side=tk.LEFT, padx=5)
+        
+        self.summary_var = tk.StringVar(value="")
+        ttk.Label(option_frame, textvariable=self.summary_var).pack(side=tk.RIGHT)
+        
+        # 命名空间树
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        tree_frame.columnconfigure(0, weight=1)
+        tree_frame.rowconfigure(0, weight=1)
+        
+        self.tree = ttk.Treeview(tree_frame, columns=("count", "size"), show="tree headings")
+        self.tree.heading("#0", text="命名空间")
+        self.tree.heading("count", text="键数")
+        self.tree.heading("size", text="已加载大小")
+        self.tree.column("#0", width=260, minwidth=120)
+        self.tree.column("count", width=90, minwidth=60, anchor=tk.E)
+        self.tree.column("size", width=100, minwidth=60, anchor=tk.E)
+        
+        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=v_scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        self.tree.bind("<<TreeviewOpen>>", self.on_node_open)
+        
+    def apply_delimiter(self):
+        """更换分隔符并重建索引"""
+        self.app.rebuild_namespace_index(self.delimiter_var.get())
+        self.reload_tree()
+        
+    def reload_tree(self):
+        """按当前索引重建顶层节点"""
+        self.index = self.app.namespace_index
+        self.item_paths = {}
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.insert_children("", ())
+        
+    def insert_children(self, parent_item, path):
+        """插入子命名空间；有下级的节点放一个占位子项以显示展开箭头"""
+        existing = {self.item_paths[item][-1]: item for item in self.tree.get_children(parent_item)
+                    if item in self.item_paths}
+        children = self.index.get_children(path)
+        for name, count, size, has_children in children[:self.MAX_CHILDREN]:
+            if name in existing:
+                continue
+            item = self.tree.insert(parent_item, "end", text=display_text(name) or "(空)",
+                                    values=(count, self.app.format_size(size)))
+            self.item_paths[item] = path + (name,)
+            if has_children:
+                self.tree.insert(item, "end", text="...")
+                
+    def on_node_open(self, event):
+        """展开节点时替换占位子项"""
+        item = self.tree.focus()
+        path = self.item_paths.get(item)
+        if path is None:
+            return
+        for child in self.tree.get_children(item):
+            if child not in self.item_paths:
+                self.tree.delete(child)
+        self.insert_children(item, path)
+        
+    def schedule_refresh(self):
+        """定时刷新已显示节点的计数，扫描进行时数字实时增长"""
+        if not self.window.winfo_exists():
+            return
+        if self.index is not self.app.namespace_index:
+            self.reload_tree()
+        else:
+            self.refresh_counts()
+        self.window.after(500, self.schedule_refresh)
+        
+    def refresh_counts(self):
+        """更新已显示节点的计数，并补充扫描中新出现的命名空间"""
+        for item, path in list(self.item_paths.items()):
+            node = self.index.get_node(path)
+            if node is None:
+                continue
+            count, size, has_children = node
+            self.tree.item(item, values=(count, self.app.format_size(size)))
+            if self.tree.item(item, "open"):
+                self.insert_children(item, path)
+            elif has_children and not self.tree.get_children(item):
+                self.tree.insert(item, "end", text="...")
+        self.insert_children("", ())
+        
+        total = self.index.get_node(())
+        self.summary_var.set(f"共 {total[0]} 个键" if total else "")
+
+
 class AddKeyDialog:
-    def __init__(self, parent, redis_client):
-        self.redis_client = redis_client
-        self.result = False
+    """添加新键的对话框
+    
+    写入命令通过 run_pipeline（AzureRedisManager.run_pipeline）一次往返执行，asyncio引擎下不阻塞界面；
+    写入成功后关闭对话框并调用 on_added(键名)，失败时保留对话框以便修改后重试。
+    """
+    
+    def __init__(self, parent, run_pipeline, on_added=None):
+        self.run_pipeline = run_pipeline
+        self.on_added = on_added
         
         # 创建对话框窗口
         self.dialog = tk.Toplevel(parent)
@@ -1526,7 +5240,8 @@ class AddKeyDialog:
         btn_frame = ttk.Frame(main_frame)
         btn_frame.grid(row=4, column=0, columnspan=3, pady=(10, 0))
         
-        ttk.Button(btn_frame, text="确定", command=self.on_ok).pack(side=tk.LEFT, padx=(0, 10))
+        self.ok_btn = ttk.Button(btn_frame, text="确定", command=self.on_ok)
+        self.ok_btn.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(btn_frame, text="取消", command=self.on_cancel).pack(side=tk.LEFT)
         
         # 设置初始焦点
@@ -1558,51 +5273,51 @@ class AddKeyDialog:
             messagebox.showerror("错误", "请输入值")
             return
             
-        try:
-            data_type = self.type_var.get()
-            
+        data_type = self.type_var.get()
+        lines = [line.strip() for line in value_content.split('\n') if line.strip()]
+        if data_type == "hash":
+            fields = dict((field.strip(), value.strip()) for field, value in
+                          (line.split(':', 1) for line in lines if ':' in line))
+            if not fields:
+                messagebox.showerror("错误", "请输入 field:value 对")
+                return
+        
+        ttl_seconds = None
+        if self.ttl_var.get():
+            try:
+                ttl_seconds = int(self.ttl_seconds_var.get())
+            except ValueError:
+                messagebox.showwarning("警告", "TTL值无效，将使用默认设置")
+        
+        def queue(pipe):
             if data_type == "string":
-                self.redis_client.set(key, value_content)
-                
-            elif data_type == "list":
-                # 清空可能存在的key
-                self.redis_client.delete(key)
-                # 添加列表元素
-                for line in value_content.split('\n'):
-                    if line.strip():
-                        self.redis_client.rpush(key, line.strip())
-                        
-            elif data_type == "set":
-                # 清空可能存在的key
-                self.redis_client.delete(key)
-                # 添加集合元素
-                for line in value_content.split('\n'):
-                    if line.strip():
-                        self.redis_client.sadd(key, line.strip())
-                        
-            elif data_type == "hash":
-                # 清空可能存在的key
-                self.redis_client.delete(key)
-                # 添加哈希字段
-                for line in value_content.split('\n'):
-                    if line.strip() and ':' in line:
-                        field, value = line.split(':', 1)
-                        self.redis_client.hset(key, field.strip(), value.strip())
-                        
-            # 设置TTL
-            if self.ttl_var.get():
-                try:
-                    ttl_seconds = int(self.ttl_seconds_var.get())
-                    self.redis_client.expire(key, ttl_seconds)
-                except ValueError:
-                    messagebox.showwarning("警告", "TTL值无效，将使用默认设置")
-                    
-            self.result = True
-            self.dialog.destroy()
+                pipe.set(key, value_content)
+            else:
+                # 清空可能存在的key后一次写入全部元素
+                pipe.delete(key)
+                if data_type == "list":
+                    pipe.rpush(key, *lines)
+                elif data_type == "set":
+                    pipe.sadd(key, *lines)
+                elif data_type == "hash":
+                    pipe.hset(key, mapping=fields)
+            if ttl_seconds is not None:
+                pipe.expire(key, ttl_seconds)
+        
+        def on_written(result):
+            if self.dialog.winfo_exists():
+                self.dialog.destroy()
+            if self.on_added:
+                self.on_added(key)
             messagebox.showinfo("成功", f"键 '{key}' 已添加")
-            
-        except Exception as e:
-            messagebox.showerror("错误", f"添加失败: {str(e)}")
+        
+        def on_error(error):
+            if self.dialog.winfo_exists():
+                self.ok_btn.config(state="normal")
+            messagebox.showerror("错误", f"添加失败: {str(error)}")
+        
+        self.ok_btn.config(state="disabled")
+        self.run_pipeline(queue, on_done=on_written, on_error=on_error)
             
     def on_cancel(self):
         """取消按钮处理"""
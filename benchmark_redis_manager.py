@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Azure Redis管理工具 - 性能基准测试脚本
+对比优化前后的数据结构和数据访问路径
+
+用法:
+    python benchmark_redis_manager.py keystore [--keys 1000000]
+    python benchmark_redis_manager.py search [--keys 1000000]
+    python benchmark_redis_manager.py sort [--keys 1000000]
+    python benchmark_redis_manager.py pipeline [--host localhost] [--port 6379] [--latency 20]
+    python benchmark_redis_manager.py workers [--keys 5000] [--latency 20]
+
+需要Redis的测试通过本地延迟代理连接 redis-server，模拟到Azure的网络往返。
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import gc
+import random
+import re
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+from azure_redis_manager import CompactKeyStore, KeyMetadataArrays, KeyMetadataFetcher, TransferCounter
+
+# 基准测试写入的键前缀，测试结束后删除
+BENCH_PREFIX = "bench:"
+# 与 AzureRedisManager.reserved_connections 相同的预留连接数
+RESERVED_CONNECTIONS = 8
+
+
+def generate_keys(count):
+    """生成 service:entity:id 形式的测试键"""
+    services = ["order", "user", "cart", "session", "inventory"]
+    entities = ["item", "profile", "token", "cache"]
+    for i in range(count):
+        yield f"{services[i % len(services)]}:{entities[i % len(entities)]}:{i:010d}"
+
+
+def measure(build):
+    """测量构建数据结构的耗时和新增内存（内存单独测量，避免tracemalloc拖慢计时）"""
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def format_bytes(size):
+    """格式化字节数"""
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+class LatencyProxy:
+    """本地TCP代理：转发到Redis并在每个方向注入固定延迟"""
+
+    def __init__(self, target_host, target_port, latency):
+        self.target_host = target_host
+        self.target_port = target_port
+        # 单向延迟为往返延迟的一半
+        self.delay = latency / 2
+        self.port = None
+        self.loop = asyncio.new_event_loop()
+
+    def start(self):
+        """在后台线程中启动代理，返回监听端口"""
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle_client, "127.0.0.1", 0))
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self.port
+
+    async def handle_client(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(self.target_host, self.target_port)
+        await asyncio.gather(
+            self.forward(client_reader, upstream_writer),
+            self.forward(upstream_reader, client_writer),
+            return_exceptions=True,
+        )
+
+    async def forward(self, reader, writer):
+        """按到达顺序转发数据，每块数据延迟 delay 秒后写出"""
+        queue = asyncio.Queue()
+
+        async def send():
+            while True:
+                due, data = await queue.get()
+                if data is None:
+                    writer.close()
+                    return
+                wait = due - self.loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(data)
+                await writer.drain()
+
+        sender = asyncio.ensure_future(send())
+        while True:
+            data = await reader.read(65536)
+            queue.put_nowait((self.loop.time() + self.delay, data or None))
+            if not data:
+                break
+        await sender
+
+
+def connect_with_latency(args, max_connections=None):
+    """创建经过延迟代理的Redis客户端"""
+    proxy = LatencyProxy(args.host, args.port, args.latency / 1000)
+    proxy_port = proxy.start()
+    return redis.Redis(host="127.0.0.1", port=proxy_port, password=args.password, decode_responses=True,
+                       max_connections=max_connections)
+
+
+def populate_keys(client, count):
+    """写入混合类型的测试键"""
+    pipe = client.pipeline(transaction=False)
+    keys = []
+    for i in range(count):
+        key = f"{BENCH_PREFIX}{i:06d}"
+        kind = i % 5
+        if kind == 0:
+            pipe.set(key, "v" * 200)
+        elif kind == 1:
+            pipe.rpush(key, *range(10))
+        elif kind == 2:
+            pipe.sadd(key, *range(10))
+        elif kind == 3:
+            pipe.zadd(key, {str(n): n for n in range(10)})
+        else:
+            pipe.hset(key, mapping={str(n): n for n in range(10)})
+        keys.append(key)
+    pipe.execute()
+    return keys
+
+
+def cleanup_keys(client, keys):
+    """删除测试键"""
+    for i in range(0, len(keys), 1000):
+        client.delete(*keys[i:i + 1000])
+
+
+def benchmark_keystore(args):
+    """对比 list[str] 与 CompactKeyStore 的内存占用、切片和遍历耗时"""
+    count = args.keys
+    print(f"键存储内存基准测试 ({count} 个键)")
+    print("=" * 50)
+
+    key_list, list_bytes, list_build = measure(lambda: list(generate_keys(count)))
+    store, store_bytes, store_build = measure(lambda: CompactKeyStore(generate_keys(count)))
+
+    # 切片（模拟 load_page_data 取一页）和遍历（模拟搜索）
+    page = slice(count // 2, count // 2 + 1000)
+    start = time.perf_counter()
+    list_page = key_list[page]
+    list_slice = time.perf_counter() - start
+    start = time.perf_counter()
+    store_page = store[page]
+    store_slice = time.perf_counter() - start
+    assert list_page == store_page
+
+    start = time.perf_counter()
+    list_hits = sum(1 for key in key_list if "99" in key)
+    list_iter = time.perf_counter() - start
+    start = time.perf_counter()
+    store_hits = sum(1 for key in store if "99" in key)
+    store_iter = time.perf_counter() - start
+    assert list_hits == store_hits
+
+    # SCAN 重复返回的键应被去重
+    store.extend(key_list[:1000])
+    assert len(store) == count
+
+    print(f"{'':16}{'list[str]':>14}{'CompactKeyStore':>18}")
+    print(f"{'内存占用':12}{format_bytes(list_bytes):>14}{format_bytes(store_bytes):>18}")
+    print(f"{'每键字节':12}{list_bytes / count:>14.1f}{store_bytes / count:>18.1f}")
+    print(f"{'构建耗时':12}{list_build:>13.2f}s{store_build:>17.2f}s")
+    print(f"{'取一页(1000)':10}{list_slice * 1000:>12.2f}ms{store_slice * 1000:>16.2f}ms")
+    print(f"{'全量遍历':12}{list_iter:>13.2f}s{store_iter:>17.2f}s")
+    print(f"\n内存节省: {(1 - store_bytes / list_bytes) * 100:.1f}%")
+
+
+def benchmark_search(args):
+    """对比逐键遍历与 CompactKeyStore.search 的全局键名搜索耗时"""
+    count = args.keys
+    print(f"全局键名搜索基准测试 ({count} 个键)")
+    print("=" * 50)
+
+    store = CompactKeyStore(generate_keys(count))
+    cases = [
+        ("子串", "0000999", "substring", lambda key: "0000999" in key),
+        ("通配符", "user:*:00000012??", "glob", lambda key: fnmatch.fnmatchcase(key, "user:*:00000012??")),
+        ("正则", r"^cart:token:\d*777$", "regex", re.compile(r"^cart:token:\d*777$").search),
+    ]
+    print(f"{'':8}{'模式':24}{'匹配':>8}{'逐键遍历':>12}{'search':>12}")
+    for name, pattern, mode, matches in cases:
+        start = time.perf_counter()
+        expected = [i for i, key in enumerate(store) if matches(key)]
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        found = store.search(pattern, mode)
+        search_time = time.perf_counter() - start
+        assert list(found) == expected
+        print(f"{name:6}{pattern:24}{len(found):>8}{scan_time * 1000:>10.0f}ms{search_time * 1000:>10.1f}ms")
+
+
+def benchmark_sort(args):
+    """测量 KeyMetadataArrays 对全部键按各列排序的耗时（元数据随机生成，不访问Redis）"""
+    count = args.keys
+    print(f"全结果集排序基准测试 ({count} 个键)")
+    print("=" * 50)
+
+    keys = list(generate_keys(count))
+    random.seed(0)
+    random.shuffle(keys)
+    store = CompactKeyStore(keys)
+    metadata = KeyMetadataArrays(store)
+    types = ["string", "list", "set", "zset", "hash"]
+    rows = [{'key': key, 'type': random.choice(types), 'value': "",
+             'ttl': random.choice((-1, random.randrange(1, 86400))),
+             'size': random.randrange(1 << 20)} for key in keys]
+    start = time.perf_counter()
+    metadata.record(rows)
+    print(f"记录元数据（按键名查找序号）: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    metadata.record(rows, range(count))
+    print(f"记录元数据（已知序号，如补全排序元数据）: {time.perf_counter() - start:.2f}s")
+    # 应用在扫描结束后于扫描线程中预先计算键名顺序，之后按键名排序只复制数组
+    start = time.perf_counter()
+    metadata.update_name_order()
+    print(f"预先计算键名顺序: {time.perf_counter() - start:.2f}s")
+    store.extend(f"new:{i}" for i in range(1000))
+    start = time.perf_counter()
+    metadata.update_name_order()
+    print(f"扩展键名顺序（新增1000个键）: {time.perf_counter() - start:.2f}s\n")
+    count = len(store)
+
+    print(f"{'列':8}{'升序':>12}{'降序':>12}")
+    for column in KeyMetadataArrays.SORT_COLUMNS:
+        times = []
+        for descending in (False, True):
+            start = time.perf_counter()
+            order = metadata.sort(column, range(count), descending)
+            times.append(time.perf_counter() - start)
+            assert len(order) == count
+        print(f"{column:8}{times[0] * 1000:>10.0f}ms{times[1] * 1000:>10.0f}ms")
+
+
+def benchmark_pipeline(args):
+    """在注入延迟下对比逐键预览与两阶段pipeline加载一页元数据的耗时"""
+    print(f"页面元数据加载基准测试 ({args.keys} 个键, 往返延迟 {args.latency}ms)")
+    print("=" * 50)
+
+    direct = redis.Redis(host=args.host, port=args.port, password=args.password, decode_responses=True)
+    keys = populate_keys(direct, args.keys)
+    try:
+        fetcher = KeyMetadataFetcher(connect_with_latency(args))
+        results = {}
+        for name, fetch in (("逐键预览", fetcher.fetch_serial), ("两阶段pipeline", fetcher.fetch_pipelined)):
+            start = time.perf_counter()
+            rows = []
+            counter = TransferCounter()
+            # 与 load_page_data 相同的批次划分
+            batch_size = 50 if fetch == fetcher.fetch_serial else 500
+            for i in range(0, len(keys), batch_size):
+                rows.extend(fetch(keys[i:i + batch_size], counter=counter))
+            results[name] = (time.perf_counter() - start, rows, counter.bytes)
+
+        serial_time, serial_rows, _ = results["逐键预览"]
+        pipelined_time, pipelined_rows, _ = results["两阶段pipeline"]
+        assert serial_rows == pipelined_rows
+        for name, (elapsed, _, transferred) in results.items():
+            print(f"{name:16}{elapsed:>10.2f}s{len(keys) / elapsed:>12.0f} 键/秒{format_bytes(transferred):>12}")
+        print(f"\n加速比: {serial_time / pipelined_time:.1f}x")
+    finally:
+        cleanup_keys(direct, keys)
+
+
+def benchmark_workers(args):
+    """在注入延迟下测量页面加载线程数（1/2/4/8）对吞吐量的影响"""
+    print(f"并发页面加载基准测试 ({args.keys} 个键, 往返延迟 {args.latency}ms)")
+    print("=" * 50)
+
+    direct = redis.Redis(host=args.host, port=args.port, password=args.password, decode_responses=True)
+    keys = populate_keys(direct, args.keys)
+    try:
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            # 与 AzureRedisManager.get_pool_size 一样：线程数加预留连接
+            fetcher = KeyMetadataFetcher(connect_with_latency(args, max_connections=workers + RESERVED_CONNECTIONS))
+            batches = fetcher.split_batches(keys, workers)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(fetcher.fetch_pipelined, batches))
+            elapsed = time.perf_counter() - start
+            rows = [row for batch_rows in results for row in batch_rows]
+            assert [row['key'] for row in rows] == keys
+            baseline = baseline or elapsed
+            print(f"{workers} 线程 {len(batches):>4} 批{elapsed:>10.2f}s{len(keys) / elapsed:>12.0f} 键/秒"
+                  f"{baseline / elapsed:>8.1f}x")
+    finally:
+        cleanup_keys(direct, keys)
+
+
+def add_redis_arguments(parser):
+    """需要连接Redis的基准测试的公共参数"""
+    parser.add_argument("--host", default="localhost", help="本地redis-server地址")
+    parser.add_argument("--port", type=int, default=6379, help="本地redis-server端口")
+    parser.add_argument("--password", default=None, help="Redis密码")
+    parser.add_argument("--latency", type=float, default=20, help="注入的往返延迟(毫秒)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Azure Redis管理工具性能基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    keystore_parser = subparsers.add_parser("keystore", help="键存储内存对比")
+    keystore_parser.add_argument("--keys", type=int, default=1000000, help="测试键数量")
+    keystore_parser.set_defaults(func=benchmark_keystore)
+
+    search_parser = subparsers.add_parser("search", help="全局键名搜索耗时")
+    search_parser.add_argument("--keys", type=int, default=1000000, help="测试键数量")
+    search_parser.set_defaults(func=benchmark_search)
+
+    sort_parser = subparsers.add_parser("sort", help="全结果集按列排序耗时")
+    sort_parser.add_argument("--keys", type=int, default=1000000, help="测试键数量")
+    sort_parser.set_defaults(func=benchmark_sort)
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="页面元数据加载路径对比")
+    pipeline_parser.add_argument("--keys", type=int, default=1000, help="一页的键数量")
+    add_redis_arguments(pipeline_parser)
+    pipeline_parser.set_defaults(func=benchmark_pipeline)
+
+    workers_parser = subparsers.add_parser("workers", help="页面加载并发线程数对比")
+    workers_parser.add_argument("--keys", type=int, default=5000, help="一页的键数量")
+    add_redis_arguments(workers_parser)
+    workers_parser.set_defaults(func=benchmark_workers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
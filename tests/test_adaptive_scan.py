@@ -0,0 +1,25 @@
+from azure_redis_manager import AdaptiveScanController
+
+
+def test_count_grows_on_a_fast_server():
+    controller = AdaptiveScanController(initial_count=1000, max_count=50000)
+    # 往返延迟稳定、服务器耗时可忽略：每次最多翻倍，直到上限
+    for _ in range(10):
+        controller.record(0.05, controller.count)
+    assert controller.count == 50000
+    assert controller.pause == 0.0
+
+
+def test_count_shrinks_and_pauses_on_a_busy_server():
+    controller = AdaptiveScanController(server_budget=0.02, initial_count=1000, min_count=100)
+    controller.record(0.01, 1000)
+    for _ in range(10):
+        controller.record(0.2, 1000)
+    assert controller.count == 100
+    assert 0 < controller.pause <= 0.1
+
+
+def test_describe_reports_count_and_latency():
+    controller = AdaptiveScanController()
+    controller.record(0.02, 500)
+    assert controller.describe().startswith(f"COUNT={controller.count}, 延迟 20ms")
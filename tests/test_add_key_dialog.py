@@ -0,0 +1,110 @@
+import threading
+from unittest import mock
+
+import fakeredis
+import pytest
+import redis
+from fakeredis import TcpFakeServer
+
+import azure_redis_manager
+from azure_redis_manager import AddKeyDialog, AsyncRedisEngine, AzureRedisManager
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+    
+    def get(self):
+        return self.value
+
+
+def make_dialog(run_pipeline, key, data_type, value, ttl=None):
+    """不创建窗口，只设置 on_ok 读取的输入"""
+    dialog = object.__new__(AddKeyDialog)
+    dialog.run_pipeline = run_pipeline
+    dialog.added = []
+    dialog.on_added = dialog.added.append
+    dialog.key_var = Var(key)
+    dialog.type_var = Var(data_type)
+    dialog.value_text = mock.Mock(**{"get.return_value": value})
+    dialog.ttl_var = Var(ttl is not None)
+    dialog.ttl_seconds_var = Var(str(ttl))
+    dialog.dialog = mock.Mock(**{"winfo_exists.return_value": True})
+    dialog.ok_btn = mock.Mock()
+    return dialog
+
+
+def make_app(client=None, engine=None):
+    app = object.__new__(AzureRedisManager)
+    app.redis_client = client
+    app.async_engine = engine
+    return app
+
+
+@pytest.fixture(autouse=True)
+def messagebox():
+    with mock.patch.object(azure_redis_manager, "messagebox") as patched:
+        yield patched
+
+
+def test_list_is_written_in_one_pipeline():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    client.rpush("queue", "old")
+    dialog = make_dialog(make_app(client).run_pipeline, "queue", "list", "a\n\nb\nc\n", ttl=60)
+    with mock.patch.object(client, "rpush", side_effect=AssertionError("不应逐条写入")):
+        dialog.on_ok()
+    assert client.lrange("queue", 0, -1) == ["a", "b", "c"]
+    assert 0 < client.ttl("queue") <= 60
+    assert dialog.added == ["queue"]
+    dialog.dialog.destroy.assert_called_once()
+
+
+def test_hash_lines_without_separator_are_skipped():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    dialog = make_dialog(make_app(client).run_pipeline, "user:1", "hash", "name: ann\nbroken\nage:3")
+    dialog.on_ok()
+    assert client.hgetall("user:1") == {"name": "ann", "age": "3"}
+    assert client.ttl("user:1") == -1
+
+
+def test_failed_write_keeps_dialog_open(messagebox):
+    def failing_pipeline(queue, on_done=None, on_error=None):
+        on_error(redis.ResponseError("READONLY"))
+    
+    dialog = make_dialog(failing_pipeline, "k", "string", "v")
+    dialog.on_ok()
+    assert dialog.added == []
+    dialog.dialog.destroy.assert_not_called()
+    dialog.ok_btn.config.assert_called_with(state="normal")
+    messagebox.showerror.assert_called_once()
+
+
+@pytest.fixture
+def tcp_server():
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def test_write_goes_through_the_async_engine(tcp_server):
+    host, port = tcp_server
+    done = threading.Event()
+    
+    def dispatch(callback, *args):
+        callback(*args)
+        done.set()
+    
+    engine = AsyncRedisEngine({"host": host, "port": port, "decode_responses": True}, dispatch)
+    try:
+        # 不提供同步客户端，写入只能经由引擎执行，完成回调中才更新键列表
+        dialog = make_dialog(make_app(engine=engine).run_pipeline, "tags", "set", "x\ny\nx")
+        dialog.on_ok()
+        assert done.wait(5)
+        assert dialog.added == ["tags"]
+    finally:
+        engine.close()
+    check = redis.Redis(host=host, port=port, decode_responses=True)
+    assert check.smembers("tags") == {"x", "y"}
@@ -0,0 +1,143 @@
+from unittest import mock
+
+import fakeredis
+
+from azure_redis_manager import AzureRedisManager, ClientTracker, RowMetadataCache, ValueCache
+
+
+def make_tracker(redirect_id=7):
+    """不启动监听线程，直接设置专用连接ID，模拟已订阅失效频道"""
+    invalidated = []
+    tracker = ClientTracker(None, invalidated.append, lambda message: None)
+    tracker.redirect_id = redirect_id
+    return tracker, invalidated
+
+
+def make_row(key, mark):
+    return {"key": key, "type": "string", "value": "v", "ttl": -1, "size": 1, "tracking": mark}
+
+
+def test_begin_returns_redirect_command():
+    tracker, _ = make_tracker()
+    mark, command = tracker.begin()
+    assert command == ("CLIENT", "TRACKING", "ON", "REDIRECT", 7)
+    tracker.redirect_id = None
+    assert tracker.begin() == (None, None)
+
+
+def test_invalidation_during_fetch_makes_read_stale():
+    tracker, invalidated = make_tracker()
+    mark, _ = tracker.begin()
+    # 读取尚未返回时收到 a 的失效通知
+    tracker.invalidate(["a"])
+    assert not tracker.is_fresh("a", mark)
+    assert tracker.is_fresh("b", mark)
+    # 失效之后开始的读取不受影响
+    later, _ = tracker.begin()
+    assert tracker.is_fresh("a", later)
+    assert invalidated == [["a"]]
+
+
+def test_invalidate_all_and_overflow_make_every_read_stale():
+    tracker, invalidated = make_tracker()
+    mark, _ = tracker.begin()
+    tracker.invalidate(None)
+    assert not tracker.is_fresh("b", mark)
+    assert invalidated == [None]
+    
+    mark, _ = tracker.begin()
+    tracker.invalidate([f"k{i}" for i in range(ClientTracker.MAX_INVALIDATED + 1)])
+    assert not tracker.is_fresh("unrelated", mark)
+    assert tracker.invalidated == {}
+
+
+def test_deactivate_stops_tracked_reads():
+    tracker, invalidated = make_tracker()
+    mark, _ = tracker.begin()
+    tracker.deactivate()
+    assert tracker.begin() == (None, None)
+    assert not tracker.is_fresh("a", mark)
+    assert invalidated == [None]
+
+
+def test_row_read_invalidated_during_fetch_is_not_cached():
+    tracker, _ = make_tracker()
+    cache = RowMetadataCache()
+    cache.tracker = tracker
+    mark, _ = tracker.begin()
+    tracker.invalidate(["a"])
+    cache.put(make_row("a", mark))
+    cache.put(make_row("b", mark))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_value_cache_rejects_stale_and_untracked_reads():
+    tracker, _ = make_tracker()
+    cache = ValueCache()
+    cache.tracker = tracker
+    mark, _ = tracker.begin()
+    tracker.invalidate(["a"])
+    cache.put("a", "string", False, (1, "x"), mark)
+    cache.put("b", "string", False, (1, "y"), None)
+    cache.put("c", "string", False, (1, "z"), mark)
+    assert cache.get("a", "string", False) is None
+    assert cache.get("b", "string", False) is None
+    assert cache.get("c", "string", False) == (1, "z")
+    # 同一键的其他读取方式单独缓存
+    assert cache.get("c", "string", True) is None
+
+
+def test_value_cache_evicts_least_recently_used_keys():
+    tracker, _ = make_tracker()
+    cache = ValueCache(max_bytes=400)
+    cache.tracker = tracker
+    mark, _ = tracker.begin()
+    cache.put("a", "string", True, (None, "a" * 5), mark)
+    for key in "abcd":
+        cache.put(key, "string", False, (90, key * 90), mark)
+    assert cache.bytes == 365
+    cache.get("b", "string", False)
+    cache.put("e", "string", False, (90, "e" * 90), mark)
+    # a 最久未使用，两种读取方式一起被淘汰；刚读过的 b 保留
+    assert cache.get("a", "string", False) is None and cache.get("a", "string", True) is None
+    assert cache.get("b", "string", False) is not None
+    assert cache.get("c", "string", False) is not None
+    assert cache.bytes == 360
+    # 超过容量四分之一的内容不缓存
+    cache.put("big", "string", False, (101, "x" * 101), mark)
+    assert cache.get("big", "string", False) is None
+
+
+def make_app():
+    app = object.__new__(AzureRedisManager)
+    app.redis_client = fakeredis.FakeRedis()
+    app.row_cache = RowMetadataCache()
+    app.value_cache = ValueCache()
+    app.metadata_fetcher = mock.Mock()
+    app.async_engine = None
+    app.ui = mock.Mock()
+    app.status_var = mock.Mock()
+    with mock.patch.object(ClientTracker, "start"):
+        app.start_client_tracking()
+    app.client_tracker.redirect_id = 7
+    return app
+
+
+def test_invalidations_reach_both_caches():
+    app = make_app()
+    tracker = app.client_tracker
+    assert app.row_cache.tracker is tracker and app.value_cache.tracker is tracker
+    mark, _ = tracker.begin()
+    for key in "ab":
+        app.row_cache.put(make_row(key, mark))
+        app.value_cache.put(key, "string", False, (1, key), mark)
+    
+    tracker.invalidate(["a"])
+    assert app.row_cache.get("a") is None and app.value_cache.get("a", "string", False) is None
+    assert app.row_cache.get("b") is not None and app.value_cache.get("b", "string", False) is not None
+    
+    # 失效通知连接断开或 FLUSHDB 时清空两个缓存
+    tracker.invalidate(None)
+    assert len(app.row_cache) == 0
+    assert app.value_cache.entries == {} and app.value_cache.bytes == 0
@@ -0,0 +1,128 @@
+import threading
+
+import fakeredis
+import pytest
+import redis
+
+from azure_redis_manager import AzureRedisManager
+
+
+class FakeNode:
+    def __init__(self, name):
+        self.name = name
+
+
+class RecordingShard:
+    """包装一个分片的 FakeRedis，记录每次SCAN的游标，可让前几次调用超时"""
+    
+    def __init__(self, keys, timeouts=0, error=None):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        if keys:
+            self.client.mset({key: "v" for key in keys})
+        self.timeouts = timeouts
+        self.error = error
+        self.cursors = []
+    
+    def scan(self, cursor=0, match=None, count=None, _type=None):
+        self.cursors.append(cursor)
+        if self.timeouts:
+            self.timeouts -= 1
+            raise redis.TimeoutError("timeout")
+        if self.error:
+            raise self.error
+        return self.client.scan(cursor, match=match, count=count, _type=_type)
+
+
+class FakeCluster:
+    """只实现 scan_cluster_shards 用到的 RedisCluster 接口：get_primaries 和 get_redis_connection"""
+    
+    def __init__(self, shards):
+        self.nodes = {name: FakeNode(name) for name in shards}
+        self.shards = shards
+    
+    def get_primaries(self):
+        return list(self.nodes.values())
+    
+    def get_redis_connection(self, node):
+        return self.shards[node.name]
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.posted = []
+    
+    def post(self, callback, *args, key=None):
+        self.posted.append((callback, args, key))
+
+
+def make_app(shards):
+    app = object.__new__(AzureRedisManager)
+    app.redis_client = FakeCluster(shards)
+    app.cluster_mode = True
+    app.cancel_loading = False
+    app.scan_type_supported = True
+    app.ui = FakeDispatcher()
+    return app
+
+
+def shard_keys(name, count):
+    return [f"{name}:key:{i}" for i in range(count)]
+
+
+def collect(app, match="*", stop_event=None, key_type=None):
+    batches = []
+    app.scan_keyspace(match, lambda keys, scan_count, stats: batches.append((list(keys), scan_count, stats)),
+                      stop_event, key_type)
+    return batches
+
+
+def test_every_shard_is_scanned_until_its_cursor_returns_to_zero():
+    shards = {name: RecordingShard(shard_keys(name, 2500)) for name in ("node-a", "node-b", "node-c")}
+    app = make_app(shards)
+    batches = collect(app)
+    
+    found = [key for keys, _, _ in batches for key in keys]
+    expected = [key for name in shards for key in shard_keys(name, 2500)]
+    assert sorted(set(found)) == sorted(expected)
+    for shard in shards.values():
+        # 每个分片从游标0开始，之后每次使用上一次返回的游标，多于一轮
+        assert shard.cursors[0] == 0
+        assert len(shard.cursors) > 1
+        assert all(cursor != 0 for cursor in shard.cursors[1:])
+    # 扫描轮次是所有分片的全局计数
+    assert [scan_count for _, scan_count, _ in batches] == list(range(1, len(batches) + 1))
+    assert batches[-1][2].startswith("分片 3/3 完成")
+
+
+def test_match_and_type_are_sent_to_each_shard():
+    shards = {"node-a": RecordingShard(["user:1", "order:1"]), "node-b": RecordingShard(["user:2"])}
+    shards["node-b"].client.rpush("user:list", "x")
+    app = make_app(shards)
+    found = [key for keys, _, _ in collect(app, "user:*", key_type="string") for key in keys]
+    assert sorted(found) == ["user:1", "user:2"]
+
+
+def test_timeouts_are_retried_from_the_same_cursor():
+    shards = {"node-a": RecordingShard(shard_keys("node-a", 300), timeouts=2), "node-b": RecordingShard([])}
+    app = make_app(shards)
+    found = [key for keys, _, _ in collect(app) for key in keys]
+    assert sorted(found) == sorted(shard_keys("node-a", 300))
+    assert shards["node-a"].cursors[:3] == [0, 0, 0]
+    assert any(key == "scan_warning" for _, _, key in app.ui.posted)
+
+
+def test_stop_event_ends_all_shards():
+    shards = {name: RecordingShard(shard_keys(name, 5000)) for name in ("node-a", "node-b")}
+    app = make_app(shards)
+    stop_event = threading.Event()
+    stop_event.set()
+    assert collect(app, stop_event=stop_event) == []
+    assert all(not shard.cursors for shard in shards.values())
+
+
+def test_shard_error_is_raised_to_the_caller():
+    shards = {"node-a": RecordingShard(shard_keys("node-a", 10)),
+              "node-b": RecordingShard([], error=redis.ConnectionError("node down"))}
+    app = make_app(shards)
+    with pytest.raises(redis.ConnectionError):
+        collect(app)
@@ -0,0 +1,144 @@
+import threading
+
+import fakeredis
+import pytest
+import redis
+from fakeredis import TcpFakeServer
+
+from azure_redis_manager import AsyncRedisEngine, CollectionWindow
+
+
+class Loader:
+    """同步等待 CollectionWindow 的后台读取"""
+    
+    def __init__(self, client, key, data_type):
+        self.loaded = threading.Event()
+        self.errors = []
+        self.window = CollectionWindow(client, key, data_type, self.loaded.set, self.on_error)
+        self.window.start()
+        self.wait()
+    
+    def on_error(self, error):
+        self.errors.append(error)
+        self.loaded.set()
+    
+    def wait(self):
+        assert self.loaded.wait(5)
+        self.loaded.clear()
+    
+    def item(self, index):
+        item = self.window.item(index)
+        if item is None:
+            self.wait()
+            item = self.window.item(index)
+        return item
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_list_reads_windows_by_index(client):
+    client.rpush("list", *range(1000))
+    loader = Loader(client, "list", "list")
+    assert loader.window.length == 1000
+    assert loader.item(999) == ("999",)
+    assert loader.item(450) == ("450",)
+    # 只读取了被访问的两个窗口
+    assert loader.window.cached_count() == 2 * CollectionWindow.WINDOW_SIZE
+    loader.window.close()
+
+
+def test_zset_items_include_scores(client):
+    client.zadd("zset", {f"m{i}": i for i in range(500)})
+    loader = Loader(client, "zset", "zset")
+    assert loader.window.length == 500
+    assert loader.item(499) == ("m499", 499.0)
+    loader.window.close()
+
+
+@pytest.mark.parametrize("data_type, count", [("set", 1000), ("hash", 730)])
+def test_scan_types_read_every_element_once(client, data_type, count):
+    if data_type == "set":
+        client.sadd("key", *(f"m{i}" for i in range(count)))
+    else:
+        client.hset("key", mapping={f"f{i}": i for i in range(count)})
+    loader = Loader(client, "key", data_type)
+    assert loader.window.length == count
+    items = [loader.item(index) for index in range(count)]
+    assert len(set(items)) == count
+    # 扫描结束后长度修正为实际读到的数量，越界位置返回 ()
+    assert loader.window.scan_finished
+    assert loader.item(count) == ()
+    loader.window.close()
+
+
+def test_scan_cursors_allow_jumping_back_after_eviction(client):
+    client.sadd("set", *(f"m{i}" for i in range(4000)))
+    loader = Loader(client, "set", "set")
+    first = loader.item(0)
+    last = loader.item(3999)
+    # 途经的窗口超过 MAX_WINDOWS 后最早的窗口被淘汰，起点仍记录在游标数组中
+    assert 0 not in loader.window.windows
+    assert len(loader.window.scan_cursors) > CollectionWindow.MAX_WINDOWS
+    assert loader.item(0) == first
+    assert loader.item(3999) == last
+    assert len(loader.window.windows) <= CollectionWindow.MAX_WINDOWS
+    loader.window.close()
+
+
+def test_missing_key_and_errors(client):
+    loader = Loader(client, "missing", "list")
+    assert loader.window.length == 0
+    assert loader.item(0) == ()
+    loader.window.close()
+    client.set("wrong", "x")
+    loader = Loader(client, "wrong", "hash")
+    assert "WRONGTYPE" in str(loader.errors[0])
+    assert loader.window.length is None
+    loader.window.close()
+
+
+def test_closed_window_does_not_load(client):
+    client.rpush("list", *range(10))
+    loader = Loader(client, "list", "list")
+    loader.window.close()
+    assert loader.window.item(0) is None
+    assert not loader.loaded.wait(0.2)
+
+
+@pytest.fixture
+def tcp_server():
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def test_reads_go_through_the_async_engine(tcp_server):
+    host, port = tcp_server
+    seed = redis.Redis(host=host, port=port, decode_responses=True)
+    seed.rpush("list", *range(300))
+    seed.hset("hash", mapping={f"f{i}": i for i in range(300)})
+    engine = AsyncRedisEngine({"host": host, "port": port, "decode_responses": True}, lambda callback, *args: None)
+    items = {}
+    try:
+        for data_type, index in [("list", 299), ("hash", 0)]:
+            loaded = threading.Event()
+            # 不提供同步客户端，所有命令只能经由引擎执行
+            window = CollectionWindow(None, data_type, data_type, loaded.set, lambda error: None, engine)
+            window.start()
+            assert loaded.wait(5)
+            loaded.clear()
+            assert window.length == 300
+            assert window.item(index) is None
+            assert loaded.wait(5)
+            items[data_type] = window.item(index)
+            window.close()
+        assert items["list"] == ("299",)
+        assert items["hash"][0].startswith("f") and len(items["hash"]) == 2
+    finally:
+        engine.close()
@@ -0,0 +1,179 @@
+import threading
+
+import pytest
+
+from azure_redis_manager import CompactKeyStore, KeyIndexView
+
+
+def test_extend_skips_duplicates():
+    store = CompactKeyStore()
+    assert store.extend(["a", "b", "a"]) == 2
+    assert store.extend(["b", "c"]) == 1
+    assert not store.append("c")
+    assert len(store) == 3
+    assert list(store) == ["a", "b", "c"]
+
+
+def test_find_and_contains():
+    store = CompactKeyStore(["user:1", "user:2"])
+    assert store.find("user:2") == 1
+    assert store.find("user:3") == -1
+    assert "user:1" in store
+    assert "user:3" not in store
+
+
+def test_indexing_and_slicing():
+    keys = [f"key:{i}" for i in range(50)]
+    store = CompactKeyStore(keys)
+    assert store[0] == "key:0"
+    assert store[-1] == "key:49"
+    assert store[10:13] == keys[10:13]
+    assert store[::10] == keys[::10]
+    with pytest.raises(IndexError):
+        store[50]
+
+
+def test_growth_keeps_all_keys_findable():
+    keys = [f"order:item:{i}" for i in range(10000)]
+    store = CompactKeyStore(keys)
+    assert len(store) == len(keys)
+    for i in range(0, len(keys), 97):
+        assert store.find(keys[i]) == i
+    assert store.extend(keys[:100]) == 0
+
+
+def test_non_ascii_and_binary_keys_round_trip():
+    store = CompactKeyStore(["用户:1", b"\xff\xfe:raw"])
+    assert store[0] == "用户:1"
+    # 不是有效UTF-8的字节以 surrogateescape 方式解码，再编码时还原
+    assert store[1].encode("utf-8", "surrogateescape") == b"\xff\xfe:raw"
+    assert store.key_bytes(1) == b"\xff\xfe:raw"
+    assert store.find(store[1]) == 1
+    assert store.find(b"\xff\xfe:raw") == 1
+
+
+def test_raw_keys_match_stored_bytes():
+    store = CompactKeyStore(["b", "a", "中"])
+    assert store.raw_keys() == [b"b", b"a", "中".encode("utf-8")]
+
+
+@pytest.mark.parametrize("pattern, key, matched", [
+    ("user:*", "user:1", True),
+    ("user:?", "user:10", False),
+    ("h[ae]llo", "hallo", True),
+    ("h[^e]llo", "hello", False),
+    ("h[^e]llo", "hallo", True),
+    ("h[a-c]llo", "hbllo", True),
+    ("h[c-a]llo", "hbllo", True),
+    ("h\\*llo", "h*llo", True),
+    ("h\\*llo", "hello", False),
+    ("[\\]]x", "]x", True),
+    ("a[bc", "ab", True),
+    ("[]x", "x", False),
+    ("[^]", "x", True),
+    ("*", "line\nbreak", True),
+])
+def test_glob_matcher_follows_redis_rules(pattern, key, matched):
+    assert CompactKeyStore.glob_matcher(pattern)(key) is matched
+
+
+def test_escaped_exact_key_matches_only_itself():
+    for key in ["a\\b", "a*b[c]?", "plain"]:
+        matcher = CompactKeyStore.glob_matcher(CompactKeyStore.escape_glob(key))
+        assert matcher(key)
+        assert not matcher(key + "x")
+
+
+@pytest.fixture
+def search_store():
+    return CompactKeyStore(["user:1", "user:10", "order:item:1", "User:2", "session:abc"])
+
+
+@pytest.mark.parametrize("pattern, mode, ignore_case, expected", [
+    ("user", "substring", False, [0, 1]),
+    ("user", "substring", True, [0, 1, 3]),
+    (":1", "substring", False, [0, 1, 2]),
+    ("user:?", "glob", False, [0]),
+    ("*:1", "glob", False, [0, 2]),
+    ("u*", "glob", True, [0, 1, 3]),
+    (r"^user:\d+$", "regex", False, [0, 1]),
+    (r"item", "regex", False, [2]),
+    (r"c$", "regex", False, [4]),
+])
+def test_search_modes(search_store, pattern, mode, ignore_case, expected):
+    assert list(search_store.search(pattern, mode, ignore_case)) == expected
+
+
+def test_search_sees_keys_appended_after_first_search(search_store):
+    assert list(search_store.search("cart")) == []
+    search_store.extend(["cart:1", "cart:2"])
+    assert list(search_store.search("cart")) == [5, 6]
+
+
+def test_search_does_not_match_across_keys(search_store):
+    # 键在缓冲区中首尾相连，越出键范围的匹配都不算
+    assert list(search_store.search("10order")) == []
+    assert list(search_store.search("10ORDER", ignore_case=True)) == []
+    assert list(search_store.search(r"10order", "regex")) == []
+    assert list(search_store.search("1o*", "glob")) == []
+    assert list(search_store.search(r"\d$", "regex")) == [0, 1, 2, 3]
+
+
+def test_search_keys_containing_newlines():
+    store = CompactKeyStore(["a\nb", "b", "x\ny", "plain"])
+    assert list(store.search("b", "glob")) == [1]
+    assert list(store.search("*b", "glob")) == [0, 1]
+    assert list(store.search("x\ny")) == [2]
+    assert list(store.search("^b$", "regex")) == [1]
+    assert list(store.search("^y", "regex")) == []
+
+
+@pytest.mark.parametrize("pattern, ignore_case, expected", [
+    (r"(?i)^USER", False, [0, 1, 3]),
+    (r"^USER:1", True, [0, 1]),
+    (r"\bitem\b", False, [2]),
+    (r"^(user|order):1$", False, [0]),
+    (r"\d{2}", False, [1]),
+])
+def test_search_regex_without_literal_prefix(search_store, pattern, ignore_case, expected):
+    assert list(search_store.search(pattern, "regex", ignore_case)) == expected
+
+
+def test_search_regex_with_lookaround():
+    store = CompactKeyStore(["user:1", "user:x", "order:1"])
+    assert list(store.search(r"(?<=user:)\d", "regex")) == [0]
+
+
+def test_search_stops_early():
+    store = CompactKeyStore([f"key:{i}" for i in range(5000)])
+    assert len(store.search("key", stopped=lambda: True)) < 5000
+
+
+def test_key_index_view_pages_over_search_results(search_store):
+    view = KeyIndexView(search_store, search_store.search("user", ignore_case=True))
+    assert len(view) == 3
+    assert list(view) == ["user:1", "user:10", "User:2"]
+    assert view[1:] == ["user:10", "User:2"]
+    assert view[-1] == "User:2"
+
+
+def test_find_during_concurrent_growth():
+    store = CompactKeyStore(["seed"])
+    keys = [f"key:{i}" for i in range(200000)]
+    errors = []
+    
+    def reader():
+        try:
+            while len(store) < len(keys):
+                # 已追加的键在扩容过程中也必须能找到
+                assert store.find("seed") == 0
+        except Exception as e:
+            errors.append(e)
+    
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for start in range(0, len(keys), 1000):
+        store.extend(keys[start:start + 1000])
+    thread.join()
+    assert not errors
+    assert store.find(keys[-1]) == len(keys)
@@ -0,0 +1,207 @@
+import threading
+from unittest import mock
+
+import fakeredis
+
+from azure_redis_manager import AzureRedisManager, CompactKeyStore, KeyMetadataArrays, KeyMetadataFetcher
+
+
+def make_row(key, data_type, ttl, size):
+    return {"key": key, "type": data_type, "value": "", "ttl": ttl, "size": size}
+
+
+def sorted_keys(store, metadata, column, descending=False, indexes=None):
+    indexes = range(len(store)) if indexes is None else indexes
+    return [store[i] for i in metadata.sort(column, indexes, descending)]
+
+
+def build():
+    store = CompactKeyStore(["b", "a", "d", "c", "e"])
+    metadata = KeyMetadataArrays(store)
+    metadata.record([
+        make_row("a", "string", 100, 5),
+        make_row("b", "hash", -1, 50),
+        make_row("c", "list", 10, 7),
+        make_row("d", "timeout", None, 0),
+    ])
+    return store, metadata
+
+
+def test_key_sort_uses_byte_order():
+    store, metadata = build()
+    assert sorted_keys(store, metadata, "key") == ["a", "b", "c", "d", "e"]
+    assert sorted_keys(store, metadata, "key", True) == ["e", "d", "c", "b", "a"]
+    assert sorted_keys(store, metadata, "key", indexes=[4, 0, 1]) == ["a", "b", "e"]
+
+
+def test_name_order_extends_incrementally():
+    store = CompactKeyStore([f"k{i:03d}" for i in range(0, 400, 2)])
+    metadata = KeyMetadataArrays(store)
+    order = metadata.update_name_order()
+    # 少量新键逐个插入，大量新键与已有顺序合并，结果都与整体排序一致
+    store.extend(["k001", "a", "z"])
+    assert sorted_keys(store, metadata, "key") == sorted(store)
+    store.extend(f"k{i:03d}" for i in range(3, 400, 2))
+    assert sorted_keys(store, metadata, "key") == sorted(store)
+    # 已返回的旧顺序不被修改
+    assert list(order) == sorted(range(200), key=store.__getitem__)
+
+
+def test_key_sort_of_subset_uses_name_order():
+    store, metadata = build()
+    metadata.update_name_order()
+    assert sorted_keys(store, metadata, "key", indexes=[4, 0, 1]) == ["a", "b", "e"]
+    assert sorted_keys(store, metadata, "key", True, indexes=[4, 0, 1]) == ["e", "b", "a"]
+
+
+def test_record_with_known_indexes():
+    store, metadata = build()
+    metadata.record([make_row("e", "zset", 30, 9)], [4])
+    assert sorted_keys(store, metadata, "size", True)[:2] == ["b", "e"]
+
+
+def test_unknown_values_stay_last_in_both_directions():
+    store, metadata = build()
+    # d 读取超时、e 从未加载，都没有元数据
+    assert sorted_keys(store, metadata, "size") == ["a", "c", "b", "d", "e"]
+    assert sorted_keys(store, metadata, "size", True) == ["b", "c", "a", "d", "e"]
+    assert sorted_keys(store, metadata, "type") == ["b", "c", "a", "d", "e"]
+    assert metadata.known_count() == 3
+
+
+def test_ttl_sorts_by_expiry_with_persistent_keys_after_expiring_ones():
+    store, metadata = build()
+    assert sorted_keys(store, metadata, "ttl") == ["c", "a", "b", "d", "e"]
+    assert sorted_keys(store, metadata, "ttl", True) == ["b", "a", "c", "d", "e"]
+
+
+def test_deleted_key_becomes_unknown():
+    store, metadata = build()
+    metadata.record([make_row("a", "none", -2, 0)])
+    assert sorted_keys(store, metadata, "size")[-3:] == ["a", "d", "e"]
+
+
+def test_missing_walks_keys_without_metadata():
+    store, metadata = build()
+    assert metadata.missing(0, 10) == ([2, 4], 5)
+    assert metadata.missing(0, 1) == ([2], 3)
+    assert not metadata.is_complete()
+    metadata.filled = len(store)
+    assert metadata.is_complete()
+    store.append("f")
+    assert not metadata.is_complete()
+
+
+def test_fetched_rows_fill_every_key():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    keys = [f"k:{i}" for i in range(30)]
+    for i, key in enumerate(keys):
+        client.set(key, "x" * i)
+    store = CompactKeyStore(keys)
+    metadata = KeyMetadataArrays(store)
+    fetcher = KeyMetadataFetcher(client)
+    position = 0
+    while not metadata.is_complete():
+        indexes, position = metadata.missing(position, 7)
+        metadata.record(fetcher.fetch_pipelined([store[i] for i in indexes]))
+        metadata.filled = position
+    assert metadata.known_count() == len(keys)
+    assert sorted_keys(store, metadata, "size", True)[:2] == ["k:29", "k:28"]
+
+
+class RecordingRedis(fakeredis.FakeRedis):
+    """记录pipeline发送的命令名"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+    
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+        
+        def recording_execute(raise_on_error=True):
+            self.commands.extend(args[0] for args, options in pipe.command_stack)
+            return execute(raise_on_error)
+        
+        pipe.execute = recording_execute
+        return pipe
+
+
+def test_sort_metadata_fetch_reads_no_values():
+    client = RecordingRedis()
+    client.set("s", "x" * 1000)
+    client.rpush("l", 1, 2, 3)
+    client.expire("l", 100)
+    fetcher = KeyMetadataFetcher(client)
+    rows = fetcher.fetch_sort_metadata(["s", "l", "gone"])
+    assert [(row["type"], row["size"], row["value"]) for row in rows] == [
+        ("string", 1000, ""), ("list", 3, ""), ("none", 0, "")]
+    assert 0 < rows[1]["ttl"] <= 100
+    # 只有类型、TTL和长度命令：没有 GETRANGE 预览，也没有 CLIENT TRACKING
+    assert set(client.commands) == {"TYPE", "TTL", "STRLEN", "LLEN"}
+
+
+def test_sorting_does_not_start_a_fill():
+    client = RecordingRedis()
+    app = make_fill_app(client, ["a", "b"])
+    app.sort_generation = 0
+    app.sort_state = ("size", True)
+    app.search_view = None
+    app.status_var = mock.Mock()
+    app.update_key_view()
+    assert app.metadata_fill is None
+    assert client.commands == []
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.posted = []
+        self.finished = threading.Event()
+    
+    def post(self, callback, *args, key=None):
+        self.posted.append(callback.__name__)
+        if callback.__name__ == "on_metadata_fill_finished":
+            self.finished.set()
+
+
+def make_fill_app(client, keys):
+    app = object.__new__(AzureRedisManager)
+    app.all_keys = CompactKeyStore(keys)
+    app.key_metadata = KeyMetadataArrays(app.all_keys)
+    app.metadata_fill = None
+    app.metadata_fetcher = KeyMetadataFetcher(client)
+    app.known_key_type = None
+    app.page_load_workers = 2
+    app.is_connected = True
+    app.loading = False
+    app.ui = RecordingDispatcher()
+    return app
+
+
+def test_background_fill_covers_all_keys():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    keys = [f"k:{i}" for i in range(3000)]
+    client.mset({key: key for key in keys})
+    app = make_fill_app(client, keys)
+    app.start_metadata_fill()
+    # 进行中的补全不会重复启动
+    app.start_metadata_fill()
+    assert app.ui.finished.wait(10)
+    assert app.key_metadata.is_complete()
+    assert app.key_metadata.known_count() == len(keys)
+    assert app.ui.posted.count("on_metadata_fill_finished") == 1
+
+
+def test_background_fill_stops_when_metadata_is_replaced():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    keys = [f"k:{i}" for i in range(3000)]
+    client.mset({key: key for key in keys})
+    app = make_fill_app(client, keys)
+    app.loading = True
+    app.start_metadata_fill()
+    metadata = app.key_metadata
+    # 重新扫描时元数据数组被替换，暂停中的补全线程随之退出
+    app.key_metadata = KeyMetadataArrays(app.all_keys)
+    assert app.ui.finished.wait(10)
+    assert metadata.filled == 0
@@ -0,0 +1,127 @@
+import fakeredis
+import pytest
+import redis
+
+from azure_redis_manager import KeyMetadataFetcher, TransferCounter
+
+FETCH_METHODS = ["fetch_serial", "fetch_pipelined", "fetch_lua"]
+
+
+@pytest.fixture
+def client():
+    # 与应用非二进制模式相同的解码参数
+    client = fakeredis.FakeRedis(decode_responses=True, encoding_errors="replace")
+    client.set("str", "hello", ex=100)
+    client.rpush("list", 1, 2, 3)
+    client.sadd("set", "a", "b")
+    client.zadd("zset", {"a": 1})
+    client.hset("hash", mapping={"f": "v"})
+    return client
+
+
+EXPECTED = {
+    "str": ("string", "hello", 5),
+    "list": ("list", "List (3 items)", 3),
+    "set": ("set", "Set (2 members)", 2),
+    "zset": ("zset", "ZSet (1 members)", 1),
+    "hash": ("hash", "Hash (1 fields)", 1),
+}
+
+
+@pytest.mark.parametrize("method", FETCH_METHODS)
+def test_rows_keep_key_order_and_parse_each_type(client, method):
+    keys = ["hash", "str", "list", "zset", "set"]
+    rows = getattr(KeyMetadataFetcher(client), method)(keys)
+    assert [row["key"] for row in rows] == keys
+    for row in rows:
+        data_type, value, size = EXPECTED[row["key"]]
+        assert (row["type"], row["value"], row["size"]) == (data_type, value, size)
+    ttls = {row["key"]: row["ttl"] for row in rows}
+    assert 0 < ttls["str"] <= 100
+    assert ttls["list"] == -1
+
+
+@pytest.mark.parametrize("method", FETCH_METHODS)
+def test_missing_key_is_reported_as_none(client, method):
+    row = getattr(KeyMetadataFetcher(client), method)(["missing"])[0]
+    assert (row["type"], row["ttl"], row["size"]) == ("none", -2, 0)
+
+
+@pytest.mark.parametrize("method", FETCH_METHODS)
+def test_known_type_skips_type_lookup(client, method):
+    rows = getattr(KeyMetadataFetcher(client), method)(["list"], "list")
+    assert (rows[0]["type"], rows[0]["value"]) == ("list", "List (3 items)")
+
+
+def test_pipelined_matches_serial_and_counts_transfer(client):
+    fetcher = KeyMetadataFetcher(client)
+    keys = list(EXPECTED)
+    serial_counter, pipelined_counter = TransferCounter(), TransferCounter()
+    assert fetcher.fetch_pipelined(keys, None, pipelined_counter) == fetcher.fetch_serial(keys, None, serial_counter)
+    assert pipelined_counter.bytes == serial_counter.bytes > 0
+
+
+def test_lua_splits_large_batches(client):
+    keys = [f"bulk:{i}" for i in range(KeyMetadataFetcher.LUA_BATCH_LIMIT * 2 + 7)]
+    client.mset({key: key for key in keys})
+    fetcher = KeyMetadataFetcher(client)
+    assert fetcher.fetch_lua(keys) == fetcher.fetch_pipelined(keys)
+    assert fetcher.lua_unavailable_reason is None
+
+
+def test_lua_reloads_flushed_script(client):
+    fetcher = KeyMetadataFetcher(client)
+    fetcher.fetch_lua(["str"])
+    client.script_flush()
+    assert fetcher.fetch_lua(["str"])[0]["value"] == "hello"
+
+
+def test_lua_falls_back_to_pipeline_when_scripts_are_disabled(client, monkeypatch):
+    fetcher = KeyMetadataFetcher(client)
+    
+    def disabled(keys):
+        raise redis.ResponseError("NOPERM scripting disabled")
+    
+    monkeypatch.setattr(fetcher, "run_lua_batches", disabled)
+    rows = fetcher.fetch_lua(["str", "list"])
+    assert [row["value"] for row in rows] == ["hello", "List (3 items)"]
+    assert "NOPERM" in fetcher.lua_unavailable_reason
+
+
+@pytest.mark.parametrize("method", ["fetch_pipelined", "fetch_lua"])
+def test_string_preview_reads_only_a_range(client, method):
+    client.set("large", "x" * 100000)
+    client.set("wide", "中" * 300)
+    counter = TransferCounter()
+    large, wide = getattr(KeyMetadataFetcher(client), method)(["large", "wide"], None, counter)
+    assert large["size"] == 100000
+    assert large["value"] == "x" * KeyMetadataFetcher.PREVIEW_LENGTH + "..."
+    # 多字节字符按字符数截断，不会在字符中间断开
+    assert wide["size"] == 900
+    assert wide["value"] == "中" * KeyMetadataFetcher.PREVIEW_LENGTH + "..."
+    assert counter.bytes < 2 * KeyMetadataFetcher.PREVIEW_BYTES + 200
+
+
+def test_split_batches_respects_limits():
+    fetcher = KeyMetadataFetcher(None)
+    keys = [f"k{i}" for i in range(1200)]
+    batches = fetcher.split_batches(keys)
+    assert [len(batch) for batch in batches] == [500, 500, 200]
+    batches = fetcher.split_batches(keys[:120], workers=8)
+    # 每批不小于 MIN_PARALLEL_BATCH
+    assert [len(batch) for batch in batches] == [50, 50, 20]
+    assert [key for batch in batches for key in batch] == keys[:120]
+
+
+@pytest.mark.parametrize("method", ["fetch_pipelined", "fetch_lua"])
+def test_binary_safe_rows_keep_raw_preview_bytes(method):
+    # 与应用二进制安全模式相同的连接参数
+    client = fakeredis.FakeRedis(decode_responses=False, encoding_errors="surrogateescape")
+    client.set(b"\xffraw", b"\x00\x01bin" * 50)
+    client.rpush(b"list", b"\xfe")
+    key = b"\xffraw".decode("utf-8", "surrogateescape")
+    raw, items = getattr(KeyMetadataFetcher(client), method)([key, "list"])
+    assert (raw["key"], raw["type"], raw["size"]) == (key, "string", 250)
+    assert isinstance(raw["value"], bytes)
+    assert KeyMetadataFetcher.format_bytes_preview(raw["value"], raw["size"]).startswith("\\x00\\x01bin")
+    assert (items["type"], items["value"]) == ("list", "List (1 items)")
@@ -0,0 +1,67 @@
+from azure_redis_manager import CompactKeyStore, KeyNamespaceIndex
+
+
+def build_index(keys, delimiter=":"):
+    store = CompactKeyStore(keys)
+    index = KeyNamespaceIndex(store, delimiter)
+    index.add_keys(keys, 0)
+    return store, index
+
+
+def test_counts_per_namespace_level():
+    _, index = build_index(["user:1", "user:2", "order:item:1", "order:item:2", "order:3", "plain"])
+    assert index.get_node([]) == (6, 0, True)
+    # 最后一段只计入父节点，没有分隔符的键只计入根节点；子节点按键数降序
+    assert index.get_children([]) == [("order", 3, 0, True), ("user", 2, 0, False)]
+    assert index.get_node(["order"]) == (3, 0, True)
+    assert index.get_node(["order", "item"]) == (2, 0, False)
+    assert index.get_node(["missing"]) is None
+
+
+def test_duplicate_adds_are_counted_once():
+    store, index = build_index(["a:1", "a:2"])
+    index.add_keys(["a:1"])
+    index.add_keys(["a:1", "a:2"], 0)
+    assert index.get_node(["a"]) == (2, 0, False)
+
+
+def test_remove_key_ignores_uncounted_keys():
+    store = CompactKeyStore(["a:1", "a:2", "b:1"])
+    index = KeyNamespaceIndex(store)
+    index.add_keys(["a:1", "a:2"], 0)
+    # b:1 在键存储中但尚未计入（如重建还没处理到），不存在的键也不影响计数
+    index.remove_key("b:1")
+    index.remove_key("c:1")
+    assert index.get_node([]) == (2, 0, True)
+    index.remove_key("a:1")
+    index.remove_key("a:1")
+    assert index.get_node([]) == (1, 0, True)
+    assert index.get_node(["a"]) == (1, 0, False)
+
+
+def test_sizes_follow_adds_and_removals():
+    _, index = build_index(["a:1", "a:2", "b:1"])
+    index.add_size("a:1", 100)
+    index.add_size("a:2", 50)
+    index.add_size("a:1", 120)
+    index.add_size("unknown:1", 999)
+    assert index.get_node(["a"]) == (2, 170, False)
+    index.remove_key("a:1")
+    assert index.get_node(["a"]) == (1, 50, False)
+    assert index.get_node([]) == (2, 50, True)
+
+
+def test_readded_key_is_counted_again():
+    _, index = build_index(["a:1"])
+    index.remove_key("a:1")
+    index.add_keys(["a:1"])
+    assert index.get_node(["a"]) == (1, 0, False)
+
+
+def test_max_depth_and_empty_delimiter():
+    _, index = build_index(["a:b:c:d"])
+    assert index.get_node(["a", "b", "c"]) == (1, 0, False)
+    store = CompactKeyStore(["a:b"])
+    flat = KeyNamespaceIndex(store, "")
+    flat.add_keys(["a:b"], 0)
+    assert flat.get_node([]) == (1, 0, False)
@@ -0,0 +1,78 @@
+import pytest
+
+import azure_redis_manager
+from azure_redis_manager import RowMetadataCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(azure_redis_manager.time, "monotonic", clock)
+    return clock
+
+
+def make_row(key, ttl=-1, data_type="string", **extra):
+    return dict({"key": key, "type": data_type, "value": "v", "ttl": ttl, "size": 1}, **extra)
+
+
+def test_ttl_ages_with_elapsed_time(clock):
+    cache = RowMetadataCache(max_age=60)
+    cache.put(make_row("a", ttl=30))
+    clock.now += 10.4
+    assert cache.get("a")["ttl"] == 20
+    clock.now += 20
+    # TTL已到期的条目视为未命中并被移除
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_entries_expire_after_max_age(clock):
+    cache = RowMetadataCache(max_age=60)
+    cache.put(make_row("a"))
+    clock.now += 59
+    assert cache.get("a")["ttl"] == -1
+    clock.now += 2
+    assert cache.get("a") is None
+
+
+def test_get_returns_a_copy(clock):
+    cache = RowMetadataCache()
+    cache.put(make_row("a", ttl=100))
+    cache.get("a")["value"] = "changed"
+    assert cache.get("a")["value"] == "v"
+
+
+def test_lru_eviction_order(clock):
+    cache = RowMetadataCache(max_entries=2)
+    cache.put(make_row("a"))
+    cache.put(make_row("b"))
+    cache.get("a")
+    cache.put(make_row("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_failed_rows_are_not_cached(clock):
+    cache = RowMetadataCache()
+    cache.put(make_row("t", data_type="timeout"))
+    cache.put(make_row("e", data_type="error"))
+    cache.put(make_row("n", ttl=None))
+    assert len(cache) == 0
+
+
+def test_need_memory_and_invalidate(clock):
+    cache = RowMetadataCache()
+    cache.put(make_row("a"))
+    cache.put(make_row("b", memory=64))
+    assert cache.get("a", need_memory=True) is None
+    assert cache.get("b", need_memory=True)["memory"] == 64
+    cache.invalidate("a", "b", "missing")
+    assert len(cache) == 0
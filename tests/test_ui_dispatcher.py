@@ -0,0 +1,83 @@
+from azure_redis_manager import UIUpdateDispatcher
+
+
+class FakeRoot:
+    """记录 after 调度的回调，由测试手动触发刷新"""
+    
+    def __init__(self):
+        self.scheduled = []
+        self.errors = []
+    
+    def after(self, interval, callback):
+        self.scheduled.append((interval, callback))
+    
+    def report_callback_exception(self, *exc_info):
+        self.errors.append(exc_info[1])
+    
+    def run_scheduled(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for _, callback in scheduled:
+            callback()
+
+
+def test_keyed_updates_keep_only_the_latest_arguments():
+    root = FakeRoot()
+    dispatcher = UIUpdateDispatcher(root, interval=50)
+    calls = []
+    for i in range(100):
+        dispatcher.post(lambda value: calls.append(("progress", value)), i, key="progress")
+    # 同一轮内只调度一次刷新
+    assert len(root.scheduled) == 1 and root.scheduled[0][0] == 50
+    root.run_scheduled()
+    assert calls == [("progress", 99)]
+
+
+def test_unkeyed_updates_all_run_in_order():
+    root = FakeRoot()
+    dispatcher = UIUpdateDispatcher(root)
+    calls = []
+    for i in range(3):
+        dispatcher.post(calls.append, i)
+    root.run_scheduled()
+    assert calls == [0, 1, 2]
+
+
+def test_replaced_keyed_update_runs_at_its_latest_position():
+    root = FakeRoot()
+    dispatcher = UIUpdateDispatcher(root)
+    calls = []
+    dispatcher.post(calls.append, "status 1", key="status")
+    dispatcher.post(calls.append, "page shown")
+    dispatcher.post(calls.append, "status 2", key="status")
+    root.run_scheduled()
+    assert calls == ["page shown", "status 2"]
+
+
+def test_extend_accumulates_rows_into_one_call():
+    root = FakeRoot()
+    dispatcher = UIUpdateDispatcher(root)
+    calls = []
+    dispatcher.extend("rows", [1, 2], calls.append)
+    dispatcher.extend("rows", [3], calls.append)
+    root.run_scheduled()
+    assert calls == [[1, 2, 3]]
+
+
+def test_flush_reschedules_and_reports_errors():
+    root = FakeRoot()
+    dispatcher = UIUpdateDispatcher(root)
+    calls = []
+    
+    def fail():
+        raise ValueError("boom")
+    
+    dispatcher.post(fail)
+    dispatcher.post(calls.append, "after error")
+    root.run_scheduled()
+    # 一个回调出错不影响后续更新
+    assert calls == ["after error"]
+    assert isinstance(root.errors[0], ValueError)
+    dispatcher.post(calls.append, "next round")
+    assert len(root.scheduled) == 1
+    root.run_scheduled()
+    assert calls[-1] == "next round"